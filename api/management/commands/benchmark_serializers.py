@@ -0,0 +1,74 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import task as task_serializers
+from api.utils import url_templates
+from core import models as core_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput of the task list serializer over generated rows, "
+        "building urls with DRF `reverse()` and with url templates. Rows are "
+        "created in a transaction which is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            tasks = self.create_tasks(options["rows"])
+            request = Request(APIRequestFactory().get("/api/"))
+            for enabled in [False, True]:
+                url_templates.enabled = enabled
+                try:
+                    seconds = self.measure(tasks, request, options["repeat"])
+                finally:
+                    url_templates.enabled = True
+                name = "url templates" if enabled else "drf reverse"
+                self.stdout.write(
+                    f'{name}: {seconds:.3f}s per {len(tasks)} rows, '
+                    f'{len(tasks) / seconds:.0f} rows/s')
+            transaction.set_rollback(True)
+
+    def create_tasks(self, rows):
+        user = get_user_model().objects.create_user(
+            username="benchmark-serializers")
+        workspace = core_models.Workspace.objects.create(
+            name="benchmark", created_by=user)
+        category = core_models.Category.objects.create(
+            name="benchmark", workspace=workspace, created_by=user)
+        roots = core_models.Task.bulk_create_tree([
+            core_models.Task(title=f"task {i}", workspace=workspace,
+                             category=category, created_by=user)
+            for i in range(rows // 2)
+        ])
+        core_models.Task.bulk_create_tree([
+            core_models.Task(title=f"task {i}", workspace=workspace,
+                             category=category, created_by=user,
+                             parent=roots[i % len(roots)])
+            for i in range(len(roots), rows)
+        ])
+        queryset = core_models.Task.objects.filter(category=category)
+        return list(queryset.select_related("category", "created_by")
+                    .prefetch_related("tags"))
+
+    def measure(self, tasks, request, repeat):
+        """
+        Returns the best time of serializing the tasks `repeat` times.
+        """
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            task_serializers.TaskSerializer(
+                tasks, many=True, context={"request": request}).data
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        return best
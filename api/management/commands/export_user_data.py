@@ -0,0 +1,52 @@
+import codecs
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils import export as api_export
+
+
+class Command(BaseCommand):
+    help = (
+        "Export all objects of a user as NDJSON, streamed to a file or "
+        "stdout."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--output", "-o",
+                            help="File to write to (stdout by default).")
+        parser.add_argument("--gzip", action="store_true",
+                            help="Compress the export with gzip.")
+        parser.add_argument("--chunk-size", type=int,
+                            default=api_export.CHUNK_SIZE,
+                            help="Rows fetched from the database at once.")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(
+                username=options["username"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" not found.')
+        chunks = api_export.iter_export(user, compress=options["gzip"],
+                                        chunk_size=options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            return
+        # the binary buffer of a text stdout (e.g. sys.stdout), else text
+        buffer = getattr(self.stdout, "buffer", None)
+        if buffer is not None:
+            self.stdout.flush()
+            for chunk in chunks:
+                buffer.write(chunk)
+            buffer.flush()
+        elif options["gzip"]:
+            raise CommandError(
+                "A gzip export needs --output or a binary stdout.")
+        else:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            for chunk in chunks:
+                self.stdout.write(decoder.decode(chunk), ending="")
+            self.stdout.write(decoder.decode(b"", final=True), ending="")
@@ -0,0 +1,67 @@
+import gzip
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils import importer as api_importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Import objects into the account of a user from an NDJSON export, a "
+        "JSON fixture or CSV rows of one table, with bulk inserts. Files "
+        "ending with .gz are decompressed."
+    )
+    extension_formats = {
+        ".ndjson": "ndjson",
+        ".jsonl": "ndjson",
+        ".json": "json",
+        ".csv": "csv",
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path", help="File to read from, - for stdin.")
+        parser.add_argument("--format", choices=api_importer.FORMATS,
+                            help="Format of the input (from its extension by "
+                                 "default).")
+        parser.add_argument("--table",
+                            help="Table of CSV rows, e.g. tasks.")
+        parser.add_argument("--batch-size", type=int,
+                            default=api_importer.BATCH_SIZE)
+
+    def get_format(self, path):
+        path = path.removesuffix(".gz")
+        for extension, format in self.extension_formats.items():
+            if path.endswith(extension):
+                return format
+        raise CommandError("Unknown format, set it with --format.")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(
+                username=options["username"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" not found.')
+        path = options["path"]
+        format = options["format"] or self.get_format(path)
+        if path == "-":
+            stream = sys.stdin.buffer
+        elif path.endswith(".gz"):
+            stream = gzip.open(path)
+        else:
+            stream = open(path, "rb")
+        try:
+            records = api_importer.read_records(stream, format,
+                                                options["table"])
+            counts = api_importer.import_records(
+                user, records, batch_size=options["batch_size"])
+        except ValidationError as e:
+            raise CommandError(" ".join(e.messages))
+        finally:
+            if path != "-":
+                stream.close()
+        for key, count in counts.items():
+            self.stdout.write(f'{key}: {count} imported')
@@ -0,0 +1,121 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+
+
+class CustomCursorPagination(pagination.CursorPagination):
+    """
+    Keyset pagination for api list end points.
+
+    Pages are fetched with a `(updated_at, id)` range condition instead of an
+    offset, so fetching a page costs the same at any depth of the list.
+    Models are indexed on their list filter followed by `updated_at`, `id`.
+
+    DRF's cursor holds the value of the first ordering field only and skips
+    rows sharing it with an offset. Positions here hold the values of all
+    ordering fields (the last one being unique), so a page seeks past the
+    position of the previous one (see `get_position_filter`) and rows
+    sharing `updated_at` (e.g. of bulk updates) are never skipped by offset.
+    """
+
+    ordering = ("updated_at", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    @staticmethod
+    def reverse_ordering(ordering):
+        return tuple(order[1:] if order.startswith("-") else f'-{order}'
+                     for order in ordering)
+
+    def _get_position_from_instance(self, instance, ordering):
+        return json.dumps([
+            instance._meta.get_field(order.lstrip("-"))
+            .value_to_string(instance)
+            for order in ordering
+        ])
+
+    def get_position_values(self, model, position):
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) \
+                    or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(order.lstrip("-")).to_python(value)
+                for order, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def get_position_filter(ordering, values):
+        """
+        Returns a Q object matching rows following a position in given
+        ordering, e.g. for `("updated_at", "id")`
+            updated_at >= x AND (updated_at > x OR (updated_at = x AND id > y))
+        the first condition bounding the range read from the index.
+        """
+        condition = None
+        for order, value in reversed(list(zip(ordering, values))):
+            attr = order.lstrip("-")
+            lookup = "lt" if order.startswith("-") else "gt"
+            following = Q(**{f'{attr}__{lookup}': value})
+            condition = following if condition is None \
+                else following | (Q(**{attr: value}) & condition)
+        attr = ordering[0].lstrip("-")
+        lookup = "lte" if ordering[0].startswith("-") else "gte"
+        return Q(**{f'{attr}__{lookup}': values[0]}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        ordering = self.reverse_ordering(self.ordering) if reverse \
+            else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self.get_position_filter(
+                ordering,
+                self.get_position_values(queryset.model, current_position),
+            ))
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering)
+        else:
+            following_position = None
+
+        has_current = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = \
+                has_current, following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next, self.has_previous = \
+                following_position is not None, has_current
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) \
+                and self.template is not None:
+            self.display_page_controls = True
+        return self.page
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from rest_framework.relations import reverse
+from api.utils.url_templates import reverse
 
 from api.serializers import custom_fields
 from api.serializers import custom_classes
@@ -24,11 +24,13 @@ class CustomCategoryElementTreeHMS(custom_classes.CustomTreeHMS):
     category = custom_fields.CategoryPKRF()
     parent = custom_fields.CustomCategoryElementParentPKRF(allow_null=True)
 
+    reverse_kwargs_related = ("category",)
+
     @classmethod
     def get_reverse_kwargs(cls, obj):
         return {
-            "ws_pk": obj.category.workspace.pk,
-            "cat_pk": obj.category.pk,
+            "ws_pk": obj.category.workspace_id,
+            "cat_pk": obj.category_id,
             "pk": obj.pk,
         }
 
@@ -43,7 +45,7 @@ class CategorySerializer(workspace_serializers.CustomWsTreeHMS):
         return reverse(
             "api:category-comment-list",
             kwargs={
-                "ws_pk": obj.workspace.pk,
+                "ws_pk": obj.workspace_id,
                 "cat_pk": obj.pk
             },
             request=self.context["request"],)
@@ -52,7 +54,7 @@ class CategorySerializer(workspace_serializers.CustomWsTreeHMS):
         return reverse(
             "api:project-list",
             kwargs={
-                "ws_pk": obj.workspace.pk,
+                "ws_pk": obj.workspace_id,
                 "cat_pk": obj.pk
             },
             request=self.context["request"],)
@@ -61,19 +63,24 @@ class CategorySerializer(workspace_serializers.CustomWsTreeHMS):
         return reverse(
             "api:task-list",
             kwargs={
-                "ws_pk": obj.workspace.pk,
+                "ws_pk": obj.workspace_id,
                 "cat_pk": obj.pk
             },
             request=self.context["request"],)
 
     class Meta:
         model = core_models.Category
+        list_serializer_class = custom_classes.CustomTreeListSerializer
         fields = [
             "url", "id", "name", "description", "workspace", "parent",
             "created_by", "created_at", "updated_at",
             "parent_url", "children_url",
             "comment_list", "project_list", "task_list",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+            "parent_url": ["parent"],
+        }
 
 
 class CategoryCommentSerializer(CustomCategoryElementTreeHMS):
@@ -81,8 +88,14 @@ class CategoryCommentSerializer(CustomCategoryElementTreeHMS):
 
     class Meta:
         model = core_models.CategoryComment
+        list_serializer_class = custom_classes.CustomTreeListSerializer
         fields = [
             "url", "id", "content", "category", "parent",
             "created_by", "created_at", "updated_at",
             "parent_url", "children_url",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+            "url": ["category"],
+            "parent_url": ["parent__category"],
+        }
@@ -1,13 +1,20 @@
+import functools
 import re
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.exceptions import ValidationError as DrfVE
-from rest_framework.relations import reverse
+from api.utils.url_templates import reverse
+from rest_framework.utils import model_meta
 from django.db import IntegrityError, transaction
+from django.db import models as djm
 from django.core.exceptions import ValidationError as DjVE
 
 from api.serializers import custom_fields
 
 
+CAMEL_CASE_BOUNDARY = re.compile(r'(?<!^)(?=[A-Z])')
+
+
 class CustomBaseHMS(serializers.HyperlinkedModelSerializer):
     """
     Custom base HyperlinkedModelSerializer which implements the following
@@ -15,26 +22,78 @@ class CustomBaseHMS(serializers.HyperlinkedModelSerializer):
     - create and updated methods that run model's full_clean
       - trap django exceptions (`ValidationError`, `IntegrityError`)
       - raise rest_framework `ValidationError`
+      - create method validates before inserting the instance once
       - update method rolls back django's atomic db transaction in case of error
+    - sparse fieldsets: read requests render only the comma separated fields
+      of `fields` query param, and not those of `omit` query param
     """
 
     created_by = serializers.ReadOnlyField(source="created_by.username")
 
-    def create(self, validated_data):
+    @classmethod
+    def get_requested_fields(cls, request):
+        """
+        Returns `Meta.fields` restricted by `fields` and `omit` query params
+        of a read request. Unknown field names are ignored.
+        """
+        fields = list(cls.Meta.fields)
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+        requested = request.query_params.get("fields", "")
+        if requested:
+            requested = {name.strip() for name in requested.split(",")}
+            fields = [name for name in fields if name in requested]
+        omitted = request.query_params.get("omit", "")
+        if omitted:
+            omitted = {name.strip() for name in omitted.split(",")}
+            fields = [name for name in fields if name not in omitted]
+        return fields
+
+    def get_field_names(self, declared_fields, info):
+        """
+        Fields which are not requested are neither built nor rendered.
+        """
+        field_names = super().get_field_names(declared_fields, info)
+        requested = self.get_requested_fields(self.context.get("request"))
+        return [name for name in field_names if name in requested]
+
+    def get_instance(self, validated_data):
+        """
+        Returns an unsaved instance for validated data with `created_by` set,
+        and the values of its many to many fields to set once it is saved.
+        """
         user = self.context["request"].user
         validated_data = {
             **validated_data,
             "created_by": user,
         }
-        with transaction.atomic(savepoint=True, durable=False):
+        serializers.raise_errors_on_nested_writes(
+            "create", self, validated_data)
+        many_to_many = {}
+        for field_name, relation_info in model_meta.get_field_info(
+                self.Meta.model).relations.items():
+            if relation_info.to_many and field_name in validated_data:
+                many_to_many[field_name] = validated_data.pop(field_name)
+        return self.Meta.model(**validated_data), many_to_many
+
+    def create(self, validated_data):
+        """
+        Validates the instance with model's `full_clean` before inserting it,
+        so a valid instance (and its many to many relations) is written once.
+        """
+        instance, many_to_many = self.get_instance(validated_data)
+        try:
+            instance.full_clean()
+        except DjVE as e:
+            raise DrfVE(e)
+        with transaction.atomic():
             try:
-                instance_tmp = super().create(validated_data)
-                instance_tmp.full_clean()
-            except (DjVE, IntegrityError) as e:
+                instance.save(force_insert=True)
+            except IntegrityError as e:
                 raise DrfVE(e)
-            finally:
-                transaction.set_rollback(True)
-        return super().create(validated_data)
+            for field_name, value in many_to_many.items():
+                getattr(instance, field_name).set(value)
+        return instance
 
     def update(self, instance, validated_data):
         user = self.context["request"].user
@@ -58,6 +117,24 @@ class CustomBaseHMS(serializers.HyperlinkedModelSerializer):
                     return instance
 
 
+class CustomTreeListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer for CustomTreeHMS derived serializers.
+
+    Preloads descendants of all serialized objects in one query for
+    `children_url` (see `TreeMixin.get_children_forest`).
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, djm.manager.BaseManager):
+            data = data.all()
+        data = list(data)
+        if "children_url" in self.child.fields:
+            self.child.children_forest = self.child.Meta.model\
+                .get_children_forest(data, self.child.reverse_kwargs_related)
+        return super().to_representation(data)
+
+
 class CustomTreeHMS(CustomBaseHMS):
     """
     Base HyperlinkedModelSerializer for tree based model serializers to create
@@ -68,7 +145,12 @@ class CustomTreeHMS(CustomBaseHMS):
         - parent_url
         - children_url
     - get_reverse_kwargs() method needs to be updated for derived classes
-      based on model
+      based on model, along with `reverse_kwargs_related`, the relations it
+      reads, which are joined when loading children (`Meta.select_related`
+      of `parent_url` joins them on `parent`)
+    - detail view name of the model is formatted into `view_name_format`
+    - derived classes set `Meta.list_serializer_class` to
+      CustomTreeListSerializer to preload children of listed objects
     """
 
     parent_url = serializers.SerializerMethodField(read_only=True,
@@ -76,41 +158,43 @@ class CustomTreeHMS(CustomBaseHMS):
     children_url = serializers.SerializerMethodField(read_only=True,
                                                      allow_null=True,)
 
+    view_name_format = 'api:{}-detail'
+    reverse_kwargs_related = ("project",)
+
     @classmethod
     def get_reverse_kwargs(cls, obj):
         return {
-            "ws_pk": obj.project.workspace.pk,
-            "cat_pk": obj.project.category.pk,
-            "pr_pk": obj.project.pk,
+            "ws_pk": obj.project.workspace_id,
+            "cat_pk": obj.project.category_id,
+            "pr_pk": obj.project_id,
             "pk": obj.pk,
         }
 
     @classmethod
-    def _get_children_url(cls, obj, request, view_name):
+    def _build_children_url(cls, children, request, view_name):
         result = {}
-        children = obj.get_children(obj)
-        if children:
-            for k, v in children.items():
-                result[str(k.pk)] = {}
-                if k:
-                    result[str(k.pk)]["url"] = reverse(
-                        view_name,
-                        kwargs=cls.get_reverse_kwargs(k),
-                        request=request,
-                    )
-                if v:
-                    result[str(k.pk)]["children_url"] \
-                        = cls._get_children_url(k, request, view_name)
+        for k, v in children.items():
+            result[str(k.pk)] = {
+                "url": reverse(
+                    view_name,
+                    kwargs=cls.get_reverse_kwargs(k),
+                    request=request,
+                ),
+            }
+            if v:
+                result[str(k.pk)]["children_url"] = cls._build_children_url(
+                    v, request, view_name)
         return result
 
-    def _get_view_name(self):
-        pattern = re.compile(r'(?<!^)(?=[A-Z])')
-        view_name_pre = self.Meta.model.__name__
-        view_name_pre = pattern.sub('-', view_name_pre).lower()
-        return f'api:{view_name_pre}-detail'
+    @classmethod
+    @functools.cache
+    def _get_view_name(cls):
+        view_name_pre = cls.Meta.model.__name__
+        view_name_pre = CAMEL_CASE_BOUNDARY.sub('-', view_name_pre).lower()
+        return cls.view_name_format.format(view_name_pre)
 
     def get_parent_url(self, obj):
-        if obj.parent:
+        if obj.parent_id:
             return reverse(
                 self._get_view_name(),
                 kwargs=self.get_reverse_kwargs(obj.parent),
@@ -118,6 +202,19 @@ class CustomTreeHMS(CustomBaseHMS):
         return None
 
     def get_children_url(self, obj):
-        return self._get_children_url(
-            obj, self.context["request"], self._get_view_name(),
+        """
+        Returns nested children urls of an object.
+
+        Children are taken from the descendants preloaded by
+        `CustomTreeListSerializer` when serializing a list, or loaded in one
+        query otherwise, with the relations their reverse kwargs read (e.g.
+        a child task may be in an other project than its parent).
+        """
+        children_forest = getattr(self, "children_forest", None)
+        if children_forest is None or obj.pk not in children_forest:
+            children_forest = self.Meta.model.get_children_forest(
+                [obj], self.reverse_kwargs_related)
+        return self._build_children_url(
+            children_forest[obj.pk], self.context["request"],
+            self._get_view_name(),
         )
@@ -1,10 +1,26 @@
 from rest_framework import serializers
-from rest_framework.relations import reverse
+from api.utils.url_templates import reverse
 
 from core import models as core_models
 
 
-class WorkspacePKRF(serializers.PrimaryKeyRelatedField):
+class PreloadedPKRF(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField taking objects from `preloaded_objects` of the
+    serializer context (objects by pk, by field name) before querying them,
+    see `BulkActionsMixin.get_preloaded_objects`.
+    Fields of many relations use the name of their `ManyRelatedField`.
+    """
+
+    def to_internal_value(self, data):
+        field_name = self.field_name or self.parent.field_name
+        preloaded = self.context.get("preloaded_objects", {}).get(field_name)
+        if preloaded is not None and type(data) is int and data in preloaded:
+            return preloaded[data]
+        return super().to_internal_value(data)
+
+
+class WorkspacePKRF(PreloadedPKRF):
     """
     Workspace PrimaryKeyRelatedField to be used in all model serializers
     with workspace field.
@@ -26,7 +42,7 @@ class WorkspacePKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class TagPKRF(serializers.PrimaryKeyRelatedField):
+class TagPKRF(PreloadedPKRF):
     """
     Tag PrimaryKeyRelatedField to be used in all model serializers
     with tag field.
@@ -48,7 +64,7 @@ class TagPKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class PriorityPKRF(serializers.PrimaryKeyRelatedField):
+class PriorityPKRF(PreloadedPKRF):
     """
     Priority PrimaryKeyRelatedField to be used in all model serializers
     with priority field.
@@ -70,7 +86,7 @@ class PriorityPKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class StatusPKRF(serializers.PrimaryKeyRelatedField):
+class StatusPKRF(PreloadedPKRF):
     """
     Status PrimaryKeyRelatedField to be used in all model serializers
     with status field.
@@ -92,7 +108,7 @@ class StatusPKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class CategoryPKRF(serializers.PrimaryKeyRelatedField):
+class CategoryPKRF(PreloadedPKRF):
     """
     Category PrimaryKeyRelatedField to be used in all model serializers
     with category field.
@@ -114,7 +130,7 @@ class CategoryPKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class ProjectPKRF(serializers.PrimaryKeyRelatedField):
+class ProjectPKRF(PreloadedPKRF):
     """
     Project PrimaryKeyRelatedField to be used in all model serializers
     with project field.
@@ -136,7 +152,7 @@ class ProjectPKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class TaskPKRF(serializers.PrimaryKeyRelatedField):
+class TaskPKRF(PreloadedPKRF):
     """
     Task PrimaryKeyRelatedField to be used in all model serializers
     with task field.
@@ -158,7 +174,7 @@ class TaskPKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class CustomWorkspaceElementParentPKRF(serializers.PrimaryKeyRelatedField):
+class CustomWorkspaceElementParentPKRF(PreloadedPKRF):
     def get_queryset(self):
         request = self.context.get("request", None)
         request_kwargs = request.parser_context.get("kwargs")
@@ -168,7 +184,7 @@ class CustomWorkspaceElementParentPKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class CustomCategoryElementParentPKRF(serializers.PrimaryKeyRelatedField):
+class CustomCategoryElementParentPKRF(PreloadedPKRF):
     def get_queryset(self):
         request = self.context.get("request", None)
         request_kwargs = request.parser_context.get("kwargs")
@@ -178,7 +194,7 @@ class CustomCategoryElementParentPKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class CustomProjectElementParentPKRF(serializers.PrimaryKeyRelatedField):
+class CustomProjectElementParentPKRF(PreloadedPKRF):
     def get_queryset(self):
         request = self.context.get("request", None)
         request_kwargs = request.parser_context.get("kwargs")
@@ -188,7 +204,7 @@ class CustomProjectElementParentPKRF(serializers.PrimaryKeyRelatedField):
         )
 
 
-class CustomTaskElementParentPKRF(serializers.PrimaryKeyRelatedField):
+class CustomTaskElementParentPKRF(PreloadedPKRF):
     def get_queryset(self):
         request = self.context.get("request", None)
         request_kwargs = request.parser_context.get("kwargs")
@@ -213,7 +229,7 @@ class CustomWsPkHIF(serializers.HyperlinkedIdentityField):
 
     def get_url(self, obj, view_name, request, format):
         url_kwargs = {
-            "ws_pk": obj.workspace.pk,
+            "ws_pk": obj.workspace_id,
             "pk": obj.pk,
         }
         return reverse(view_name, kwargs=url_kwargs, request=request, format=format)
@@ -239,8 +255,8 @@ class CustomCatPkHIF(serializers.HyperlinkedIdentityField):
 
     def get_url(self, obj, view_name, request, format):
         url_kwargs = {
-            "ws_pk": obj.category.workspace.pk,
-            "cat_pk": obj.category.pk,
+            "ws_pk": obj.category.workspace_id,
+            "cat_pk": obj.category_id,
             "pk": obj.pk,
         }
         return reverse(view_name, kwargs=url_kwargs, request=request, format=format)
@@ -265,9 +281,9 @@ class CustomPrPkHIF(serializers.HyperlinkedIdentityField):
 
     def get_url(self, obj, view_name, request, format):
         url_kwargs = {
-            "ws_pk": obj.project.workspace.pk,
-            "cat_pk": obj.project.category.pk,
-            "pr_pk": obj.project.pk,
+            "ws_pk": obj.project.workspace_id,
+            "cat_pk": obj.project.category_id,
+            "pr_pk": obj.project_id,
             "pk": obj.pk,
         }
         return reverse(view_name, kwargs=url_kwargs, request=request, format=format)
@@ -293,9 +309,9 @@ class CustomTaskPkHIF(serializers.HyperlinkedIdentityField):
 
     def get_url(self, obj, view_name, request, format):
         url_kwargs = {
-            "ws_pk": obj.task.workspace.pk,
-            "cat_pk": obj.task.category.pk,
-            "task_pk": obj.task.pk,
+            "ws_pk": obj.task.workspace_id,
+            "cat_pk": obj.task.category_id,
+            "task_pk": obj.task_id,
             "pk": obj.pk,
         }
         return reverse(view_name, kwargs=url_kwargs, request=request, format=format)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from rest_framework.relations import reverse
+from api.utils.url_templates import reverse
 
 from api.serializers import custom_fields
 from api.serializers import custom_classes
@@ -38,13 +38,14 @@ class CustomProjectCommentTreeHMS(custom_classes.CustomTreeHMS):
 
     project = custom_fields.ProjectPKRF()
     parent = custom_fields.CustomProjectElementParentPKRF(allow_null=True)
+    reverse_kwargs_related = ("project",)
 
     @classmethod
     def get_reverse_kwargs(cls, obj):
         return {
-            "ws_pk": obj.project.workspace.pk,
-            "cat_pk": obj.project.category.pk,
-            "pr_pk": obj.project.pk,
+            "ws_pk": obj.project.workspace_id,
+            "cat_pk": obj.project.category_id,
+            "pr_pk": obj.project_id,
             "pk": obj.pk,
         }
 
@@ -58,8 +59,8 @@ class ProjectSerializer(CustomProjectTreeHMS):
         return reverse(
             "api:project-comment-list",
             kwargs={
-                "ws_pk": obj.workspace.pk,
-                "cat_pk": obj.category.pk,
+                "ws_pk": obj.workspace_id,
+                "cat_pk": obj.category_id,
                 "pr_pk": obj.pk,
             },
             request=self.context["request"],)
@@ -68,14 +69,15 @@ class ProjectSerializer(CustomProjectTreeHMS):
         return reverse(
             "api:project-task-list",
             kwargs={
-                "ws_pk": obj.workspace.pk,
-                "cat_pk": obj.category.pk,
+                "ws_pk": obj.workspace_id,
+                "cat_pk": obj.category_id,
                 "pr_pk": obj.pk,
             },
             request=self.context["request"],)
 
     class Meta:
         model = core_models.Project
+        list_serializer_class = custom_classes.CustomTreeListSerializer
         fields = [
             "url", "id", "uuid", "title", "detail", "workspace", "category",
             "tags", "status", "priority", "parent", "is_visible",
@@ -85,6 +87,14 @@ class ProjectSerializer(CustomProjectTreeHMS):
             "created_by", "created_at", "updated_at",
             "parent_url", "children_url", "comment_list", "task_list",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+            "url": ["category"],
+            "parent_url": ["parent__category"],
+        }
+        prefetch_related = {
+            "tags": ["tags"],
+        }
 
 
 class ProjectCommentSerializer(CustomProjectCommentTreeHMS):
@@ -92,8 +102,14 @@ class ProjectCommentSerializer(CustomProjectCommentTreeHMS):
 
     class Meta:
         model = core_models.ProjectComment
+        list_serializer_class = custom_classes.CustomTreeListSerializer
         fields = [
             "url", "id", "content", "project", "parent",
             "created_by", "created_at", "updated_at",
             "parent_url", "children_url",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+            "url": ["project"],
+            "parent_url": ["parent__project"],
+        }
@@ -1,6 +1,5 @@
-import re
 from rest_framework import serializers
-from rest_framework.relations import reverse
+from api.utils.url_templates import reverse
 
 from api.serializers import custom_fields
 from api.serializers import custom_classes
@@ -36,24 +35,21 @@ class CustomProjectTaskTreeHMS(CustomTaskTreeHMS):
     - Implements
         - methods:
             - get_reverse_kwargs() for CustomTreeHMS
-            - _get_view_name() customized for urls for project tasks view
+        - `view_name_format` customized for urls for project tasks view
     """
 
+    view_name_format = 'api:project-{}-detail'
+    reverse_kwargs_related = ("project",)
+
     @classmethod
     def get_reverse_kwargs(cls, obj):
         return {
-            "ws_pk": obj.project.workspace.pk,
-            "cat_pk": obj.project.category.pk,
-            "pr_pk": obj.project.pk,
+            "ws_pk": obj.project.workspace_id,
+            "cat_pk": obj.project.category_id,
+            "pr_pk": obj.project_id,
             "pk": obj.pk,
         }
 
-    def _get_view_name(self):
-        pattern = re.compile(r'(?<!^)(?=[A-Z])')
-        view_name_pre = self.Meta.model.__name__
-        view_name_pre = pattern.sub('-', view_name_pre).lower()
-        return f'api:project-{view_name_pre}-detail'
-
 
 class CustomTaskCommentTreeHMS(custom_classes.CustomTreeHMS):
     """
@@ -68,12 +64,14 @@ class CustomTaskCommentTreeHMS(custom_classes.CustomTreeHMS):
     task = custom_fields.TaskPKRF()
     parent = custom_fields.CustomTaskElementParentPKRF(allow_null=True)
 
+    reverse_kwargs_related = ("task",)
+
     @classmethod
     def get_reverse_kwargs(cls, obj):
         return {
-            "ws_pk": obj.task.workspace.pk,
-            "cat_pk": obj.task.category.pk,
-            "task_pk": obj.task.pk,
+            "ws_pk": obj.task.workspace_id,
+            "cat_pk": obj.task.category_id,
+            "task_pk": obj.task_id,
             "pk": obj.pk,
         }
 
@@ -86,14 +84,15 @@ class ProjectTaskSerializer(CustomProjectTaskTreeHMS):
         return reverse(
             "api:task-comment-list",
             kwargs={
-                "ws_pk": obj.workspace.pk,
-                "cat_pk": obj.category.pk,
+                "ws_pk": obj.workspace_id,
+                "cat_pk": obj.category_id,
                 "task_pk": obj.pk,
             },
             request=self.context["request"],)
 
     class Meta:
         model = core_models.Task
+        list_serializer_class = custom_classes.CustomTreeListSerializer
         fields = [
             "url", "id", "uuid", "title", "detail",
             "workspace", "category", "project",
@@ -104,6 +103,14 @@ class ProjectTaskSerializer(CustomProjectTaskTreeHMS):
             "created_by", "created_at", "updated_at",
             "parent_url", "children_url", "comment_list",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+            "url": ["project"],
+            "parent_url": ["parent__project"],
+        }
+        prefetch_related = {
+            "tags": ["tags"],
+        }
 
 
 class TaskSerializer(CustomTaskTreeHMS):
@@ -114,14 +121,15 @@ class TaskSerializer(CustomTaskTreeHMS):
         return reverse(
             "api:task-comment-list",
             kwargs={
-                "ws_pk": obj.workspace.pk,
-                "cat_pk": obj.category.pk,
+                "ws_pk": obj.workspace_id,
+                "cat_pk": obj.category_id,
                 "task_pk": obj.pk,
             },
             request=self.context["request"],)
 
     class Meta:
         model = core_models.Task
+        list_serializer_class = custom_classes.CustomTreeListSerializer
         fields = [
             "url", "id", "uuid", "title", "detail",
             "workspace", "category", "project",
@@ -132,6 +140,14 @@ class TaskSerializer(CustomTaskTreeHMS):
             "created_by", "created_at", "updated_at",
             "parent_url", "children_url", "comment_list",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+            "url": ["category"],
+            "parent_url": ["parent__category"],
+        }
+        prefetch_related = {
+            "tags": ["tags"],
+        }
 
 
 class TaskCommentSerializer(CustomTaskCommentTreeHMS):
@@ -139,8 +155,14 @@ class TaskCommentSerializer(CustomTaskCommentTreeHMS):
 
     class Meta:
         model = core_models.TaskComment
+        list_serializer_class = custom_classes.CustomTreeListSerializer
         fields = [
             "url", "id", "content", "task", "parent",
             "created_by", "created_at", "updated_at",
             "parent_url", "children_url",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+            "url": ["task"],
+            "parent_url": ["parent__task"],
+        }
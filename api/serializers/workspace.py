@@ -1,6 +1,6 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from rest_framework.relations import reverse
+from api.utils.url_templates import reverse
 
 from api.serializers import custom_fields
 from api.serializers import custom_classes
@@ -30,10 +30,12 @@ class CustomWsTreeHMS(custom_classes.CustomTreeHMS):
     workspace = custom_fields.WorkspacePKRF()
     parent = custom_fields.CustomWorkspaceElementParentPKRF(allow_null=True)
 
+    reverse_kwargs_related = ()
+
     @classmethod
     def get_reverse_kwargs(cls, obj):
         return {
-            "ws_pk": obj.workspace.pk,
+            "ws_pk": obj.workspace_id,
             "pk": obj.pk,
         }
 
@@ -110,6 +112,9 @@ class WorkspaceSerializer(custom_classes.CustomBaseHMS):
             "tag_list", "priority_list", "status_list", "category_list",
             "comment_list",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+        }
 
 
 class WorkspaceCommentSerializer(CustomWsTreeHMS):
@@ -117,11 +122,16 @@ class WorkspaceCommentSerializer(CustomWsTreeHMS):
 
     class Meta:
         model = core_models.WorkspaceComment
+        list_serializer_class = custom_classes.CustomTreeListSerializer
         fields = [
             "url", "id", "content", "workspace", "parent",
             "created_by", "created_at", "updated_at",
             "parent_url", "children_url",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+            "parent_url": ["parent"],
+        }
 
 
 class TagSerializer(CustomWsHMS):
@@ -133,6 +143,9 @@ class TagSerializer(CustomWsHMS):
             "url", "id", "name", "workspace",
             "created_by", "created_at", "updated_at"
         ]
+        select_related = {
+            "created_by": ["created_by"],
+        }
 
 
 class PrioritySerializer(CustomWsHMS):
@@ -144,6 +157,9 @@ class PrioritySerializer(CustomWsHMS):
             "url", "id", "name", "description", "order", "workspace",
             "created_by", "created_at", "updated_at"
         ]
+        select_related = {
+            "created_by": ["created_by"],
+        }
 
 
 class StatusSerializer(CustomWsHMS):
@@ -155,5 +171,8 @@ class StatusSerializer(CustomWsHMS):
             "url", "id", "name", "description", "order", "workspace",
             "created_by", "created_at", "updated_at",
         ]
+        select_related = {
+            "created_by": ["created_by"],
+        }
 
 
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import models as core_models
+from api.utils import response_cache
+
+
+WORKSPACE_CACHED_MODELS = [
+    core_models.Category,
+    core_models.Tag,
+    core_models.Priority,
+    core_models.Status,
+]
+
+
+@receiver(post_save, dispatch_uid="api_response_cache_on_save")
+@receiver(post_delete, dispatch_uid="api_response_cache_on_delete")
+def bump_response_cache_generation(sender, instance, **kwargs):
+    """
+    Invalidate cached responses of the scope of a changed object: workspaces
+    of its owner for a workspace (and everything in a deleted workspace),
+    its workspace for categories, tags, priorities and statuses.
+    """
+    if sender is core_models.Workspace:
+        response_cache.bump_generation("user", instance.created_by_id)
+        response_cache.bump_generation("workspace", instance.pk)
+    elif sender in WORKSPACE_CACHED_MODELS:
+        response_cache.bump_generation("workspace", instance.workspace_id)
@@ -170,7 +170,7 @@ class ProjectApiAuthAndCrudTests(ProjectApiFullSetupTestClass):
             cat_pk_seq=[self.cat_1_project_1.category.pk])
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == cat_1_serializers.data
+        assert response.data["results"] == cat_1_serializers.data
         assert response_1.data == project_1_serializer.data[0]
 
     def test_project_create_post(self):
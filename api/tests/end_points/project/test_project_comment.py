@@ -202,7 +202,7 @@ class ProjectCommentApiAuthAndCrudTests(ProjectCommentApiFullSetupTestClass):
             pr_pk_seq=[self.pr_1_comment_1.project.pk])
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == pr_1_serializers.data
+        assert response.data["results"] == pr_1_serializers.data
         assert response_1.data == comment_1_serializer.data[0]
 
     def test_comment_create_post(self):
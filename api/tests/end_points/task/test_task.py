@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.exceptions import status
 from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework.request import Request
@@ -209,7 +211,7 @@ class TaskApiAuthAndCrudTests(TaskApiFullSetupTestClass):
             cat_pk_seq=[self.cat_1_task_1.category.pk])
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == cat_1_serializers.data
+        assert response.data["results"] == cat_1_serializers.data
         assert response_1.data == task_1_serializer.data[0]
 
     def test_task_create_post(self):
@@ -233,6 +235,58 @@ class TaskApiAuthAndCrudTests(TaskApiFullSetupTestClass):
         assert response.status_code == status.HTTP_201_CREATED
         assert retrieved_data.exists()
 
+    def test_task_create_post_inserts_once(self):
+        """
+        Test task create post with tags inserts the task and its tags once.
+        """
+        tag = core_models.Tag.objects.create(
+            name="tag tmp",
+            workspace=self.ws_1_cat_1.workspace,
+            created_by=self.user,
+        )
+        data = {
+            "title": "task tmp",
+            "workspace": self.ws_1_cat_1.workspace.pk,
+            "category": self.ws_1_cat_1.pk,
+            "tags": [tag.pk],
+            "parent": "",
+        }
+        url = reverse(self.view_name_list,
+                      kwargs={
+                          "ws_pk": self.cat_1_task_1.category.workspace.pk,
+                          "cat_pk": self.cat_1_task_1.category.pk,
+                      })
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data)
+        inserts = [query["sql"] for query in queries.captured_queries
+                   if query["sql"].startswith("INSERT")]
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(inserts) == 2
+        assert list(core_models.Task.objects.get(
+            title="task tmp").tags.all()) == [tag]
+
+    def test_task_create_post_invalid_inserts_nothing(self):
+        """
+        Test invalid task create post is rejected before inserting.
+        """
+        data = {
+            "title": "task tmp",
+            "workspace": self.ws_1_cat_1.workspace.pk,
+            "category": self.ws_1_cat_1.pk,
+            "parent": self.cat_1_task_1.pk,
+            "is_visible": False,
+        }
+        url = reverse(self.view_name_list,
+                      kwargs={
+                          "ws_pk": self.cat_1_task_1.category.workspace.pk,
+                          "cat_pk": self.cat_1_task_1.category.pk,
+                      })
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not [query for query in queries.captured_queries
+                    if query["sql"].startswith("INSERT")]
+
     def test_task_update_patch(self):
         """Test task update using patch."""
         data = {
@@ -502,3 +556,259 @@ class TaskApiTreeTests(TaskApiFullSetupTestClass):
                       })
         response = self.client.put(url, data)
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TaskApiBulkTests(TaskApiFullSetupTestClass):
+    """
+    Test bulk create, update and delete of tasks.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("api:task-bulk", kwargs={
+            "ws_pk": self.ws_1_cat_1.workspace.pk,
+            "cat_pk": self.ws_1_cat_1.pk,
+        })
+
+    def get_data(self, title, **kwargs):
+        return {
+            "title": title,
+            "workspace": self.ws_1_cat_1.workspace.pk,
+            "category": self.ws_1_cat_1.pk,
+            "parent": None,
+            **kwargs,
+        }
+
+    def test_bulk_create(self):
+        """
+        Test tasks and their tags are inserted with one query each.
+        """
+        tag = core_models.Tag.objects.create(
+            name="tag tmp",
+            workspace=self.ws_1_cat_1.workspace,
+            created_by=self.user,
+        )
+        data = [
+            self.get_data("bulk 1", tags=[tag.pk]),
+            self.get_data("bulk 2", tags=[tag.pk],
+                          parent=self.cat_1_task_1.pk),
+            self.get_data("bulk 3"),
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format="json")
+        inserts = [query["sql"] for query in queries.captured_queries
+                   if query["sql"].startswith("INSERT")]
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(inserts) == 2
+        assert [task["title"] for task in response.data] \
+            == ["bulk 1", "bulk 2", "bulk 3"]
+        assert [task["tags"] for task in response.data] \
+            == [[tag.pk], [tag.pk], []]
+        task = core_models.Task.objects.get(title="bulk 2")
+        assert task.tree_path == f'/{self.cat_1_task_1.pk}/'
+        assert list(task.tags.all()) == [tag]
+
+    def test_bulk_create_errors_by_index(self):
+        data = [
+            self.get_data("bulk 1"),
+            self.get_data("bulk 2", parent=self.cat_1_task_1.pk,
+                          is_visible=False),
+            self.get_data(""),
+        ]
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == {}
+        assert "title" in response.data[2]
+        assert not core_models.Task.objects.filter(
+            title__startswith="bulk").exists()
+        data[2] = self.get_data("bulk 3")
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == {}
+        assert "Visibility should be same as of parent's." \
+            in response.data[1]["non_field_errors"]
+        assert response.data[2] == {}
+        assert not core_models.Task.objects.filter(
+            title__startswith="bulk").exists()
+
+    def test_bulk_update(self):
+        """
+        Test tasks without moves are updated with one UPDATE.
+        """
+        data = [
+            {"id": self.cat_1_task_1.pk, "title": "bulk 1"},
+            {"id": self.cat_1_task_2.pk, "title": "bulk 2"},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, data, format="json")
+        updates = [query["sql"] for query in queries.captured_queries
+                   if query["sql"].startswith("UPDATE")]
+        assert response.status_code == status.HTTP_200_OK
+        assert len(updates) == 1
+        assert [task["title"] for task in response.data] \
+            == ["bulk 1", "bulk 2"]
+        task = core_models.Task.objects.get(pk=self.cat_1_task_1.pk)
+        assert task.title == "bulk 1"
+        assert task.updated_at > self.cat_1_task_1.updated_at
+
+    def test_bulk_update_cascades(self):
+        """
+        Test visibility change of a root task cascades to its children.
+        """
+        child = core_models.Task.objects.create(
+            title="child",
+            workspace=self.ws_1_cat_1.workspace,
+            category=self.ws_1_cat_1,
+            parent=self.cat_1_task_1,
+            created_by=self.user,
+        )
+        data = [
+            {"id": self.cat_1_task_1.pk, "is_visible": False},
+            {"id": self.cat_1_task_2.pk, "title": "bulk 2"},
+        ]
+        response = self.client.patch(self.url, data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        child.refresh_from_db()
+        assert not child.is_visible
+
+    def test_bulk_update_rejects_cycle(self):
+        """
+        Test parents are validated as they are after the whole batch, so that
+        swapping parents of two tasks is rejected.
+        """
+        task_1, task_2 = self.cat_1_task_1, self.cat_1_task_2
+        data = [
+            {"id": task_1.pk, "parent": task_2.pk},
+            {"id": task_2.pk, "parent": task_1.pk},
+        ]
+        response = self.client.patch(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        for errors in response.data:
+            assert errors["non_field_errors"] == [
+                "Parent cannot be a descendant of object itself."]
+        assert not self.get_task_query(
+            pk_seq=[task_1.pk, task_2.pk]).exclude(parent=None).exists()
+
+    def test_bulk_update_child_of_moved_parent(self):
+        """
+        Test a task saved after its parent is moved in the same batch keeps
+        the tree path of the moved parent.
+        """
+        child = core_models.Task.objects.create(
+            title="child",
+            workspace=self.ws_1_cat_1.workspace,
+            category=self.ws_1_cat_1,
+            parent=self.cat_1_task_1,
+            created_by=self.user,
+        )
+        data = [
+            {"id": self.cat_1_task_1.pk, "parent": self.cat_1_task_2.pk},
+            {"id": child.pk, "project": self.cat_1_project_1.pk},
+        ]
+        response = self.client.patch(self.url, data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        child.refresh_from_db()
+        assert child.tree_path == \
+            f'/{self.cat_1_task_2.pk}/{self.cat_1_task_1.pk}/'
+        assert core_models.Task.rebuild_tree_paths() == 0
+
+    def test_bulk_update_errors_by_index(self):
+        data = [
+            {"id": self.cat_1_task_1.pk, "title": "bulk 1"},
+            {"id": 0, "title": "bulk 2"},
+            {"title": "bulk 3"},
+        ]
+        response = self.client.patch(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == [
+            {}, {"id": ["Not found."]}, {"id": ["Not found."]},
+        ]
+        assert not core_models.Task.objects.filter(title="bulk 1").exists()
+
+    def test_bulk_queries_flat(self):
+        """
+        Test queries of bulk create and update don't grow with the number of
+        items, related objects being loaded and unique constraints checked
+        once per batch.
+        """
+        tags = [
+            core_models.Tag.objects.create(
+                name=f'tag tmp {i}',
+                workspace=self.ws_1_cat_1.workspace,
+                created_by=self.user,
+            )
+            for i in range(2)
+        ]
+        task_status = core_models.Status.objects.create(
+            name="status tmp",
+            workspace=self.ws_1_cat_1.workspace,
+            created_by=self.user,
+        )
+        counts = []
+        for size in (1, 10):
+            data = [
+                self.get_data(f'bulk {size} {i}', parent=self.cat_1_task_1.pk,
+                              tags=[tag.pk for tag in tags],
+                              status=task_status.pk)
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as create_queries:
+                response = self.client.post(self.url, data, format="json")
+            assert response.status_code == status.HTTP_201_CREATED
+            data = [
+                {"id": task["id"], "title": f'edit {task["title"]}',
+                 "tags": [tags[0].pk], "status": None}
+                for task in response.data
+            ]
+            with CaptureQueriesContext(connection) as update_queries:
+                response = self.client.patch(self.url, data, format="json")
+            assert response.status_code == status.HTTP_200_OK
+            counts.append((len(create_queries), len(update_queries)))
+        assert counts[0] == counts[1]
+
+    def test_bulk_unique_constraint_by_index(self):
+        """
+        Test unique constraint errors are returned at the index of items
+        conflicting with other tasks.
+        """
+        project = self.cat_1_project_1
+        task = core_models.Task.objects.create(
+            title="Unique",
+            workspace=self.ws_1_cat_1.workspace,
+            category=self.ws_1_cat_1,
+            project=project,
+            created_by=self.user,
+        )
+        data = [
+            self.get_data("bulk 1", project=project.pk),
+            self.get_data("UNIQUE", project=project.pk),
+            self.get_data("unique"),
+        ]
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == {}
+        assert "unique_lower_workspace_category_project_created_by" \
+            in response.data[1]["non_field_errors"][0]
+        assert response.data[2] == {}
+        data = [
+            {"id": task.pk, "title": "unique"},
+            {"id": self.cat_1_task_1.pk, "title": "unique",
+             "project": project.pk},
+        ]
+        response = self.client.patch(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == {}
+        assert response.data[1]["non_field_errors"]
+
+    def test_bulk_delete(self):
+        data = [self.cat_1_task_1.pk, self.cat_1_task_2.pk]
+        response = self.client.delete(self.url, data, format="json")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not self.get_task_query(pk_seq=data).exists()
+
+    def test_bulk_delete_errors_by_index(self):
+        data = [self.cat_1_task_1.pk, 0]
+        response = self.client.delete(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == [{}, {"id": ["Not found."]}]
+        assert self.get_task_query(pk_seq=[self.cat_1_task_1.pk]).exists()
@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models as core_models
+
+
+class ConditionalGetApiTests(TestCase):
+    """
+    Test list and detail endpoints answer conditional requests.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        cls.workspace = core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+        cls.tag = core_models.Tag.objects.create(
+            name="tag", workspace=cls.workspace, created_by=cls.user)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace, created_by=cls.user)
+        cls.task = core_models.Task.objects.create(
+            title="task", workspace=cls.workspace, category=cls.category,
+            created_by=cls.user)
+        cls.list_url = reverse("api:task-list", kwargs={
+            "ws_pk": cls.workspace.pk, "cat_pk": cls.category.pk})
+        cls.detail_url = reverse("api:task-detail", kwargs={
+            "ws_pk": cls.workspace.pk, "cat_pk": cls.category.pk,
+            "pk": cls.task.pk})
+        cls.tag_url = reverse("api:tag-detail", kwargs={
+            "ws_pk": cls.workspace.pk, "pk": cls.tag.pk})
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_authenticate(self.user)
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        return response["ETag"]
+
+    def test_list_not_modified(self):
+        """Unchanged list is answered with one aggregate query."""
+        etag = self.get_etag(self.list_url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url,
+                                       HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not response.content
+
+    def test_list_modified(self):
+        etag = self.get_etag(self.list_url)
+        self.task.title = "task updated"
+        self.task.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    def test_list_deleted(self):
+        core_models.Task.objects.create(
+            title="other", workspace=self.workspace, category=self.category,
+            created_by=self.user)
+        etag = self.get_etag(self.list_url)
+        core_models.Task.objects.filter(title="other").delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_list_query_params(self):
+        """Pages and query params are validated separately."""
+        etag = self.get_etag(self.list_url)
+        response = self.client.get(self.list_url, {"page_size": 1},
+                                   HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_detail_not_modified(self):
+        etag = self.get_etag(self.detail_url)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_detail_child_created(self):
+        """Tree details change with their descendants."""
+        etag = self.get_etag(self.detail_url)
+        core_models.Task.objects.create(
+            title="child", workspace=self.workspace, category=self.category,
+            parent=self.task, created_by=self.user)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["children_url"]) == 1
+
+    def test_detail_last_modified(self):
+        """Flat details are validated by their last modification too."""
+        response = self.client.get(self.tag_url)
+        last_modified = response["Last-Modified"]
+        response = self.client.get(
+            self.tag_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_other_user(self):
+        """ETags of other users don't match."""
+        etag = self.get_etag(self.list_url)
+        user = get_user_model().objects.create_user(
+            username='user-2', password='testpass123')
+        self.client.force_authenticate(user)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
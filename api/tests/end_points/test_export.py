@@ -0,0 +1,108 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models as core_models
+
+
+class ExportApiTests(TestCase):
+    """
+    Test NDJSON export of all objects of a user.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        cls.other_user = get_user_model().objects.create_user(
+            username='user-2', password='testpass123')
+        cls.workspace = core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+        cls.tag = core_models.Tag.objects.create(
+            name="tag", workspace=cls.workspace, created_by=cls.user)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace, created_by=cls.user)
+        cls.task = core_models.Task.objects.create(
+            title="task", workspace=cls.workspace, category=cls.category,
+            created_by=cls.user)
+        cls.task.tags.add(cls.tag)
+        core_models.TaskComment.objects.create(
+            content="comment", task=cls.task, created_by=cls.user)
+        core_models.Workspace.objects.create(
+            name="other workspace", created_by=cls.other_user,
+            is_default=True)
+        cls.url = reverse("api:export")
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_authenticate(self.user)
+
+    @staticmethod
+    def read_records(content):
+        return [json.loads(line) for line in content.decode().splitlines()]
+
+    def test_export(self):
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        records = self.read_records(b"".join(response.streaming_content))
+        models = [record["model"] for record in records]
+        assert models.index("workspaces") < models.index("tags") \
+            < models.index("categories") < models.index("tasks") \
+            < models.index("task_comments")
+        workspaces = [r["data"] for r in records if r["model"] == "workspaces"]
+        assert [ws["name"] for ws in workspaces] == ["workspace"]
+        tasks = [r["data"] for r in records if r["model"] == "tasks"]
+        assert tasks[0]["title"] == "task"
+        assert tasks[0]["uuid"] == str(self.task.uuid)
+        assert {"model": "tasks_tags", "data": {
+            "task_id": self.task.pk, "tag_id": self.tag.pk,
+        }} in records
+
+    def test_export_gzip(self):
+        content = b"".join(self.client.get(self.url).streaming_content)
+        response = self.client.get(self.url, {"compress": "gzip"})
+        assert response["Content-Type"] == "application/gzip"
+        assert gzip.decompress(
+            b"".join(response.streaming_content)) == content
+
+    def test_export_invalid_compress(self):
+        response = self.client.get(self.url, {"compress": "zip"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_export_command(self):
+        content = b"".join(self.client.get(self.url).streaming_content)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.ndjson.gz")
+            call_command("export_user_data", "user-1", "--gzip",
+                         "--chunk-size", "1", "--output", path)
+            with gzip.open(path) as export_file:
+                assert export_file.read() == content
+
+    def test_export_command_stdout(self):
+        """
+        Test the export is written to the command's stdout, as text if it
+        has no binary buffer.
+        """
+        content = b"".join(self.client.get(self.url).streaming_content)
+        stdout = io.StringIO()
+        call_command("export_user_data", "user-1", "--chunk-size", "1",
+                     stdout=stdout)
+        assert stdout.getvalue() == content.decode()
+        stdout = io.TextIOWrapper(io.BytesIO())
+        call_command("export_user_data", "user-1", "--gzip", stdout=stdout)
+        assert gzip.decompress(stdout.buffer.getvalue()) == content
+        with self.assertRaises(CommandError):
+            call_command("export_user_data", "user-1", "--gzip",
+                         stdout=io.StringIO())
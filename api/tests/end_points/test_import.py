@@ -0,0 +1,255 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models as core_models
+from core.signals import TREE_MODELS
+from core.utils import tree_queries
+from api.utils import export as api_export
+from api.utils import importer as api_importer
+
+
+class ImportApiTests(TestCase):
+    """
+    Test bulk import of objects into the account of a user.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        cls.other_user = get_user_model().objects.create_user(
+            username='user-2', password='testpass123')
+        cls.workspace = core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+        cls.tag = core_models.Tag.objects.create(
+            name="tag", workspace=cls.workspace, created_by=cls.user)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace, created_by=cls.user)
+        cls.child_category = core_models.Category.objects.create(
+            name="child", workspace=cls.workspace, parent=cls.category,
+            created_by=cls.user)
+        cls.project = core_models.Project.objects.create(
+            title="project", workspace=cls.workspace, category=cls.category,
+            created_by=cls.user)
+        task = None
+        for i in range(3):
+            task = core_models.Task.objects.create(
+                title=f"task {i}", workspace=cls.workspace,
+                category=cls.category, project=cls.project, parent=task,
+                created_by=cls.user)
+            task.tags.add(cls.tag)
+        core_models.TaskComment.objects.create(
+            content="comment", task=task, created_by=cls.user)
+        cls.url = reverse("api:import")
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_authenticate(self.other_user)
+
+    def get_export(self, user=None):
+        return b"".join(api_export.iter_export(user or self.user))
+
+    def post(self, content, content_type="application/x-ndjson", **extra):
+        return self.client.generic("POST", self.url, content,
+                                   content_type=content_type, **extra)
+
+    def post_csv(self, content):
+        return self.client.generic(
+            "POST", self.url + "?table=tasks", content.encode(),
+            content_type="text/csv")
+
+    def assert_tree_paths(self):
+        for model in TREE_MODELS:
+            assert tree_queries.get_stale_tree_paths(model) == {}
+
+    def test_import_export(self):
+        """An export imported into an other account is exported as a whole."""
+        response = self.post(self.get_export())
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["tasks"] == 3
+        assert response.data["tasks_tags"] == 3
+        tasks = core_models.Task.objects.filter(created_by=self.other_user)
+        assert [task.title for task in tasks.order_by("pk")] == [
+            "task 0", "task 1", "task 2"]
+        assert tasks.get(title="task 2").parent == tasks.get(title="task 1")
+        assert tasks.get(title="task 2").tags.get().created_by == \
+            self.other_user
+        self.assert_tree_paths()
+        assert len(self.get_export(self.other_user).splitlines()) == len(
+            self.get_export().splitlines())
+
+    def test_import_gzip(self):
+        response = self.post(gzip.compress(self.get_export()),
+                             HTTP_CONTENT_ENCODING="gzip")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["task_comments"] == 1
+
+    def test_import_unordered_parents(self):
+        """Children listed before their parents are inserted after them."""
+        lines = self.get_export().splitlines()
+        task_lines = [line for line in lines if b'"model":"tasks"' in line]
+        lines = [line for line in lines if line not in task_lines]
+        index = lines.index(next(
+            line for line in lines if b'"model":"tasks_tags"' in line))
+        lines[index:index] = task_lines[::-1]
+        response = self.post(b"\n".join(lines))
+        assert response.status_code == status.HTTP_201_CREATED
+        self.assert_tree_paths()
+
+    def test_import_constant_queries(self):
+        """Queries don't grow with the number of imported rows."""
+        def get_content(rows):
+            return "\n".join(
+                f'{{"model":"tasks","data":{{"id":{i},"title":"task {i}",'
+                f'"workspace_id":{self.workspace.pk},'
+                f'"category_id":{self.category.pk}}}}}'
+                for i in range(rows)).encode()
+
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.post(get_content(2))
+        with self.assertNumQueries(len(queries)):
+            response = self.post(get_content(20))
+        assert response.data["tasks"] == 20
+
+    def test_import_csv(self):
+        """CSV rows reference existing objects of the user."""
+        self.client.force_authenticate(self.user)
+        content = (
+            "id,title,workspace_id,category_id,parent_id,tags\n"
+            f"1,csv task,{self.workspace.pk},{self.category.pk},,"
+            f"{self.tag.pk}\n"
+            f"2,csv child,{self.workspace.pk},{self.category.pk},1,\n"
+        )
+        response = self.post_csv(content)
+        assert response.status_code == status.HTTP_201_CREATED
+        child = core_models.Task.objects.get(title="csv child")
+        assert child.parent.title == "csv task"
+        assert list(child.parent.tags.all()) == [self.tag]
+        self.assert_tree_paths()
+
+    def test_import_csv_columns(self):
+        """
+        Test many to many columns may come before the id column, and need an
+        id.
+        """
+        self.client.force_authenticate(self.user)
+        content = (
+            "tags,title,workspace_id,category_id,id\n"
+            f"{self.tag.pk},csv task,{self.workspace.pk},{self.category.pk},1\n"
+        )
+        response = self.post_csv(content)
+        assert response.status_code == status.HTTP_201_CREATED
+        task = core_models.Task.objects.get(title="csv task")
+        assert list(task.tags.all()) == [self.tag]
+        content = (
+            "title,workspace_id,category_id,tags\n"
+            f"csv task 2,{self.workspace.pk},{self.category.pk},{self.tag.pk}\n"
+        )
+        response = self.post_csv(content)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == ["tasks: rows with tags need an id."]
+
+    def test_import_scope_invalid(self):
+        """
+        Test references to other workspaces and children differing from
+        their parent are rejected.
+        """
+        self.client.force_authenticate(self.user)
+        workspace = core_models.Workspace.objects.create(
+            name="other workspace", created_by=self.user)
+        content = (
+            "id,title,workspace_id,category_id\n"
+            f"1,csv task,{workspace.pk},{self.category.pk}\n"
+        )
+        response = self.post_csv(content)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == [
+            "tasks: category should be from the same workspace as self "
+            "(rows [1])."]
+        content = (
+            "id,title,workspace_id,category_id,parent_id,is_visible\n"
+            f"1,csv task,{self.workspace.pk},{self.category.pk},,True\n"
+            f"2,csv child,{self.workspace.pk},{self.category.pk},1,False\n"
+        )
+        response = self.post_csv(content)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == [
+            "tasks: is_visible should be the same as parent's (rows [2])."]
+        assert not core_models.Task.objects.filter(
+            title__startswith="csv").exists()
+
+    def test_import_unknown_reference(self):
+        """References to objects of other users are rejected."""
+        content = (
+            f'{{"model":"tasks","data":{{"id":1,"title":"task",'
+            f'"workspace_id":{self.workspace.pk},'
+            f'"category_id":{self.category.pk}}}}}'
+        )
+        response = self.post(content.encode())
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not core_models.Task.objects.filter(
+            created_by=self.other_user).exists()
+
+    def test_import_invalid(self):
+        response = self.post(b"not json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = self.post(b"a,b", content_type="text/plain")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_import_fixture_command(self):
+        user = get_user_model().objects.create_user(username='user-3')
+        call_command("import_user_data", "user-3",
+                     "core/fixtures/core/sample-data.json",
+                     stdout=io.StringIO())
+        assert core_models.Workspace.objects.get(created_by=user).is_default
+        assert core_models.Task.objects.filter(created_by=user).count() == 6
+        assert core_models.Category.objects.filter(
+            created_by=user).count() == 6
+        self.assert_tree_paths()
+
+    def test_fixture_parsed_incrementally(self):
+        """
+        Test items of JSON fixtures are parsed from chunks, whatever byte
+        they are cut at, and many to many links follow their model's rows.
+        """
+
+        items = [{"model": "core.tag", "pk": 1,
+                  "fields": {"name": "t\u00e9g ]", "n": [12, -3.5e2]}},
+                 [], 1234, "x", None]
+        content = json.dumps(items, indent=1).encode()
+        for chunk_size in [1, 2, 7, 1024]:
+            assert list(api_importer.iter_json_array(
+                io.BytesIO(content), chunk_size)) == items
+        assert list(api_importer.iter_json_array(io.BytesIO(b" [ ] "))) == []
+        for content in [b"", b"{}", b"[1,", b"[1 2]", b"[1,]", b'[{"a":']:
+            with self.assertRaises(ValueError):
+                list(api_importer.iter_json_array(io.BytesIO(content), 2))
+
+        with open("core/fixtures/core/sample-data.json", "rb") as fixture:
+            keys = [key for key, row in api_importer.read_fixture(fixture)]
+        assert keys.index("tasks_tags") > max(
+            i for i, key in enumerate(keys) if key == "tasks")
+
+    def test_import_export_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.ndjson.gz")
+            call_command("export_user_data", "user-1", "--gzip",
+                         "--output", path)
+            call_command("import_user_data", "user-2", path,
+                         stdout=io.StringIO())
+        assert core_models.Task.objects.filter(
+            created_by=self.other_user).count() == 3
@@ -0,0 +1,416 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models as core_models
+
+
+class ConstantQueriesTestMixin():
+    """
+    Test mode asserting a list endpoint runs a constant number of queries
+    regardless of the number of rows it returns.
+    """
+
+    def assertConstantListQueries(self, view_name, kwargs, create_row,
+                                  rows=5):
+        url = reverse(view_name, kwargs=kwargs)
+        create_row(0)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        for i in range(1, rows):
+            create_row(i)
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data
+        if isinstance(results, dict):
+            results = results["results"]
+        assert len(results) == rows
+
+
+class QueryPlanApiTests(ConstantQueriesTestMixin, TestCase):
+    """
+    Test list endpoints apply serializers' query plans.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        cls.workspace = core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+        cls.tag = core_models.Tag.objects.create(
+            name="tag", workspace=cls.workspace, created_by=cls.user)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace, created_by=cls.user)
+        cls.project = core_models.Project.objects.create(
+            title="project", workspace=cls.workspace, category=cls.category,
+            created_by=cls.user)
+        cls.task = core_models.Task.objects.create(
+            title="task", workspace=cls.workspace, category=cls.category,
+            project=cls.project, created_by=cls.user)
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_authenticate(self.user)
+
+    def test_workspace_list(self):
+        self.workspace.delete()
+        self.assertConstantListQueries(
+            "api:workspace-list", {},
+            lambda i: core_models.Workspace.objects.create(
+                name=f"workspace {i}", created_by=self.user))
+
+    def test_tag_list(self):
+        self.tag.delete()
+        self.assertConstantListQueries(
+            "api:tag-list", {"ws_pk": self.workspace.pk},
+            lambda i: core_models.Tag.objects.create(
+                name=f"tag {i}", workspace=self.workspace,
+                created_by=self.user))
+
+    def test_status_list(self):
+        self.assertConstantListQueries(
+            "api:status-list", {"ws_pk": self.workspace.pk},
+            lambda i: core_models.Status.objects.create(
+                name=f"status {i}", workspace=self.workspace,
+                created_by=self.user))
+
+    def test_priority_list(self):
+        self.assertConstantListQueries(
+            "api:priority-list", {"ws_pk": self.workspace.pk},
+            lambda i: core_models.Priority.objects.create(
+                name=f"priority {i}", workspace=self.workspace,
+                created_by=self.user))
+
+    def test_user_list(self):
+        self.assertConstantListQueries(
+            "api:user-list", {},
+            lambda i: i and get_user_model().objects.create_user(
+                username=f"user-{i + 1}", password='testpass123'))
+
+    def create_nested(self, model, i, **kwargs):
+        """
+        Create an object nested under the last created one, so that listed
+        objects have children.
+        """
+        parent = model.objects.filter(**kwargs).order_by("pk").last()
+        if "title" in [field.name for field in model._meta.fields]:
+            kwargs["title"] = f"nested {i}"
+        elif "name" in [field.name for field in model._meta.fields]:
+            kwargs["name"] = f"nested {i}"
+        else:
+            kwargs["content"] = f"nested {i}"
+        return model.objects.create(parent=parent, created_by=self.user,
+                                    **kwargs)
+
+    def test_tree_lists(self):
+        """
+        Test tree list endpoints preload children for the whole page.
+        """
+
+        cases = (
+            ("api:workspace-comment-list", {"ws_pk": self.workspace.pk},
+             core_models.WorkspaceComment, {"workspace": self.workspace}),
+            ("api:category-comment-list",
+             {"ws_pk": self.workspace.pk, "cat_pk": self.category.pk},
+             core_models.CategoryComment, {"category": self.category}),
+            ("api:project-comment-list",
+             {"ws_pk": self.workspace.pk, "cat_pk": self.category.pk,
+              "pr_pk": self.project.pk},
+             core_models.ProjectComment, {"project": self.project}),
+            ("api:task-comment-list",
+             {"ws_pk": self.workspace.pk, "cat_pk": self.category.pk,
+              "task_pk": self.task.pk},
+             core_models.TaskComment, {"task": self.task}),
+        )
+        for view_name, kwargs, model, scope in cases:
+            self.assertConstantListQueries(
+                view_name, kwargs,
+                lambda i: self.create_nested(model, i, **scope))
+
+    def test_task_list(self):
+        self.task.delete()
+        self.assertConstantListQueries(
+            "api:task-list",
+            {"ws_pk": self.workspace.pk, "cat_pk": self.category.pk},
+            lambda i: self.create_nested(
+                core_models.Task, i, workspace=self.workspace,
+                category=self.category, project=self.project))
+
+    def test_project_task_list(self):
+        self.task.delete()
+        self.assertConstantListQueries(
+            "api:project-task-list",
+            {"ws_pk": self.workspace.pk, "cat_pk": self.category.pk,
+             "pr_pk": self.project.pk},
+            lambda i: self.create_nested(
+                core_models.Task, i, workspace=self.workspace,
+                category=self.category, project=self.project))
+
+    def test_project_list(self):
+        self.project.delete()
+        self.assertConstantListQueries(
+            "api:project-list",
+            {"ws_pk": self.workspace.pk, "cat_pk": self.category.pk},
+            lambda i: self.create_nested(
+                core_models.Project, i, workspace=self.workspace,
+                category=self.category))
+
+    def test_category_list(self):
+        self.category.delete()
+        self.assertConstantListQueries(
+            "api:category-list", {"ws_pk": self.workspace.pk},
+            lambda i: self.create_nested(
+                core_models.Category, i, workspace=self.workspace))
+
+    def test_children_url_same_in_list_and_detail(self):
+        """
+        Test preloaded children urls are same as the ones of a detail view.
+        """
+
+        for i in range(4):
+            self.create_nested(
+                core_models.Task, i, workspace=self.workspace,
+                category=self.category, project=self.project)
+        kwargs = {"ws_pk": self.workspace.pk, "cat_pk": self.category.pk}
+        response = self.client.get(reverse("api:task-list", kwargs=kwargs))
+        for task_data in response.data["results"]:
+            response_detail = self.client.get(reverse(
+                "api:task-detail", kwargs={**kwargs, "pk": task_data["id"]}))
+            assert task_data["children_url"] \
+                == response_detail.data["children_url"]
+        assert response.data["results"][0]["children_url"] != {}
+
+    def create_tasks_in_other_project(self):
+        """
+        Create a child of the task in an other project, and a grandchild in
+        the task's project.
+        """
+        self.project_2 = core_models.Project.objects.create(
+            title="project 2", workspace=self.workspace,
+            category=self.category, created_by=self.user)
+        self.child = core_models.Task.objects.create(
+            title="child", workspace=self.workspace, category=self.category,
+            project=self.project_2, parent=self.task, created_by=self.user)
+        self.grandchild = core_models.Task.objects.create(
+            title="grandchild", workspace=self.workspace,
+            category=self.category, project=self.project, parent=self.child,
+            created_by=self.user)
+
+    def get_project_task_url(self, project, task):
+        return "http://testserver" + reverse(
+            "api:project-task-detail",
+            kwargs={"ws_pk": self.workspace.pk, "cat_pk": self.category.pk,
+                    "pr_pk": project.pk, "pk": task.pk})
+
+    def test_project_task_urls_of_other_projects(self):
+        """
+        Test urls of parents and children in other projects are reversed
+        with their own project.
+        """
+
+        self.create_tasks_in_other_project()
+        response = self.client.get(
+            self.get_project_task_url(self.project, self.task))
+        assert response.data["children_url"] == {
+            str(self.child.pk): {
+                "url": self.get_project_task_url(self.project_2, self.child),
+                "children_url": {
+                    str(self.grandchild.pk): {
+                        "url": self.get_project_task_url(
+                            self.project, self.grandchild)},
+                },
+            },
+        }
+        response = self.client.get(
+            self.get_project_task_url(self.project_2, self.child))
+        assert response.data["parent_url"] \
+            == self.get_project_task_url(self.project, self.task)
+        for data in response.data["children_url"].values():
+            assert self.client.get(data["url"]).status_code \
+                == status.HTTP_200_OK
+
+
+    def test_project_task_list_same_as_detail(self):
+        """
+        Test project tasks listed with preloaded children render the same as
+        their detail views, including children and parents in other projects.
+        """
+
+        self.create_tasks_in_other_project()
+        for project in [self.project, self.project_2]:
+            response = self.client.get(reverse(
+                "api:project-task-list",
+                kwargs={"ws_pk": self.workspace.pk,
+                        "cat_pk": self.category.pk, "pr_pk": project.pk}))
+            results = response.data["results"]
+            assert results
+            for task_data in results:
+                response_detail = self.client.get(task_data["url"])
+                assert response_detail.data == task_data
+        assert results[0]["parent_url"] \
+            == self.get_project_task_url(self.project, self.task)
+        assert results[0]["children_url"] == {
+            str(self.grandchild.pk): {
+                "url": self.get_project_task_url(
+                    self.project, self.grandchild)},
+        }
+
+
+class CursorPaginationApiTests(TestCase):
+    """
+    Test list end points are paginated with a cursor ordered by
+    (`updated_at`, `id`).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        cls.workspace = core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace, created_by=cls.user)
+        for i in range(5):
+            core_models.Task.objects.create(
+                title=f"task {i}", workspace=cls.workspace,
+                category=cls.category, created_by=cls.user)
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_authenticate(self.user)
+
+    def test_pages(self):
+        """
+        Test all tasks are returned once across pages in cursor order.
+        """
+
+        url = reverse("api:task-list", kwargs={
+            "ws_pk": self.workspace.pk, "cat_pk": self.category.pk,
+        }) + "?page_size=2"
+        ids = []
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data["results"]) <= 2
+            ids += [task["id"] for task in response.data["results"]]
+            url = response.data["next"]
+        assert ids == list(core_models.Task.objects.order_by(
+            "updated_at", "id").values_list("id", flat=True))
+
+    def test_pages_of_tasks_updated_together(self):
+        """
+        Test tasks sharing `updated_at` are paged forwards and backwards by
+        their (`updated_at`, `id`) position, without offsets.
+        """
+
+        core_models.Task.objects.update(updated_at=timezone.now())
+        url = reverse("api:task-list", kwargs={
+            "ws_pk": self.workspace.pk, "cat_pk": self.category.pk,
+        }) + "?page_size=2"
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert not any("OFFSET" in query["sql"]
+                           for query in queries.captured_queries)
+            pages.append([task["id"] for task in response.data["results"]])
+            url = response.data["next"]
+        assert sum(pages, []) == list(core_models.Task.objects.order_by(
+            "id").values_list("id", flat=True))
+        response = self.client.get(response.data["previous"])
+        assert [task["id"] for task in response.data["results"]] == pages[-2]
+        response = self.client.get(response.data["previous"])
+        assert [task["id"] for task in response.data["results"]] == pages[-3]
+        assert response.data["previous"] is None
+
+    def test_invalid_cursor(self):
+        url = reverse("api:task-list", kwargs={
+            "ws_pk": self.workspace.pk, "cat_pk": self.category.pk,
+        })
+        cursor = base64.b64encode(b"p=%5B%22x%22%5D").decode()
+        response = self.client.get(url, {"cursor": cursor})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_updated_task_moves_to_end(self):
+        task = core_models.Task.objects.order_by("pk").first()
+        task.title = "updated"
+        task.save()
+        response = self.client.get(reverse("api:task-list", kwargs={
+            "ws_pk": self.workspace.pk, "cat_pk": self.category.pk,
+        }))
+        assert response.data["results"][-1]["id"] == task.pk
+
+
+class SparseFieldsetsApiTests(TestCase):
+    """
+    Test `fields` and `omit` query params restrict rendered fields.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        cls.workspace = core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace, created_by=cls.user)
+        cls.task = core_models.Task.objects.create(
+            title="task", workspace=cls.workspace, category=cls.category,
+            created_by=cls.user)
+        cls.url = reverse("api:task-list", kwargs={
+            "ws_pk": cls.workspace.pk, "cat_pk": cls.category.pk,
+        })
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_authenticate(self.user)
+
+    def test_fields(self):
+        response = self.client.get(self.url, {"fields": "id,title,status"})
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data["results"][0]) == ["id", "title", "status"]
+
+    def test_omit(self):
+        response = self.client.get(self.url, {"omit": "children_url,tags"})
+        assert response.status_code == status.HTTP_200_OK
+        result = response.data["results"][0]
+        assert "children_url" not in result
+        assert "tags" not in result
+        assert "url" in result
+
+    def test_fields_skip_queries(self):
+        """
+        Relations and children of fields not requested are not queried.
+        """
+
+        with CaptureQueriesContext(connection) as all_fields:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as sparse_fields:
+            self.client.get(self.url, {"fields": "id,title"})
+        assert len(sparse_fields) < len(all_fields)
+        sql = " ".join(query["sql"] for query in sparse_fields)
+        assert "core_task_tags" not in sql
+        assert "auth_user" not in sql
+
+    def test_fields_ignored_on_write(self):
+        response = self.client.post(self.url + "?fields=id", {
+            "title": "other",
+            "workspace": self.workspace.pk,
+            "category": self.category.pk,
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["title"] == "other"
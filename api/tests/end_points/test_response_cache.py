@@ -0,0 +1,123 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models as core_models
+
+
+class ResponseCacheApiTests(TestCase):
+    """
+    Test responses of workspace level endpoints are cached per user and
+    invalidated by changes of their workspace.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        cls.workspace = core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+        cls.other_workspace = core_models.Workspace.objects.create(
+            name="other workspace", created_by=cls.user)
+        cls.tag = core_models.Tag.objects.create(
+            name="tag", workspace=cls.workspace, created_by=cls.user)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace, created_by=cls.user)
+        cls.tag_list_url = reverse("api:tag-list", kwargs={
+            "ws_pk": cls.workspace.pk})
+        cls.category_url = reverse("api:category-detail", kwargs={
+            "ws_pk": cls.workspace.pk, "pk": cls.category.pk})
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_authenticate(self.user)
+
+    def get_names(self, url):
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        return [tag["name"] for tag in json.loads(response.content)["results"]]
+
+    def test_cached(self):
+        response = self.client.get(self.tag_list_url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.tag_list_url)
+        assert cached.status_code == status.HTTP_200_OK
+        assert cached.content == response.content
+        assert cached["Content-Type"] == response["Content-Type"]
+        assert cached["ETag"] == response["ETag"]
+
+    def test_invalidated_on_save(self):
+        assert self.get_names(self.tag_list_url) == ["tag"]
+        self.tag.name = "tag updated"
+        self.tag.save()
+        assert self.get_names(self.tag_list_url) == ["tag updated"]
+
+    def test_invalidated_on_delete(self):
+        assert self.get_names(self.tag_list_url) == ["tag"]
+        self.tag.delete()
+        assert self.get_names(self.tag_list_url) == []
+
+    def test_other_workspace_change(self):
+        """Changes in an other workspace keep the cached response."""
+        self.client.get(self.tag_list_url)
+        core_models.Tag.objects.create(
+            name="tag", workspace=self.other_workspace, created_by=self.user)
+        with self.assertNumQueries(0):
+            self.client.get(self.tag_list_url)
+
+    def test_query_string(self):
+        self.client.get(self.tag_list_url)
+        response = self.client.get(self.tag_list_url, {"fields": "name"})
+        assert list(response.data["results"][0]) == ["name"]
+
+    def test_users(self):
+        """Responses are not shared between users."""
+        self.client.get(self.tag_list_url)
+        user = get_user_model().objects.create_user(
+            username='user-2', password='testpass123')
+        self.client.force_authenticate(user)
+        assert self.get_names(self.tag_list_url) == []
+
+    def test_not_modified(self):
+        """Conditional requests are answered from the cache."""
+        etag = self.client.get(self.tag_list_url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(self.tag_list_url,
+                                       HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_category_child_created(self):
+        response = self.client.get(self.category_url)
+        assert response.data["children_url"] == {}
+        child = core_models.Category.objects.create(
+            name="child", workspace=self.workspace, parent=self.category,
+            created_by=self.user)
+        response = self.client.get(self.category_url)
+        assert list(json.loads(response.content)["children_url"]) == [
+            str(child.pk)]
+
+    def test_workspace_list(self):
+        url = reverse("api:workspace-list")
+        self.client.get(url)
+        self.workspace.name = "workspace updated"
+        self.workspace.save()
+        response = self.client.get(url)
+        assert "workspace updated" in [
+            ws["name"] for ws in json.loads(response.content)["results"]]
+
+    def test_browsable_api_not_cached(self):
+        self.client.get(self.tag_list_url, HTTP_ACCEPT="text/html")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.tag_list_url,
+                                       HTTP_ACCEPT="text/html")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) > 0
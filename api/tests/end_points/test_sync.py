@@ -0,0 +1,167 @@
+import datetime as dt
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models as core_models
+from api import views as api_views
+
+
+class SyncApiTests(TestCase):
+    """
+    Test delta sync endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        cls.other_user = get_user_model().objects.create_user(
+            username='user-2', password='testpass123')
+        cls.workspace = core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+        cls.tag = core_models.Tag.objects.create(
+            name="tag", workspace=cls.workspace, created_by=cls.user)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace, created_by=cls.user)
+        cls.task = core_models.Task.objects.create(
+            title="task", workspace=cls.workspace, category=cls.category,
+            created_by=cls.user)
+        cls.child = core_models.Task.objects.create(
+            title="child", workspace=cls.workspace, category=cls.category,
+            parent=cls.task, created_by=cls.user)
+        cls.task.tags.add(cls.tag)
+        core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.other_user, is_default=True)
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_authenticate(self.user)
+        self.url = reverse("api:sync")
+        # age all rows, so only changes made by the test are synced
+        past = timezone.now() - dt.timedelta(hours=1)
+        for model in [core_models.Workspace, core_models.Tag,
+                      core_models.Priority, core_models.Status,
+                      core_models.Category, core_models.Task]:
+            model.objects.update(updated_at=past)
+        self.since = api_views.SyncView.encode_token(
+            past + dt.timedelta(minutes=30))
+
+    def test_sync_all(self):
+        """Without a token all objects of the user are returned."""
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert [ws["name"] for ws in response.data["workspaces"]] == [
+            "workspace"]
+        assert {t["title"] for t in response.data["tasks"]} == {
+            "task", "child"}
+        assert response.data["deleted"]["tasks"] == []
+        assert response.data["next"]
+
+    def test_sync_since(self):
+        """Only objects updated since the token are returned."""
+        self.task.title = "task updated"
+        self.task.save()
+        response = self.client.get(self.url, {"since": self.since})
+        assert response.status_code == status.HTTP_200_OK
+        assert [t["title"] for t in response.data["tasks"]] == [
+            "task updated"]
+        assert response.data["workspaces"] == []
+        assert response.data["categories"] == []
+
+    def test_sync_next_token(self):
+        """The next token syncs changes made after the sync."""
+        response = self.client.get(self.url, {"since": self.since})
+        token = response.data["next"]
+        assert api_views.SyncView.decode_token(token) < timezone.now()
+        self.task.title = "task updated"
+        self.task.save()
+        response = self.client.get(self.url, {"since": token})
+        assert [t["title"] for t in response.data["tasks"]] == [
+            "task updated"]
+
+    def test_sync_deleted(self):
+        """Deleted objects are returned as tombstones."""
+        task_pk = self.task.pk
+        self.task.delete()
+        response = self.client.get(self.url, {"since": self.since})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["deleted"]["tasks"] == [task_pk]
+        # child lost its parent
+        assert [t["title"] for t in response.data["tasks"]] == ["child"]
+
+    def test_sync_deleted_cascade(self):
+        """Objects deleted by cascade are returned as tombstones."""
+        category_pk = self.category.pk
+        task_pks = sorted([self.task.pk, self.child.pk])
+        self.category.delete()
+        response = self.client.get(self.url, {"since": self.since})
+        assert response.data["deleted"]["categories"] == [category_pk]
+        assert sorted(response.data["deleted"]["tasks"]) == task_pks
+
+    def test_sync_deleted_tag(self):
+        """Tasks losing a deleted tag are synced."""
+        tag_pk = self.tag.pk
+        self.tag.delete()
+        response = self.client.get(self.url, {"since": self.since})
+        assert response.data["deleted"]["tags"] == [tag_pk]
+        assert [t["title"] for t in response.data["tasks"]] == ["task"]
+        assert response.data["tasks"][0]["tags"] == []
+
+    def test_sync_descendants(self):
+        """Descendants updated along with their root are synced."""
+        self.task.is_visible = False
+        self.task.save()
+        response = self.client.get(self.url, {"since": self.since})
+        assert {t["title"] for t in response.data["tasks"]} == {
+            "task", "child"}
+
+    def test_sync_other_user(self):
+        """Objects of other users are not synced."""
+        self.client.force_authenticate(self.other_user)
+        self.task.delete()
+        response = self.client.get(self.url, {"since": self.since})
+        assert response.data["tasks"] == []
+        assert response.data["deleted"]["tasks"] == []
+
+    def test_sync_invalid_token(self):
+        response = self.client.get(self.url, {"since": "invalid"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_sync_expired_token(self):
+        """Tokens older than the tombstones kept are rejected."""
+        with override_settings(TOMBSTONE_RETENTION_DAYS=0):
+            response = self.client.get(self.url, {"since": self.since})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "expired" in str(response.data["since"][0])
+
+    def test_prune_tombstones(self):
+        """Tombstones older than the retention period are pruned."""
+        self.task.delete()
+        self.category.delete()
+        core_models.Tombstone.objects.filter(
+            model_label="core.category",
+        ).update(deleted_at=timezone.now() - dt.timedelta(days=91))
+        stdout = io.StringIO()
+        with override_settings(TOMBSTONE_RETENTION_DAYS=90):
+            call_command("prune_tombstones", stdout=stdout)
+        assert stdout.getvalue().strip() == "Tombstone: 1 deleted"
+        assert not core_models.Tombstone.objects.filter(
+            model_label="core.category").exists()
+        assert core_models.Tombstone.objects.filter(
+            model_label="core.task").count() == 2
+        call_command("prune_tombstones", days=0, stdout=io.StringIO())
+        assert not core_models.Tombstone.objects.exists()
+
+    def test_sync_unauthenticated(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(self.url)
+        assert response.status_code in [status.HTTP_401_UNAUTHORIZED,
+                                        status.HTTP_403_FORBIDDEN]
@@ -168,7 +168,7 @@ class CategoryCommentApiAuthAndCrudTests(CategoryCommentApiFullSetupTestClass):
             cat_pk_seq=[self.cat_1_comment_1.category.pk])
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == cat_1_serializers.data
+        assert response.data["results"] == cat_1_serializers.data
         assert response_1.data == comment_1_serializer.data[0]
 
     def test_comment_create_post(self):
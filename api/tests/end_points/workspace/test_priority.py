@@ -127,7 +127,7 @@ class PriorityApiAuthAndCrudTests(PriorityApiFullSetupTestClass):
             ws_pk_seq=[self.ws_1_priority_1.workspace.pk])
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == ws_1_priority_serializers.data
+        assert response.data["results"] == ws_1_priority_serializers.data
         assert response_1.data == priority_1_serializer.data[0]
 
     def test_priority_create_post(self):
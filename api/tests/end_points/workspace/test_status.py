@@ -127,7 +127,7 @@ class StatusApiAuthAndCrudTests(StatusApiFullSetupTestClass):
             ws_pk_seq=[self.ws_1_status_1.workspace.pk])
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == ws_1_status_serializers.data
+        assert response.data["results"] == ws_1_status_serializers.data
         assert response_1.data == status_1_serializer.data[0]
 
     def test_status_create_post(self):
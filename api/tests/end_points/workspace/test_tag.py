@@ -127,7 +127,7 @@ class TagApiAuthAndCrudTests(TagApiFullSetupTestClass):
             ws_pk_seq=[self.ws_1_tag_1.workspace.pk])
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == ws_1_tag_serializers.data
+        assert response.data["results"] == ws_1_tag_serializers.data
         assert response_1.data == tag_1_serializer.data[0]
 
     def test_tag_create_post(self):
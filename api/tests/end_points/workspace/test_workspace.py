@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.exceptions import status
 from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework.request import Request
@@ -91,7 +93,7 @@ class WorkspaceApiAuthAndCrudTests(WorkspaceApiFullSetupTestClass):
         workspace_1_serializer = self.get_workpace_serializers(
             pk_seq=[self.workspace_1.pk])
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == self.get_workpace_serializers().data
+        assert response.data["results"] == self.get_workpace_serializers().data
         assert response_1.data == workspace_1_serializer.data[0]
 
     def test_workspace_create_post(self):
@@ -271,3 +273,71 @@ class WorkspaceApiCleanSaveDeleteIsolatedTests(WorkspaceApiMinimalSetupClass):
         response = self.client.post(url, data)
         assert response.status_code == status.HTTP_201_CREATED
         assert self.get_workspace_query().get(name="default").is_default
+
+
+class WorkspaceApiSnapshotTests(WorkspaceApiFullSetupTestClass):
+    """
+    Test workspace snapshot end point.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tag = core_models.Tag.objects.create(
+            name="tag", workspace=cls.workspace_1, created_by=cls.user)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace_1, created_by=cls.user)
+        cls.url = reverse("api:workspace-snapshot",
+                          kwargs={"pk": cls.workspace_1.pk})
+
+    def create_rows(self, i):
+        project = core_models.Project.objects.create(
+            title=f"project {i}", workspace=self.workspace_1,
+            category=self.category, created_by=self.user)
+        project.tags.add(self.tag)
+        task = core_models.Task.objects.create(
+            title=f"task {i}", workspace=self.workspace_1,
+            category=self.category, project=project, created_by=self.user)
+        task.tags.add(self.tag)
+        core_models.TaskComment.objects.create(
+            content=f"comment {i}", task=task, created_by=self.user)
+        core_models.CategoryComment.objects.create(
+            content=f"comment {i}", category=self.category,
+            created_by=self.user)
+        return task
+
+    def test_snapshot(self):
+        task = self.create_rows(0)
+        core_models.Task.objects.create(
+            title="other", workspace=self.workspace_2,
+            category=core_models.Category.objects.create(
+                name="other", workspace=self.workspace_2,
+                created_by=self.user),
+            created_by=self.user)
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["workspace"]["name"] == "default"
+        assert [t["title"] for t in response.data["tasks"]] == ["task 0"]
+        task_data = response.data["tasks"][0]
+        assert task_data["id"] == task.pk
+        assert task_data["project_id"] == task.project_id
+        assert task_data["tags"] == [self.tag.pk]
+        assert "tree_path" not in task_data
+        assert [c["content"] for c in response.data["task_comments"]] == [
+            "comment 0"]
+        assert [t["name"] for t in response.data["tags"]] == ["tag"]
+
+    def test_snapshot_constant_queries(self):
+        self.create_rows(0)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        for i in range(1, 5):
+            self.create_rows(i)
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(self.url)
+        assert len(response.data["tasks"]) == 5
+
+    def test_snapshot_other_user(self):
+        self.client.force_authenticate(self.create_user(username="user-2"))
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
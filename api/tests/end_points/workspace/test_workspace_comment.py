@@ -128,7 +128,7 @@ class WorkspaceCommentApiAuthAndCrudTests(WorkspaceCommentApiFullSetupTestClass)
             ws_pk_seq=[self.ws_1_comment_1.workspace.pk])
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == ws_1_serializers.data
+        assert response.data["results"] == ws_1_serializers.data
         assert response_1.data == comment_1_serializer.data[0]
 
     def test_comment_create_post(self):
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.reverse import reverse as drf_reverse
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import task as task_serializers
+from api.utils import url_templates
+from core import models as core_models
+
+
+class UrlTemplatesTests(TestCase):
+    """
+    Test urls formatted from url templates match DRF `reverse()`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        cls.workspace = core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+        cls.category = core_models.Category.objects.create(
+            name="category", workspace=cls.workspace, created_by=cls.user)
+        cls.project = core_models.Project.objects.create(
+            title="project", workspace=cls.workspace, category=cls.category,
+            created_by=cls.user)
+        cls.task = core_models.Task.objects.create(
+            title="task", workspace=cls.workspace, category=cls.category,
+            project=cls.project, created_by=cls.user)
+        core_models.Task.objects.create(
+            title="child", workspace=cls.workspace, category=cls.category,
+            project=cls.project, parent=cls.task, created_by=cls.user)
+
+    def setUp(self):
+        super().setUp()
+        self.request = Request(APIRequestFactory().get("/api/"))
+
+    def test_reverse(self):
+        cases = [
+            ("api:workspace-list", {}),
+            ("api:workspace-detail", {"pk": 1}),
+            ("api:tag-list", {"ws_pk": 2}),
+            ("api:task-detail", {"ws_pk": 1, "cat_pk": 22, "pk": 333}),
+            ("api:project-task-detail",
+             {"ws_pk": 1, "cat_pk": 2, "pr_pk": 3, "pk": 4}),
+        ]
+        for view_name, kwargs in cases:
+            for request in [None, self.request]:
+                assert url_templates.reverse(
+                    view_name, kwargs=kwargs, request=request,
+                ) == drf_reverse(view_name, kwargs=kwargs, request=request)
+
+    def test_reverse_format(self):
+        """Format suffixes are reversed by DRF."""
+        kwargs = {"ws_pk": 1}
+        assert url_templates.reverse(
+            "api:tag-list", kwargs=kwargs, format="json",
+        ) == drf_reverse("api:tag-list", kwargs=kwargs, format="json")
+
+    def test_serializer(self):
+        """Serialized urls don't change with url templates."""
+        tasks = core_models.Task.objects.order_by("pk")
+        context = {"request": self.request}
+        url_templates.enabled = False
+        try:
+            expected = task_serializers.TaskSerializer(
+                tasks, many=True, context=context).data
+        finally:
+            url_templates.enabled = True
+        context = {"request": Request(APIRequestFactory().get("/api/"))}
+        assert task_serializers.TaskSerializer(
+            tasks, many=True, context=context).data == expected
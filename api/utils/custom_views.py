@@ -0,0 +1,511 @@
+import functools
+import hashlib
+import operator
+
+from django.core.exceptions import ValidationError as DjVE
+from django.db import IntegrityError, transaction
+from django.db.models import (Case, Count, F, Max, Q, UniqueConstraint,
+                              Value, When, prefetch_related_objects)
+from django.db.models.lookups import Exact
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError as DrfVE
+from rest_framework.response import Response
+
+from api.serializers import custom_fields
+from api.utils import response_cache
+
+
+def get_query_plan(serializer_class, fields=None):
+    """
+    Returns `select_related` and `prefetch_related` lookups declared in the
+    serializer class' `Meta` for given fields (all fields by default).
+    """
+    meta = serializer_class.Meta
+    if fields is None:
+        fields = meta.fields
+    select_related, prefetch_related = [], []
+    for field in fields:
+        for lookup in getattr(meta, "select_related", {}).get(field, []):
+            if lookup not in select_related:
+                select_related.append(lookup)
+        for lookup in getattr(meta, "prefetch_related", {}).get(field, []):
+            if lookup not in prefetch_related:
+                prefetch_related.append(lookup)
+    return select_related, prefetch_related
+
+
+def apply_query_plan(queryset, serializer_class, fields=None):
+    select_related, prefetch_related = get_query_plan(serializer_class, fields)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+class QueryPlanMixin():
+    """
+    Viewset mixin to apply the query plan declared by the serializer class.
+
+    Serializers declare the relations their fields read in `Meta` as
+    dictionaries of field name to lookups, e.g.
+        select_related = {"url": ["category"]}
+        prefetch_related = {"tags": ["tags"]}
+    `apply_query_plan` joins/prefetches the lookups of the rendered fields
+    (see `CustomBaseHMS.get_requested_fields`), so serializing a list doesn't
+    query the database per row.
+    """
+
+    def get_query_plan_fields(self):
+        return self.get_serializer_class().get_requested_fields(self.request)
+
+    def get_query_plan(self):
+        return get_query_plan(self.get_serializer_class(),
+                              self.get_query_plan_fields())
+
+    def apply_query_plan(self, queryset):
+        return apply_query_plan(queryset, self.get_serializer_class(),
+                                self.get_query_plan_fields())
+
+
+class ConditionalGetMixin():
+    """
+    Viewset mixin answering `list` and `retrieve` with 304 Not Modified,
+    before serializing anything, when the request's `If-None-Match` (or
+    `If-Modified-Since` for details of flat models) validator matches.
+
+    Validators are computed with at most one aggregate query
+        - list: count and latest `updated_at` of the filtered queryset
+        - detail: `updated_at` of the object, along with count and latest
+          `updated_at` of its descendants for tree models since their
+          `children_url` lists them
+    The ETag also covers the user and the full path (cursor, query params)
+    and the format of the response.
+    """
+
+    def get_etag(self, count, last_modified):
+        key = "|".join([
+            str(self.request.user.pk),
+            self.request.get_full_path(),
+            self.request.accepted_renderer.format,
+            str(count),
+            last_modified.isoformat() if last_modified else "",
+        ])
+        digest = hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+        return f'W/"{digest}"'
+
+    @staticmethod
+    def get_validator(queryset):
+        return queryset.order_by().aggregate(
+            count=Count("pk"),
+            last_modified=Max("updated_at"),
+        )
+
+    def list(self, request, *args, **kwargs):
+        validator = self.get_validator(
+            self.filter_queryset(self.get_queryset()))
+        etag = self.get_etag(validator["count"], validator["last_modified"])
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+            response["ETag"] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        count, last_modified = 1, instance.updated_at
+        is_tree = hasattr(instance, "get_descendants")
+        if is_tree:
+            validator = self.get_validator(
+                instance.get_descendants(instance))
+            count += validator["count"]
+            last_modified = max(
+                filter(None, [last_modified, validator["last_modified"]]))
+        etag = self.get_etag(count, last_modified)
+        # a deleted descendant only changes the count, so Last-Modified is
+        # not a valid validator of tree objects
+        timestamp = None if is_tree else int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp)
+        if response is None:
+            serializer = self.get_serializer(instance)
+            response = Response(serializer.data)
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
+
+
+class ResponseCacheMixin():
+    """
+    Viewset mixin serving JSON `list` and `retrieve` responses from the cache
+    (see `api.utils.response_cache`), keyed by user, path and the generation
+    of `response_cache_scope`
+        - "user": the requesting user, for workspaces
+        - "workspace": the workspace of the `ws_pk` url kwarg
+    Successful responses are cached rendered along with their validators, so
+    cache hits are neither serialized nor rendered and conditional requests
+    are answered from the cache as well.
+    """
+
+    response_cache_scope = "workspace"
+    response_cache_headers = ["Content-Type", "ETag", "Last-Modified", "Vary"]
+
+    def get_response_cache_key(self):
+        if self.response_cache_scope == "user":
+            scope_pk = self.request.user.pk
+        else:
+            scope_pk = self.kwargs["ws_pk"]
+        return response_cache.get_response_key(
+            self.request, self.response_cache_scope, scope_pk)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key()
+        entry = response_cache.get_response(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response = self.finalize_response(request, response,
+                                                  *args, **kwargs)
+                response.render()
+                headers = {
+                    header: response[header]
+                    for header in self.response_cache_headers
+                    if response.has_header(header)
+                }
+                response_cache.set_response(key, (response.content, headers))
+            return response
+        content, headers = entry
+        response = get_conditional_response(
+            request, etag=headers.get("ETag"),
+            last_modified=parse_http_date_safe(
+                headers.get("Last-Modified", "")),
+        )
+        if response is None:
+            response = HttpResponse(content, headers=headers)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args,
+                                        **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args,
+                                        **kwargs)
+
+
+class BulkActionsMixin():
+    """
+    Viewset mixin adding a `bulk` list end point for TreeMixin models to
+        - create (POST a list of objects)
+        - partially update (PATCH a list of objects with their `id`)
+        - delete (DELETE a list of ids)
+    at most `bulk_max_size` objects in one transaction.
+
+    The whole batch is validated before anything is written. Errors are
+    returned as a list with the errors of each item at its index (empty for
+    valid items). Rows are written with `bulk_create`/`bulk_update` and many
+    to many relations with bulk inserts into their through tables.
+
+    Validation queries don't grow with the batch: related objects are
+    loaded with one query per field (see `get_preloaded_objects`) and each
+    unique constraint is checked with one query (see
+    `get_constraint_errors`).
+    """
+
+    bulk_max_size = 1000
+
+    @action(detail=False, methods=["post", "patch", "delete"],
+            url_path="bulk")
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise DrfVE("Expected a list of items.")
+        if len(request.data) > self.bulk_max_size:
+            raise DrfVE(
+                f'Ensure there are no more than {self.bulk_max_size} items.')
+        if request.method == "POST":
+            return self.bulk_create(request)
+        if request.method == "PATCH":
+            return self.bulk_update(request)
+        return self.bulk_destroy(request)
+
+    def get_preloaded_objects(self, items):
+        """
+        Returns objects referenced by items in fields of `PreloadedPKRF`,
+        by pk, by field name, with one query per field.
+        """
+        preloaded = {}
+        for field_name, field in self.get_serializer().fields.items():
+            many = isinstance(field, serializers.ManyRelatedField)
+            relation = field.child_relation if many else field
+            if field.read_only \
+                    or not isinstance(relation, custom_fields.PreloadedPKRF):
+                continue
+            pks = set()
+            for item in items:
+                value = item.get(field_name) if isinstance(item, dict) \
+                    else None
+                values = value if many and isinstance(value, list) \
+                    else [value]
+                pks.update(pk for pk in values if type(pk) is int)
+            if pks:
+                preloaded[field_name] = relation.get_queryset().in_bulk(pks)
+        return preloaded
+
+    def get_bulk_serializer_context(self, items):
+        return {
+            **self.get_serializer_context(),
+            "preloaded_objects": self.get_preloaded_objects(items),
+        }
+
+    @staticmethod
+    def get_instance_errors(instance):
+        """
+        Returns errors of model validation of an instance, except for its
+        relations, validated by the serializer fields, and its constraints,
+        validated for the whole batch by `get_constraint_errors`.
+        """
+        exclude = [field.name for field in instance._meta.concrete_fields
+                   if field.is_relation]
+        try:
+            instance.full_clean(exclude=exclude, validate_constraints=False)
+        except DjVE as e:
+            return {"non_field_errors": e.messages}
+        return {}
+
+    @staticmethod
+    def get_constraint_errors(model, instances):
+        """
+        Returns errors of instances violating constraints of the model with
+        rows of other objects.
+        Unique constraints without condition are checked with one query for
+        the whole batch, a matching row being reported for the first instance
+        it matches. Other constraints are checked per instance.
+        """
+        errors = [[] for _ in instances]
+        for constraint in model._meta.constraints:
+            if not isinstance(constraint, UniqueConstraint) \
+                    or constraint.condition is not None \
+                    or constraint.nulls_distinct is False:
+                for error, instance in zip(errors, instances):
+                    try:
+                        constraint.validate(model, instance)
+                    except DjVE as e:
+                        error.extend(e.messages)
+                continue
+            expressions = [
+                getattr(expression, "get_expression_for_validation",
+                        lambda: expression)()
+                for expression in constraint.expressions
+            ] or [F(field_name) for field_name in constraint.fields]
+            conditions = []
+            for instance in instances:
+                replacements = {
+                    F(field): value
+                    for field, value in instance._get_field_expression_map(
+                        meta=model._meta).items()
+                }
+                condition = Q(*[
+                    Exact(expression,
+                          expression.replace_expressions(replacements))
+                    for expression in expressions
+                ])
+                if instance.pk is not None:
+                    condition &= ~Q(pk=instance.pk)
+                conditions.append(condition)
+            if not conditions:
+                continue
+            if constraint.fields and constraint.violation_error_message \
+                    == constraint.default_violation_error_message:
+                message = instances[0].unique_error_message(
+                    model, constraint.fields).message
+            else:
+                message = constraint.get_violation_error_message()
+            matches = model._default_manager.filter(
+                functools.reduce(operator.or_, conditions),
+            ).annotate(_index=Case(*[
+                When(condition, then=Value(i))
+                for i, condition in enumerate(conditions)
+            ])).values_list("_index", flat=True)
+            for i in matches:
+                errors[i].append(message)
+        return [{"non_field_errors": error} if error else {}
+                for error in errors]
+
+    @staticmethod
+    def get_cycle_errors(instances):
+        """
+        Returns errors of instances which would be their own ancestor once
+        the whole batch is saved. Parents of instances are taken as set in
+        the batch, those of other objects from the tree paths of the parents
+        of instances.
+        """
+        parents = {}
+        for instance in instances:
+            if instance.parent_id is not None:
+                chain = [*instance.parent.get_ancestor_pk_list(),
+                         instance.parent_id]
+                parents.update(zip(chain, [None, *chain[:-1]]))
+        parents.update(
+            (instance.pk, instance.parent_id) for instance in instances)
+        errors = []
+        for instance in instances:
+            pk, seen = instance.parent_id, set()
+            while pk is not None and pk != instance.pk and pk not in seen:
+                seen.add(pk)
+                pk = parents.get(pk)
+            errors.append({
+                "non_field_errors": [
+                    "Parent cannot be a descendant of object itself."],
+            } if pk == instance.pk else {})
+        return errors
+
+    @staticmethod
+    def bulk_set_many_to_many(model, instances, many_to_many, replace=False):
+        """
+        Sets many to many values of instances with one bulk insert (and one
+        delete of the existing rows if `replace`) per field.
+        """
+        field_names = {name for values in many_to_many for name in values}
+        for field_name in field_names:
+            field = model._meta.get_field(field_name)
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            items = [
+                (instance, values[field_name])
+                for instance, values in zip(instances, many_to_many)
+                if field_name in values
+            ]
+            if replace:
+                through.objects.filter(**{
+                    f'{source}__in': [instance.pk for instance, _ in items],
+                }).delete()
+            through.objects.bulk_create([
+                through(**{
+                    f'{source}_id': instance.pk,
+                    f'{target}_id': related.pk,
+                })
+                for instance, related_objs in items
+                for related in related_objs
+            ])
+
+    def get_bulk_response_data(self, instances):
+        _, prefetch_related = self.get_query_plan()
+        prefetch_related_objects(instances, *prefetch_related)
+        return self.get_serializer(instances, many=True).data
+
+    def bulk_create(self, request):
+        serializer = self.get_serializer(
+            data=request.data, many=True,
+            context=self.get_bulk_serializer_context(request.data))
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if isinstance(errors, dict) \
+                    and all(isinstance(key, int) for key in errors):
+                # errors of invalid items only, keyed by index
+                errors = [errors.get(i, {}) for i in range(len(request.data))]
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        instances, many_to_many, errors = [], [], []
+        for attrs in serializer.validated_data:
+            instance, values = serializer.child.get_instance(attrs)
+            instances.append(instance)
+            many_to_many.append(values)
+            errors.append(self.get_instance_errors(instance))
+        model = serializer.child.Meta.model
+        if not any(errors):
+            errors = self.get_constraint_errors(model, instances)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            try:
+                instances = model.bulk_create_tree(instances)
+            except IntegrityError as e:
+                raise DrfVE(e)
+            self.bulk_set_many_to_many(model, instances, many_to_many)
+        return Response(self.get_bulk_response_data(instances),
+                        status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        ids = [
+            item.get("id") if isinstance(item, dict) else None
+            for item in request.data
+        ]
+        existing = self.get_queryset().select_related("parent").in_bulk(
+            [pk for pk in ids if isinstance(pk, int)])
+        context = self.get_bulk_serializer_context(request.data)
+        instances, many_to_many, errors = [], [], []
+        fields = set()
+        model = self.get_serializer_class().Meta.model
+        m2m_names = {field.name for field in model._meta.many_to_many}
+        for item, pk in zip(request.data, ids):
+            instance = existing.get(pk) if isinstance(pk, int) else None
+            if instance is None:
+                errors.append({"id": ["Not found."]})
+                continue
+            serializer = self.get_serializer(instance, data=item,
+                                             partial=True, context=context)
+            if not serializer.is_valid():
+                errors.append(serializer.errors)
+                continue
+            values = {}
+            for attr, value in serializer.validated_data.items():
+                if attr in m2m_names:
+                    values[attr] = value
+                else:
+                    setattr(instance, attr, value)
+                    fields.add(attr)
+            instances.append(instance)
+            many_to_many.append(values)
+            errors.append(self.get_instance_errors(instance))
+        if not any(errors):
+            errors = self.get_constraint_errors(model, instances)
+        if not any(errors):
+            errors = self.get_cycle_errors(instances)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        # moved objects and changes that cascade go through save
+        moved, unmoved = [], []
+        for instance in instances:
+            if any(instance.has_changed(field)
+                   for field in instance.get_tracked_fields()):
+                moved.append(instance)
+            else:
+                unmoved.append(instance)
+        now = timezone.now()
+        for instance in unmoved:
+            instance.updated_at = now
+        with transaction.atomic():
+            try:
+                for instance in moved:
+                    instance.save()
+                if unmoved:
+                    model.bulk_update_tree(unmoved, [*fields, "updated_at"])
+            except IntegrityError as e:
+                raise DrfVE(e)
+            self.bulk_set_many_to_many(model, instances, many_to_many,
+                                       replace=True)
+        updated = self.get_queryset().in_bulk(ids)
+        return Response(self.get_bulk_response_data(
+            [updated[pk] for pk in ids]))
+
+    def bulk_destroy(self, request):
+        existing = set(self.get_queryset().filter(
+            pk__in=[pk for pk in request.data if isinstance(pk, int)],
+        ).values_list("pk", flat=True))
+        errors = [
+            {} if pk in existing else {"id": ["Not found."]}
+            for pk in request.data
+        ]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            self.get_queryset().filter(pk__in=existing).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
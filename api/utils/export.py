@@ -0,0 +1,87 @@
+"""
+Export of all data of a user as NDJSON.
+
+Every line is a JSON object `{"model": <key>, "data": <row values>}`, with
+tables in dependency order (see `api.utils.snapshot.SNAPSHOT_TABLES`) and
+many to many relations as rows of their own, e.g.
+    {"model": "tasks_tags", "data": {"task_id": 1, "tag_id": 2}}
+Rows are read with `iterator()` and written as they are read, so memory does
+not grow with the number of rows.
+"""
+import zlib
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from core import models as core_models
+from api.utils import snapshot as api_snapshot
+
+
+EXPORT_TABLES = [
+    ("workspaces", core_models.Workspace),
+    *[(key, model) for key, model, lookup in api_snapshot.SNAPSHOT_TABLES],
+]
+
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+
+def iter_rows(user, chunk_size=CHUNK_SIZE):
+    """
+    Yields (key, row values) of all rows of the user.
+    """
+    for key, model in EXPORT_TABLES:
+        queryset = model.objects.filter(created_by=user).order_by("pk")
+        rows = queryset.values(*api_snapshot.get_field_names(model))
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield key, row
+        for field in model._meta.many_to_many:
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            through_rows = field.remote_field.through.objects.filter(**{
+                f'{field.m2m_field_name()}__created_by': user,
+            }).order_by(source, target).values(source, target)
+            for row in through_rows.iterator(chunk_size=chunk_size):
+                yield f'{key}_{field.name}', row
+
+
+def iter_lines(user, chunk_size=CHUNK_SIZE):
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for key, row in iter_rows(user, chunk_size):
+        line = encoder.encode({"model": key, "data": row})
+        yield f'{line}\n'.encode()
+
+
+def iter_buffered(chunks, buffer_size=BUFFER_SIZE):
+    """
+    Joins small chunks into chunks of about `buffer_size` bytes.
+    """
+    buffer, size = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_gzip(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(user, compress=False, chunk_size=CHUNK_SIZE):
+    """
+    Yields chunks of the NDJSON export of the user, gzip compressed if
+    `compress` is set.
+    """
+    chunks = iter_buffered(iter_lines(user, chunk_size))
+    if compress:
+        chunks = iter_gzip(chunks)
+    return chunks
+
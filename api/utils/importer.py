@@ -0,0 +1,430 @@
+"""
+Bulk import of objects into the account of a user.
+
+Inputs are parsed as streams of records `(key, row)` as written by the
+export (see `api.utils.export`): NDJSON export lines, JSON fixtures (as
+dumped by `dumpdata`) or CSV rows of one table. `Importer` maps the ids of
+the input to the ids of the inserted rows in memory and inserts the rows of
+each table with `bulk_create`, in dependency order and parents before
+children, computing tree paths as it goes. Model `save()` and its signals
+are not run.
+
+References (foreign keys, parents, many to many links) which are not part of
+the input are resolved to existing objects of the user.
+"""
+import codecs
+import csv
+import json
+import re
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core import models as core_models
+from core.utils import tree_cache
+from api.utils import export as api_export
+from api.utils import response_cache
+from api.utils import snapshot as api_snapshot
+
+
+BATCH_SIZE = 1000
+# bytes of JSON fixtures read at a time
+CHUNK_SIZE = 64 * 1024
+# fields of tree objects which should be the same as their parent's
+PARENT_FIELDS = ["workspace_id", "category_id", "is_visible"]
+# fields of objects which should reference an object of their workspace
+WORKSPACE_FIELDS = ["category_id", "status_id", "priority_id"]
+
+
+def get_table_keys():
+    """
+    Returns keys of tables and many to many link tables in import order,
+    mapped to their (model, many to many field or None).
+    """
+    tables = {}
+    for key, model in api_export.EXPORT_TABLES:
+        tables[key] = (model, None)
+        for field in model._meta.many_to_many:
+            tables[f'{key}_{field.name}'] = (model, field)
+    return tables
+
+
+TABLES = get_table_keys()
+TABLE_ORDER = {key: i for i, key in enumerate(TABLES)}
+MODEL_KEYS = {
+    model._meta.label_lower: key
+    for key, (model, field) in TABLES.items() if field is None
+}
+
+
+_whitespace = re.compile(r"\s*")
+
+
+def iter_ndjson(lines):
+    for line in lines:
+        if line.strip():
+            record = json.loads(line)
+            yield record["model"], record["data"]
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yields the items of a JSON array read from a binary stream in chunks, so
+    that the whole document is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, position, expected = "", 0, "["
+    while expected:
+        chunk = stream.read(chunk_size)
+        buffer = buffer[position:] + text.decode(chunk, final=not chunk)
+        position = 0
+        while expected:
+            position = _whitespace.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if expected in ("[", ","):
+                if char == expected:
+                    position += 1
+                    expected = "item or ]" if char == "[" else "item"
+                elif expected == "," and char == "]":
+                    expected = None
+                else:
+                    raise ValueError(f'Expected "{expected}" at '
+                                     f'"{buffer[position:position + 20]}".')
+            elif expected == "item or ]" and char == "]":
+                expected = None
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if not chunk:
+                        raise
+                    break
+                # an item ending the buffer may be cut (e.g. a number)
+                if end == len(buffer) and chunk:
+                    break
+                yield item
+                expected, position = ",", end
+        if not chunk and expected:
+            raise ValueError("Unexpected end of JSON array.")
+
+
+def read_fixture(fixture_file):
+    """
+    Yields records of a JSON fixture, parsed incrementally. Objects of models
+    which are not imported (e.g. users) are skipped.
+
+    Fixtures dumped by `dumpdata` list the objects of each model together, in
+    the order models are defined, which `Importer` takes one table at a time
+    like exports. Many to many links of the objects of a model are yielded
+    once the model's objects are, so that its table is inserted at once.
+    """
+    key, links = None, []
+    for obj in iter_json_array(fixture_file):
+        obj_key = MODEL_KEYS.get(obj["model"].lower())
+        if obj_key != key:
+            yield from links
+            key, links = obj_key, []
+        if key is None:
+            continue
+        model = TABLES[key][0]
+        row = {"id": obj["pk"]}
+        for name, value in obj["fields"].items():
+            field = model._meta.get_field(name)
+            if field.many_to_many:
+                links += [
+                    (f'{key}_{name}', {
+                        f'{field.m2m_field_name()}_id': obj["pk"],
+                        f'{field.m2m_reverse_field_name()}_id': related_pk,
+                    })
+                    for related_pk in value
+                ]
+            else:
+                row[field.attname] = value
+        yield key, row
+    yield from links
+
+
+def iter_csv(lines, key):
+    """
+    Yields records of CSV rows of a table, with a header of field names.
+    Empty values are null and many to many columns are `;` separated ids.
+    """
+    model = TABLES[key][0]
+    for csv_row in csv.DictReader(lines):
+        row, links = {}, []
+        for name, value in csv_row.items():
+            field = model._meta.get_field(name)
+            if field.many_to_many:
+                pks = [pk for pk in value.split(";") if pk.strip()]
+                if pks and not csv_row.get("id"):
+                    raise ValidationError(
+                        f'{key}: rows with {name} need an id.')
+                links += [
+                    (f'{key}_{name}', {
+                        f'{field.m2m_field_name()}_id': int(csv_row["id"]),
+                        f'{field.m2m_reverse_field_name()}_id': int(pk),
+                    })
+                    for pk in pks
+                ]
+            elif value == "":
+                row[field.attname] = None
+            elif field.is_relation or field.primary_key:
+                row[field.attname] = int(value)
+            else:
+                row[field.attname] = value
+        yield key, row
+        yield from links
+
+
+FORMATS = ["ndjson", "json", "csv"]
+
+
+def read_records(stream, format, table=None):
+    """
+    Returns records of a binary stream (iterating over lines) of given
+    format. CSV inputs hold rows of one `table`.
+    """
+    if format == "ndjson":
+        return iter_ndjson(stream)
+    if format == "json":
+        return read_fixture(stream)
+    if format == "csv":
+        if table not in MODEL_KEYS.values():
+            raise ValidationError(f'Unknown table "{table}".')
+        return iter_csv(codecs.iterdecode(stream, "utf-8-sig"), table)
+    raise ValidationError(f'Unknown format "{format}".')
+
+
+class Importer():
+    """
+    Imports records into the account of `user`. Records are buffered per
+    table; a table is inserted once records of a later table arrive (inputs
+    in dependency order, like exports, keep one table in memory) or when the
+    import is finished.
+    """
+
+    def __init__(self, user, batch_size=BATCH_SIZE):
+        self.user = user
+        self.batch_size = batch_size
+        self.pending = {}
+        self.id_maps = {key: {} for key in TABLES}
+        self.counts = {key: 0 for key in TABLES}
+        self.has_default_workspace = core_models.Workspace.objects.filter(
+            created_by=user, is_default=True).exists()
+
+    def add(self, key, row):
+        if key not in TABLES:
+            raise ValidationError(f'Unknown table "{key}".')
+        for pending_key in sorted(self.pending, key=TABLE_ORDER.get):
+            if TABLE_ORDER[pending_key] < TABLE_ORDER[key]:
+                self.insert_table(pending_key)
+        self.pending.setdefault(key, []).append(row)
+
+    def finish(self):
+        """
+        Inserts remaining records and invalidates caches of the user.
+        Returns the number of inserted rows per table.
+        """
+        for key in sorted(self.pending, key=TABLE_ORDER.get):
+            self.insert_table(key)
+        tree_cache.bump_tree_version(core_models.Workspace, self.user.pk)
+        response_cache.bump_generation("user", self.user.pk)
+        for workspace_pk in self.id_maps["workspaces"].values():
+            response_cache.bump_generation("workspace", workspace_pk)
+        return {key: count for key, count in self.counts.items() if count}
+
+    def get_references(self, key, model):
+        """
+        Returns (attname, table key) of the foreign keys of a model.
+        """
+        references = []
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.name != "created_by":
+                target = MODEL_KEYS[field.related_model._meta.label_lower]
+                references.append((field.attname, target))
+        return references
+
+    def resolve(self, target, pks, context):
+        """
+        Returns a mapping of input ids of a table to ids of inserted rows or,
+        for ids not in the input, of existing objects of the user.
+        """
+        id_map = self.id_maps[target]
+        missing = {pk for pk in pks if pk is not None and pk not in id_map}
+        if missing:
+            model = TABLES[target][0]
+            existing = set(model.objects.filter(
+                created_by=self.user, pk__in=missing,
+            ).values_list("pk", flat=True))
+            if missing - existing:
+                raise ValidationError(
+                    f'{context}: unknown {target} '
+                    f'{sorted(missing - existing)[:10]}.')
+            id_map.update((pk, pk) for pk in existing)
+        return id_map
+
+    def insert_table(self, key):
+        rows = self.pending.pop(key)
+        model, field = TABLES[key]
+        if field is not None:
+            self.insert_links(key, field, rows)
+            return
+        references = self.get_references(key, model)
+        for attname, target in references:
+            if attname != "parent_id":
+                self.resolve(target, [row.get(attname) for row in rows], key)
+        if not hasattr(model, "tree_path"):
+            for i in range(0, len(rows), self.batch_size):
+                self.insert_rows(key, model, references,
+                                 rows[i:i + self.batch_size])
+            return
+        # parents which are not in the input are existing objects
+        input_ids = {row.get("id") for row in rows}
+        id_map = self.resolve(key, [
+            row.get("parent_id") for row in rows
+            if row.get("parent_id") not in input_ids
+        ], key)
+        # insert roots first, then children of inserted rows
+        while rows:
+            ready, waiting = [], []
+            for row in rows:
+                parent_id = row.get("parent_id")
+                if parent_id is None or parent_id in id_map:
+                    ready.append(row)
+                else:
+                    waiting.append(row)
+            if not ready:
+                raise ValidationError(
+                    f'{key}: parents of rows '
+                    f'{[row.get("id") for row in rows][:10]} form a cycle.')
+            for i in range(0, len(ready), self.batch_size):
+                self.insert_rows(key, model, references,
+                                 ready[i:i + self.batch_size])
+            rows = waiting
+
+    def insert_rows(self, key, model, references, rows):
+        field_names = [
+            name for name in api_snapshot.get_field_names(model)
+            if name not in ["id", "uuid"]
+        ]
+        objs = []
+        for row in rows:
+            values = {name: row[name] for name in field_names if name in row}
+            for attname, target in references:
+                if values.get(attname) is not None:
+                    values[attname] = self.id_maps[target][values[attname]]
+            obj = model(**values, created_by=self.user)
+            if model is core_models.Workspace:
+                obj.is_default = (obj.is_default
+                                  and not self.has_default_workspace)
+                self.has_default_workspace |= obj.is_default
+            objs.append(obj)
+        parents = {}
+        if hasattr(model, "tree_path"):
+            parents = self.get_parents(model, objs)
+            for obj in objs:
+                if obj.parent_id is None:
+                    obj.tree_path = model.TREE_PATH_SEP
+                else:
+                    obj.tree_path = (
+                        f'{parents[obj.parent_id]["tree_path"]}'
+                        f'{obj.parent_id}{model.TREE_PATH_SEP}')
+        self.validate_rows(key, model, rows, objs, parents)
+        model.objects.bulk_create(objs)
+        for row, obj in zip(rows, objs):
+            if row.get("id") is not None:
+                self.id_maps[key][row["id"]] = obj.pk
+        if hasattr(model, "bump_tree_versions"):
+            model.bump_tree_versions(objs)
+        self.counts[key] += len(objs)
+
+    def get_parents(self, model, objs):
+        """
+        Returns the tree path and `PARENT_FIELDS` of the parents of objects
+        (inserted by earlier batches or existing), by pk, with one query.
+        """
+        attnames = {field.attname for field in model._meta.concrete_fields}
+        return {
+            values["id"]: values
+            for values in model.objects.filter(
+                pk__in={obj.parent_id for obj in objs} - {None},
+            ).values("id", "tree_path", *[
+                attname for attname in PARENT_FIELDS if attname in attnames])
+        }
+
+    def validate_rows(self, key, model, rows, objs, parents):
+        """
+        Validates objects of a batch as model `clean()` does, with one query
+        per model referenced by `WORKSPACE_FIELDS`: those references should
+        be objects of the object's workspace and `PARENT_FIELDS` should be the
+        same as the parent's.
+        """
+        fields = {field.attname: field
+                  for field in model._meta.concrete_fields}
+        errors = []
+
+        def check(message, invalid):
+            ids = [row.get("id") for row, obj in zip(rows, objs)
+                   if invalid(obj)]
+            if ids:
+                errors.append(f'{key}: {message} (rows {ids[:10]}).')
+
+        if "workspace_id" in fields:
+            for attname in WORKSPACE_FIELDS:
+                if attname not in fields:
+                    continue
+                workspaces = dict(fields[attname].related_model.objects.filter(
+                    pk__in={getattr(obj, attname) for obj in objs} - {None},
+                ).values_list("pk", "workspace_id"))
+                check(
+                    f'{fields[attname].name} should be from the same '
+                    f'workspace as self',
+                    lambda obj: getattr(obj, attname) is not None
+                    and workspaces[getattr(obj, attname)] != obj.workspace_id)
+        for attname in PARENT_FIELDS:
+            if attname not in fields or "parent_id" not in fields:
+                continue
+            field = fields[attname]
+            check(
+                f'{field.name} should be the same as parent\'s',
+                lambda obj: obj.parent_id is not None
+                and field.to_python(getattr(obj, attname))
+                != parents[obj.parent_id][attname])
+        if errors:
+            raise ValidationError(errors)
+
+    def insert_links(self, key, field, rows):
+        source = f'{field.m2m_field_name()}_id'
+        target = f'{field.m2m_reverse_field_name()}_id'
+        source_key = MODEL_KEYS[field.model._meta.label_lower]
+        target_key = MODEL_KEYS[field.related_model._meta.label_lower]
+        source_map = self.resolve(
+            source_key, [row[source] for row in rows], key)
+        target_map = self.resolve(
+            target_key, [row[target] for row in rows], key)
+        through = field.remote_field.through
+        objs = [
+            through(**{
+                source: source_map[row[source]],
+                target: target_map[row[target]],
+            })
+            for row in rows
+        ]
+        through.objects.bulk_create(objs, batch_size=self.batch_size,
+                                    ignore_conflicts=True)
+        self.counts[key] += len(objs)
+
+
+def import_records(user, records, batch_size=BATCH_SIZE):
+    """
+    Imports records in one transaction. Returns the number of inserted rows
+    per table.
+    """
+    with transaction.atomic():
+        importer = Importer(user, batch_size)
+        for key, row in records:
+            importer.add(key, row)
+        return importer.finish()
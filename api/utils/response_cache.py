@@ -0,0 +1,47 @@
+"""
+Cache of API responses for read requests.
+
+Responses are keyed by user, full path and format along with the generation
+of the scope the response belongs to (the user for workspaces, a workspace
+for its categories, tags, priorities and statuses). Generations are bumped
+from save/delete signals (see `api.signals`), so responses of a changed
+scope are rebuilt while those of unchanged scopes are served from the cache.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.utils import cache_versions
+
+
+def _get_generation_key(scope, scope_pk):
+    return f'api-generation:{scope}:{scope_pk}'
+
+
+def get_generation(scope, scope_pk):
+    return cache_versions.get_version(_get_generation_key(scope, scope_pk))
+
+
+def bump_generation(scope, scope_pk):
+    cache_versions.bump_version(_get_generation_key(scope, scope_pk))
+
+
+def get_response_key(request, scope, scope_pk):
+    path_hash = hashlib.md5(
+        f'{request.accepted_media_type}:{request.get_full_path()}'.encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    generation = get_generation(scope, scope_pk)
+    return (
+        f'api-response:{request.user.pk}:{scope}:{scope_pk}:{generation}'
+        f':{path_hash}'
+    )
+
+
+def get_response(key):
+    return cache.get(key)
+
+
+def set_response(key, entry):
+    cache.set(key, entry, settings.API_RESPONSE_CACHE_TIMEOUT)
@@ -0,0 +1,72 @@
+"""
+Denormalized snapshot of a workspace.
+
+The workspace and the rows of every table belonging to it are returned as
+plain values (related objects as ids), with one query per table and one per
+many to many relation, and without reversing urls per row.
+"""
+from core import models as core_models
+
+
+# (document key, model, lookup of the workspace) in dependency order
+SNAPSHOT_TABLES = [
+    ("workspace_comments", core_models.WorkspaceComment, "workspace"),
+    ("tags", core_models.Tag, "workspace"),
+    ("priorities", core_models.Priority, "workspace"),
+    ("statuses", core_models.Status, "workspace"),
+    ("categories", core_models.Category, "workspace"),
+    ("category_comments", core_models.CategoryComment, "category__workspace"),
+    ("projects", core_models.Project, "workspace"),
+    ("project_comments", core_models.ProjectComment, "project__workspace"),
+    ("tasks", core_models.Task, "workspace"),
+    ("task_comments", core_models.TaskComment, "task__workspace"),
+]
+
+# derived or implied by the owner of the snapshot
+EXCLUDED_FIELDS = ["tree_path", "created_by"]
+
+
+def get_field_names(model):
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if field.name not in EXCLUDED_FIELDS
+    ]
+
+
+def get_rows(model, queryset):
+    """
+    Returns values of the rows of a queryset, with many to many relations as
+    lists of ids.
+    """
+    rows = list(queryset.order_by("pk").values(*get_field_names(model)))
+    for field in model._meta.many_to_many:
+        related = {row["id"]: [] for row in rows}
+        for row in rows:
+            row[field.name] = related[row["id"]]
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        through_rows = field.remote_field.through.objects.filter(**{
+            f'{source}__in': queryset.values("pk"),
+        }).order_by(f'{source}_id', f'{target}_id').values_list(
+            f'{source}_id', f'{target}_id')
+        for pk, related_pk in through_rows:
+            if pk in related:
+                related[pk].append(related_pk)
+    return rows
+
+
+def get_workspace_snapshot(workspace, user):
+    """
+    Returns a document of the workspace and all objects of the user in it.
+    """
+    snapshot = {
+        "workspace": {
+            name: getattr(workspace, name)
+            for name in get_field_names(core_models.Workspace)
+        },
+    }
+    for key, model, lookup in SNAPSHOT_TABLES:
+        queryset = model.objects.filter(**{lookup: workspace},
+                                        created_by=user)
+        snapshot[key] = get_rows(model, queryset)
+    return snapshot
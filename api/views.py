@@ -1,58 +1,100 @@
+import datetime as dt
+import gzip
+
+from django.core.exceptions import FieldDoesNotExist
 from django.core.exceptions import ValidationError as DjVE
+from django.db import IntegrityError
 from rest_framework.exceptions import ValidationError as DrfVE
 from django.shortcuts import render
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from rest_framework import viewsets, permissions
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from core import models as core_models
 from api.serializers import workspace as workspace_serializers
 from api.serializers import category as category_serializers
 from api.serializers import project as project_serializers
 from api.serializers import task as task_serializers
+from . import pagination as api_pagination
 from . import permissions as api_permissions
+from .utils import custom_views as api_custom_views
+from .utils import export as api_export
+from .utils import importer as api_importer
+from .utils import snapshot as api_snapshot
 
 
 User = get_user_model()
 
 
-class CustomBaseModelViewSet(viewsets.ModelViewSet):
+class CustomBaseModelViewSet(api_custom_views.ConditionalGetMixin,
+                             api_custom_views.QueryPlanMixin,
+                             viewsets.ModelViewSet):
+    pagination_class = api_pagination.CustomCursorPagination
+
     def get_queryset(self):
-        return self.serializer_class.Meta.model.objects.filter(
+        queryset = self.serializer_class.Meta.model.objects.filter(
             created_by=self.request.user,
         )
+        return self.apply_query_plan(queryset)
 
 
-class CustomBaseWsModelViewSet(viewsets.ModelViewSet):
+class CustomBaseWsModelViewSet(api_custom_views.ConditionalGetMixin,
+                               api_custom_views.QueryPlanMixin,
+                               viewsets.ModelViewSet):
+    pagination_class = api_pagination.CustomCursorPagination
+
     def get_queryset(self):
-        return self.serializer_class.Meta.model.objects.filter(
+        queryset = self.serializer_class.Meta.model.objects.filter(
             workspace__pk=self.kwargs["ws_pk"],
             created_by=self.request.user,
         )
+        return self.apply_query_plan(queryset)
+
 
+class CustomBaseCatModelViewSet(api_custom_views.ConditionalGetMixin,
+                                api_custom_views.QueryPlanMixin,
+                                viewsets.ModelViewSet):
+    pagination_class = api_pagination.CustomCursorPagination
 
-class CustomBaseCatModelViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
-        return self.serializer_class.Meta.model.objects.filter(
+        queryset = self.serializer_class.Meta.model.objects.filter(
             category__pk=self.kwargs["cat_pk"],
             created_by=self.request.user,
         )
+        return self.apply_query_plan(queryset)
 
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = User.objects.all()
+    queryset = User.objects.prefetch_related("workspaces")
     serializer_class = workspace_serializers.UserSerializer
     permission_classes = [
         permissions.IsAuthenticated,
     ]
 
 
-class WorkspaceViewSet(CustomBaseModelViewSet):
+class WorkspaceViewSet(api_custom_views.ResponseCacheMixin,
+                       CustomBaseModelViewSet):
     serializer_class = workspace_serializers.WorkspaceSerializer
     permission_classes = [
         permissions.IsAuthenticated,
         api_permissions.IsOwnerOrAdminOrReadOnly,
     ]
+    response_cache_scope = "user"
+
+    @action(detail=True, methods=["get"])
+    def snapshot(self, request, *args, **kwargs):
+        """
+        Returns the workspace with all its objects in one document (see
+        `api.utils.snapshot`).
+        """
+        workspace = self.get_object()
+        return Response(
+            api_snapshot.get_workspace_snapshot(workspace, request.user))
 
 
 class WorkspaceCommentViewSet(CustomBaseWsModelViewSet):
@@ -63,7 +105,8 @@ class WorkspaceCommentViewSet(CustomBaseWsModelViewSet):
     ]
 
 
-class CategoryViewSet(CustomBaseWsModelViewSet):
+class CategoryViewSet(api_custom_views.ResponseCacheMixin,
+                      CustomBaseWsModelViewSet):
     serializer_class = category_serializers.CategorySerializer
     permission_classes = [
         permissions.IsAuthenticated,
@@ -79,7 +122,8 @@ class CategoryCommentViewSet(CustomBaseCatModelViewSet):
     ]
 
 
-class TagViewSet(CustomBaseWsModelViewSet):
+class TagViewSet(api_custom_views.ResponseCacheMixin,
+                 CustomBaseWsModelViewSet):
     serializer_class = workspace_serializers.TagSerializer
     permission_classes = [
         permissions.IsAuthenticated,
@@ -87,7 +131,8 @@ class TagViewSet(CustomBaseWsModelViewSet):
     ]
 
 
-class PriorityViewSet(CustomBaseWsModelViewSet):
+class PriorityViewSet(api_custom_views.ResponseCacheMixin,
+                      CustomBaseWsModelViewSet):
     serializer_class = workspace_serializers.PrioritySerializer
     permission_classes = [
         permissions.IsAuthenticated,
@@ -95,7 +140,8 @@ class PriorityViewSet(CustomBaseWsModelViewSet):
     ]
 
 
-class StatusViewSet(CustomBaseWsModelViewSet):
+class StatusViewSet(api_custom_views.ResponseCacheMixin,
+                    CustomBaseWsModelViewSet):
     serializer_class = workspace_serializers.StatusSerializer
     permission_classes = [
         permissions.IsAuthenticated,
@@ -103,7 +149,8 @@ class StatusViewSet(CustomBaseWsModelViewSet):
     ]
 
 
-class ProjectViewSet(CustomBaseCatModelViewSet):
+class ProjectViewSet(api_custom_views.BulkActionsMixin,
+                     CustomBaseCatModelViewSet):
     serializer_class = project_serializers.ProjectSerializer
     permission_classes = [
         permissions.IsAuthenticated,
@@ -111,35 +158,44 @@ class ProjectViewSet(CustomBaseCatModelViewSet):
     ]
 
 
-class ProjectCommentViewSet(viewsets.ModelViewSet):
+class ProjectCommentViewSet(api_custom_views.ConditionalGetMixin,
+                            api_custom_views.QueryPlanMixin,
+                            viewsets.ModelViewSet):
     serializer_class = project_serializers.ProjectCommentSerializer
     permission_classes = [
         permissions.IsAuthenticated,
         api_permissions.IsOwnerOrAdminOrReadOnly,
     ]
+    pagination_class = api_pagination.CustomCursorPagination
 
     def get_queryset(self):
-        return self.serializer_class.Meta.model.objects.filter(
+        queryset = self.serializer_class.Meta.model.objects.filter(
             project__pk=self.kwargs["pr_pk"],
             created_by=self.request.user,
         )
+        return self.apply_query_plan(queryset)
 
 
-class ProjectTaskViewSet(viewsets.ModelViewSet):
+class ProjectTaskViewSet(api_custom_views.ConditionalGetMixin,
+                         api_custom_views.QueryPlanMixin,
+                         viewsets.ModelViewSet):
     serializer_class = task_serializers.ProjectTaskSerializer
     permission_classes = [
         permissions.IsAuthenticated,
         api_permissions.IsOwnerOrAdminOrReadOnly,
     ]
+    pagination_class = api_pagination.CustomCursorPagination
 
     def get_queryset(self):
-        return self.serializer_class.Meta.model.objects.filter(
+        queryset = self.serializer_class.Meta.model.objects.filter(
             project__pk=self.kwargs["pr_pk"],
             created_by=self.request.user,
         )
+        return self.apply_query_plan(queryset)
 
 
-class TaskViewSet(CustomBaseCatModelViewSet):
+class TaskViewSet(api_custom_views.BulkActionsMixin,
+                  CustomBaseCatModelViewSet):
     serializer_class = task_serializers.TaskSerializer
     permission_classes = [
         permissions.IsAuthenticated,
@@ -147,15 +203,175 @@ class TaskViewSet(CustomBaseCatModelViewSet):
     ]
 
 
-class TaskCommentViewSet(viewsets.ModelViewSet):
+class TaskCommentViewSet(api_custom_views.ConditionalGetMixin,
+                         api_custom_views.QueryPlanMixin,
+                         viewsets.ModelViewSet):
     serializer_class = task_serializers.TaskCommentSerializer
     permission_classes = [
         permissions.IsAuthenticated,
         api_permissions.IsOwnerOrAdminOrReadOnly,
     ]
+    pagination_class = api_pagination.CustomCursorPagination
 
     def get_queryset(self):
-        return self.serializer_class.Meta.model.objects.filter(
+        queryset = self.serializer_class.Meta.model.objects.filter(
             task__pk=self.kwargs["task_pk"],
             created_by=self.request.user,
         )
+        return self.apply_query_plan(queryset)
+
+
+class SyncView(APIView):
+    """
+    Delta sync of all objects of the user.
+
+    Returns objects created or updated, and ids of objects deleted, since the
+    `since` token returned by an earlier sync (all objects if not given),
+    along with the `next` token to sync from. The token is taken a margin
+    before the sync, so that changes committed while it runs are not missed;
+    they may be returned again by the next sync.
+
+    Tombstones of deleted objects are kept for `TOMBSTONE_RETENTION_DAYS`,
+    so tokens older than that are rejected: deletions since may have been
+    pruned and the client has to sync all objects again.
+    """
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+    sync_serializers = {
+        "workspaces": workspace_serializers.WorkspaceSerializer,
+        "workspace_comments": workspace_serializers.WorkspaceCommentSerializer,
+        "tags": workspace_serializers.TagSerializer,
+        "priorities": workspace_serializers.PrioritySerializer,
+        "statuses": workspace_serializers.StatusSerializer,
+        "categories": category_serializers.CategorySerializer,
+        "category_comments": category_serializers.CategoryCommentSerializer,
+        "projects": project_serializers.ProjectSerializer,
+        "project_comments": project_serializers.ProjectCommentSerializer,
+        "tasks": task_serializers.TaskSerializer,
+        "task_comments": task_serializers.TaskCommentSerializer,
+    }
+    token_margin = dt.timedelta(seconds=5)
+    token_epoch = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+    @classmethod
+    def encode_token(cls, timestamp):
+        return str((timestamp - cls.token_epoch) // dt.timedelta(microseconds=1))
+
+    @classmethod
+    def decode_token(cls, token):
+        try:
+            return cls.token_epoch + dt.timedelta(microseconds=int(token))
+        except (ValueError, OverflowError):
+            raise DrfVE({"since": ["Invalid sync token."]})
+
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get("since", None)
+        if since is not None:
+            since = self.decode_token(since)
+            if since < core_models.Tombstone.get_retention_start():
+                raise DrfVE({"since": [
+                    "Sync token expired, sync all objects again."]})
+        result = {
+            "next": self.encode_token(timezone.now() - self.token_margin),
+        }
+        for key, serializer_class in self.sync_serializers.items():
+            queryset = serializer_class.Meta.model.objects.filter(
+                created_by=request.user,
+            )
+            if since is not None:
+                queryset = queryset.filter(updated_at__gte=since)
+            queryset = api_custom_views.apply_query_plan(
+                queryset.order_by("updated_at", "id"), serializer_class,
+                serializer_class.get_requested_fields(request))
+            result[key] = serializer_class(
+                queryset, many=True, context={"request": request},
+            ).data
+        keys = {
+            serializer_class.Meta.model._meta.label_lower: key
+            for key, serializer_class in self.sync_serializers.items()
+        }
+        result["deleted"] = {key: [] for key in self.sync_serializers}
+        if since is not None:
+            tombstones = core_models.Tombstone.objects.filter(
+                created_by=request.user,
+                deleted_at__gte=since,
+            ).order_by("deleted_at", "id")
+            for model_label, object_id in tombstones.values_list(
+                    "model_label", "object_id"):
+                if model_label in keys:
+                    result["deleted"][keys[model_label]].append(object_id)
+        return Response(result)
+
+
+class ExportView(APIView):
+    """
+    Streams all objects of the user as NDJSON (see `api.utils.export`),
+    gzip compressed with `?compress=gzip`.
+    """
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    def get(self, request, *args, **kwargs):
+        compress = request.query_params.get("compress", None)
+        if compress not in [None, "gzip"]:
+            raise DrfVE({"compress": ['Only "gzip" is supported.']})
+        filename = "export.ndjson"
+        content_type = "application/x-ndjson"
+        if compress:
+            filename += ".gz"
+            content_type = "application/gzip"
+        return StreamingHttpResponse(
+            api_export.iter_export(request.user, compress=bool(compress)),
+            content_type=content_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+            },
+        )
+
+
+class ImportView(APIView):
+    """
+    Imports objects into the account of the user (see `api.utils.importer`)
+    from the request body, read as a stream
+        - NDJSON exports (`application/x-ndjson`)
+        - JSON fixtures (`application/json`)
+        - CSV rows of the table of `?table=` (`text/csv`)
+    optionally gzip compressed (`Content-Encoding: gzip`). Returns the number
+    of inserted rows per table.
+    """
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+    content_type_formats = {
+        "application/x-ndjson": "ndjson",
+        "application/json": "json",
+        "text/csv": "csv",
+    }
+
+    def post(self, request, *args, **kwargs):
+        content_type = request.content_type.split(";")[0].strip()
+        if content_type not in self.content_type_formats:
+            raise DrfVE(
+                f'Unsupported content type "{content_type}", expected one '
+                f'of {", ".join(self.content_type_formats)}.')
+        stream = request.stream
+        if stream is None:
+            raise DrfVE("Empty request body.")
+        if request.headers.get("Content-Encoding") == "gzip":
+            stream = gzip.GzipFile(fileobj=stream)
+        try:
+            records = api_importer.read_records(
+                stream, self.content_type_formats[content_type],
+                request.query_params.get("table", None))
+            counts = api_importer.import_records(request.user, records)
+        except DjVE as e:
+            raise DrfVE(e.messages)
+        except (ValueError, KeyError, FieldDoesNotExist, IntegrityError,
+                gzip.BadGzipFile) as e:
+            raise DrfVE(f'Invalid input: {e}')
+        return Response(counts, status=status.HTTP_201_CREATED)
@@ -20,3 +20,4 @@ admin.site.register(models.Project, CustomAdmin)
 admin.site.register(models.ProjectComment)
 admin.site.register(models.Task, CustomAdmin)
 admin.site.register(models.TaskComment)
+admin.site.register(models.Tombstone)
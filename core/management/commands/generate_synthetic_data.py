@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.utils import synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users with workspaces, category and task trees, tags and "
+        "comment threads of synthetic data, at a given scale."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in synthetic.DEFAULT_SCALE.items():
+            parser.add_argument(f'--{name.replace("_", "-")}', type=int,
+                                default=default)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--username-prefix", default="synthetic",
+                            help="Users are named <prefix>-<n>.")
+        parser.add_argument("--password",
+                            help="Password of the users (unusable by "
+                                 "default).")
+
+    def handle(self, *args, **options):
+        scale = {name: options[name] for name in synthetic.DEFAULT_SCALE}
+        with transaction.atomic():
+            users, counts = synthetic.generate(
+                seed=options["seed"],
+                username_prefix=options["username_prefix"],
+                password=options["password"], **scale)
+        self.stdout.write(
+            f'Users: {", ".join(user.username for user in users)}')
+        self.stdout.write(json.dumps(counts, indent=2))
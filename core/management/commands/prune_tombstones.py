@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import models as core_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete tombstones of objects deleted more than "
+        "`TOMBSTONE_RETENTION_DAYS` ago (see `api.views.SyncView`)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=None,
+            help="Keep tombstones of this many days instead of the setting.")
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is not None and days < 0:
+            raise CommandError("--days should not be negative.")
+        deleted, _ = core_models.Tombstone.objects.filter(
+            deleted_at__lt=core_models.Tombstone.get_retention_start(days),
+        ).delete()
+        self.stdout.write(f'Tombstone: {deleted} deleted')
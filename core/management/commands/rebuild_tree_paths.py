@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.signals import TREE_MODELS
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute `tree_path` of all tree models from `parent`, e.g. after "
+        "`loaddata` which bypasses model `save`."
+    )
+
+    def handle(self, *args, **options):
+        for model in TREE_MODELS:
+            updated = model.rebuild_tree_paths()
+            self.stdout.write(f'{model.__name__}: {updated} updated')
@@ -0,0 +1,78 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.utils import benchmarks
+from core.utils import synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Time demo views, API end points and tree operations and write the "
+        "results as JSON. Cases run against synthetic data generated at the "
+        "given scale in a transaction which is rolled back, or against the "
+        "data of an existing user."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in synthetic.DEFAULT_SCALE.items():
+            if name != "users":
+                parser.add_argument(f'--{name.replace("_", "-")}', type=int,
+                                    default=default)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--username",
+                            help="Run against data of this user instead.")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--case", action="append", dest="cases",
+                            help="Run only this case (repeatable).")
+        parser.add_argument("--output", "-o",
+                            help="File to write the results to.")
+        parser.add_argument("--compare",
+                            help="Results of an earlier run to compare to.")
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        if options["username"]:
+            try:
+                user = get_user_model().objects.get(
+                    username=options["username"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(
+                    f'User "{options["username"]}" not found.')
+            results = benchmarks.run(user, options["repeat"],
+                                     options["cases"])
+        else:
+            scale = {
+                name: options[name] for name in synthetic.DEFAULT_SCALE
+                if name != "users"
+            }
+            with transaction.atomic():
+                users, counts = synthetic.generate(
+                    seed=options["seed"], username_prefix="benchmark",
+                    users=1, **scale)
+                results = benchmarks.run(users[0], options["repeat"],
+                                         options["cases"])
+                transaction.set_rollback(True)
+            results["scale"] = {"seed": options["seed"], **scale}
+            results["rows"] = counts
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
+        for name, result in results["results"].items():
+            self.stdout.write(
+                f'{name:<28} first {result["first"] * 1000:8.1f}ms  '
+                f'median {result["median"] * 1000:8.1f}ms  '
+                f'{result["queries"]:4} queries')
+        if options["compare"]:
+            with open(options["compare"]) as baseline_file:
+                baseline = json.load(baseline_file)
+            self.stdout.write("\nmedian, baseline -> current:")
+            for name, base, current, ratio in benchmarks.compare(
+                    results, baseline):
+                change = f'{ratio:.2f}x' if ratio is not None else "-"
+                self.stdout.write(
+                    f'{name:<28} {base * 1000:8.1f}ms -> '
+                    f'{current * 1000:8.1f}ms  {change}')
@@ -0,0 +1,180 @@
+import contextlib
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.utils import metrics
+from core.utils import profiler
+from core.utils import slow_queries
+
+
+class QueryTimer():
+    """
+    Database execute wrapper counting queries and their time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware():
+    """
+    Records latency, SQL time, SQL query count and response size of requests
+    per view (see `core.utils.metrics`) and adds them to responses as a
+    `Server-Timing` header.
+
+    Latency of streamed responses is measured until the view returns.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        resolver_match = getattr(request, "resolver_match", None)
+        view_name = resolver_match.view_name if resolver_match else ""
+        metrics.observe(
+            (view_name or "<unresolved>", request.method),
+            {
+                "request_duration_seconds": duration,
+                "request_sql_duration_seconds": timer.seconds,
+                "request_sql_queries": timer.count,
+                "response_size_bytes": (
+                    None if response.streaming else len(response.content)),
+            },
+        )
+        response["Server-Timing"] = (
+            f'db;dur={timer.seconds * 1000:.1f};desc="{timer.count} queries",'
+            f' total;dur={duration * 1000:.1f}'
+        )
+        return response
+
+
+class ProfilerMiddleware():
+    """
+    Profiles requests of staff users sent with an `X-Profile` header or a
+    `_profile` query parameter (see `core.utils.profiler`). The profile of
+    the view (collapsed stacks and SQL queries) is stored and its id is
+    returned in the `X-Profile-Id` header, to be read from the `profile`
+    view.
+
+    Users of API requests are authenticated by the view, after middlewares,
+    so their credentials are checked with the API authentication classes
+    before profiling starts.
+    """
+
+    header = "HTTP_X_PROFILE"
+    query_param = "_profile"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def is_requested(self, request):
+        if self.header not in request.META \
+                and self.query_param not in request.GET:
+            return False
+        if request.user.is_staff:
+            return True
+        user = self.get_api_user(request)
+        return user is not None and user.is_staff
+
+    @staticmethod
+    def get_api_user(request):
+        """
+        Returns the user authenticated by the `Authorization` header of a
+        request, or None. `request.user` is left as is.
+        """
+        if "HTTP_AUTHORIZATION" not in request.META:
+            return None
+        api_request = Request(request)
+        for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            try:
+                result = authentication().authenticate(api_request)
+            except APIException:
+                return None
+            if result is not None:
+                return result[0]
+        return None
+
+    def __call__(self, request):
+        if not self.is_requested(request):
+            return self.get_response(request)
+        sampler = profiler.Sampler()
+        recorders = [
+            profiler.QueryRecorder(connection.alias)
+            for connection in connections.all()
+        ]
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection, recorder in zip(connections.all(), recorders):
+                stack.enter_context(connection.execute_wrapper(recorder))
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+        duration = time.perf_counter() - start
+        resolver_match = getattr(request, "resolver_match", None)
+        queries = [query for recorder in recorders
+                   for query in recorder.queries]
+        response["X-Profile-Id"] = profiler.store({
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": resolver_match.view_name if resolver_match else None,
+            "user": request.user.pk,
+            "status": response.status_code,
+            "started_at": time.time() - duration,
+            "duration": duration * 1000,
+            "sample_interval": sampler.interval * 1000,
+            "samples": sum(sampler.counts.values()),
+            "collapsed": sampler.get_collapsed(),
+            "query_count": sum(recorder.count for recorder in recorders),
+            "query_duration": sum(query["duration"] for query in queries),
+            "queries": queries,
+        })
+        return response
+
+
+class SlowQueryMiddleware():
+    """
+    Logs queries of requests slower than `SLOW_QUERY_THRESHOLD` seconds with
+    their view, call site and plan (see `core.utils.slow_queries`). Not used
+    if the threshold is None.
+    """
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_THRESHOLD is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        def get_view_name():
+            resolver_match = getattr(request, "resolver_match", None)
+            return resolver_match.view_name if resolver_match else None
+
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(
+                    slow_queries.SlowQueryLogger(
+                        connection, view_name=get_view_name)))
+            return self.get_response(request)
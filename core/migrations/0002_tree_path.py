@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+TREE_MODELS = [
+    "Category", "CategoryComment", "Project", "ProjectComment",
+    "Task", "TaskComment", "WorkspaceComment",
+]
+
+
+def populate_tree_path(apps, schema_editor):
+    for model_name in TREE_MODELS:
+        model = apps.get_model("core", model_name)
+        parents = dict(model.objects.values_list("pk", "parent_id"))
+        paths = {}
+        for pk in parents:
+            chain = []
+            chain_pks = set()
+            while pk is not None and pk not in paths:
+                if pk in chain_pks:
+                    cycle = sorted(chain[chain.index(pk):])
+                    raise ValueError(
+                        f'{model_name}: parents of rows {cycle[:10]} form a '
+                        f'cycle, set the parent of one of them to null.')
+                chain.append(pk)
+                chain_pks.add(pk)
+                pk = parents[pk]
+            path = "/" if pk is None else f'{paths[pk]}{pk}/'
+            for chain_pk in reversed(chain):
+                paths[chain_pk] = path
+                path = f'{path}{chain_pk}/'
+        objs = []
+        for obj in model.objects.only("pk"):
+            obj.tree_path = paths[obj.pk]
+            objs.append(obj)
+        model.objects.bulk_update(objs, ["tree_path"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='categorycomment',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='projectcomment',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='taskcomment',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='workspacecomment',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=500),
+        ),
+        migrations.RunPython(populate_tree_path, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tree_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['workspace', 'created_by', 'updated_at', 'id'], name='category_ws_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categorycomment',
+            index=models.Index(fields=['category', 'created_by', 'updated_at', 'id'], name='cat_comment_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='priority',
+            index=models.Index(fields=['workspace', 'created_by', 'updated_at', 'id'], name='priority_ws_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['category', 'created_by', 'updated_at', 'id'], name='project_cat_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectcomment',
+            index=models.Index(fields=['project', 'created_by', 'updated_at', 'id'], name='pr_comment_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='status',
+            index=models.Index(fields=['workspace', 'created_by', 'updated_at', 'id'], name='status_ws_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['workspace', 'created_by', 'updated_at', 'id'], name='tag_ws_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['category', 'created_by', 'updated_at', 'id'], name='task_cat_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'created_by', 'updated_at', 'id'], name='task_pr_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=models.Index(fields=['task', 'created_by', 'updated_at', 'id'], name='task_comment_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workspace',
+            index=models.Index(fields=['created_by', 'updated_at', 'id'], name='workspace_cb_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workspacecomment',
+            index=models.Index(fields=['workspace', 'created_by', 'updated_at', 'id'], name='ws_comment_cb_updated_idx'),
+        ),
+    ]
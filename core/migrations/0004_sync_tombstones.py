@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_list_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['created_by', 'updated_at'], name='category_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categorycomment',
+            index=models.Index(fields=['created_by', 'updated_at'], name='cat_comment_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='priority',
+            index=models.Index(fields=['created_by', 'updated_at'], name='priority_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_by', 'updated_at'], name='project_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectcomment',
+            index=models.Index(fields=['created_by', 'updated_at'], name='pr_comment_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='status',
+            index=models.Index(fields=['created_by', 'updated_at'], name='status_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['created_by', 'updated_at'], name='tag_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_by', 'updated_at'], name='task_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=models.Index(fields=['created_by', 'updated_at'], name='task_comment_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workspacecomment',
+            index=models.Index(fields=['created_by', 'updated_at'], name='ws_comment_sync_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['created_by', 'deleted_at'], name='tombstone_cb_deleted_idx'),
+        ),
+    ]
@@ -3,8 +3,9 @@ import datetime as dt
 from django.core.exceptions import ValidationError
 from django.db import models as djm
 from django.conf import settings
-from django.db.models import functions as db_funcs
+from django.db.models import Q, functions as db_funcs
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from core import models as core_models
@@ -12,7 +13,7 @@ from core.utils import mixins as core_mixins
 
 
 class Project(core_mixins.TreeMixin, djm.Model):
-    uuid = djm.UUIDField(default=uuid.uuid4, editable=False)
+    uuid = djm.UUIDField(default=uuid.uuid4, editable=False, db_index=True)
     title = djm.CharField(max_length=200)
     detail = djm.TextField(blank=True)
     workspace = djm.ForeignKey("core.Workspace", on_delete=djm.CASCADE,
@@ -27,6 +28,8 @@ class Project(core_mixins.TreeMixin, djm.Model):
                               null=True, blank=True, related_name="projects")
     parent = djm.ForeignKey('self', on_delete=djm.SET_NULL, null=True,
                             blank=True, related_name="children")
+    tree_path = djm.CharField(max_length=500, default="/", editable=False,
+                              db_index=True)
     is_visible = djm.BooleanField(default=True)
     estimated_start_date = djm.DateTimeField(null=True, blank=True)
     estimated_end_date = djm.DateTimeField(null=True, blank=True)
@@ -41,6 +44,9 @@ class Project(core_mixins.TreeMixin, djm.Model):
     created_by = djm.ForeignKey(settings.AUTH_USER_MODEL, on_delete=djm.PROTECT,
                                 related_name="projects")
 
+    tree_scope_field = "category_id"
+    tracked_fields = ("is_visible",)
+
     @property
     def due_in(self):
         if self.estimated_end_date:
@@ -57,31 +63,51 @@ class Project(core_mixins.TreeMixin, djm.Model):
     def get_absolute_url(self):
         return reverse("demo:project-detail", kwargs={"uuid": self.uuid})
 
-    def update_task_visibility(self):
-        if self.tasks:
-            for task in self.tasks.all():
-                task.is_visible = self.is_visible
-                task.save()
+    def update_task_visibility(self, descendants=True):
+        """
+        Set visibility of tasks of self, and of its descendants unless
+        `descendants` is false, to self's in a single UPDATE. Returns number
+        of tasks updated.
+        """
+        projects = Q(pk=self.pk)
+        if descendants:
+            projects |= self.tree_path_prefix_q(
+                self.get_descendant_tree_path())
+        return core_models.Task.objects.filter(
+            project__in=Project.objects.filter(projects).values("pk"),
+        ).exclude(
+            is_visible=self.is_visible,
+        ).update(is_visible=self.is_visible, updated_at=timezone.now())
 
     def update_children_visibility(self):
-        # move children to project if root parent is moved
-        children = self.get_children(self)
-        if children:
-            for child in children:
-                child.is_visible = self.is_visible
-                child.save()
-                child.update_children_visibility()
+        """
+        Set visibility of all descendants to self's in a single UPDATE.
+        Returns number of projects updated.
+        """
+        return self.get_descendants(self).exclude(
+            is_visible=self.is_visible,
+        ).update(is_visible=self.is_visible, updated_at=timezone.now())
+
+    def update_visibility_cascade(self):
+        """
+        Cascade visibility of self to its subtree and the subtree's tasks.
+        Returns number of rows updated per model.
+        """
+        return {
+            "projects": self.update_children_visibility(),
+            "tasks": self.update_task_visibility(),
+        }
 
     def clean(self, *args, **kwargs):
-        if self.category and self.category.workspace != self.workspace:
+        if self.category_id and self.category.workspace_id != self.workspace_id:
             raise ValidationError(
                 "Category, status and priority should be from same workspace as self.")
 
-        if self.status and self.status.workspace != self.workspace:
+        if self.status_id and self.status.workspace_id != self.workspace_id:
             raise ValidationError(
                 "Category, status and priority should be from same workspace as self.")
 
-        if self.priority and self.priority.workspace != self.workspace:
+        if self.priority_id and self.priority.workspace_id != self.workspace_id:
             raise ValidationError(
                 "Category, status and priority should be from same workspace as self.")
 
@@ -93,12 +119,16 @@ class Project(core_mixins.TreeMixin, djm.Model):
         return super().clean(*args, **kwargs)
 
     def save(self, *args, **kwargs):
+        is_visible_changed = not self._state.adding \
+            and self.has_changed("is_visible")
         super().save(*args, **kwargs)
-        if self.pk:
-            self.update_task_visibility()
-        if self.pk and not self.parent:
-            if self.children.all().exists():
-                self.update_children_visibility()
+        if is_visible_changed:
+            # children have their parent's visibility (see `clean`), so only
+            # changes of roots cascade to subtrees
+            if self.parent_id is None:
+                self.update_visibility_cascade()
+            else:
+                self.update_task_visibility(descendants=False)
 
     class Meta:
         constraints = [
@@ -107,6 +137,14 @@ class Project(core_mixins.TreeMixin, djm.Model):
                 name="unique_lower_project_title_category_workspace_created_by"
             ),
         ]
+        indexes = [
+            djm.Index(fields=["category", "created_by", "updated_at", "id"],
+                      name="project_cat_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="project_sync_idx"),
+            djm.Index(fields=["workspace", "is_visible"],
+                      name="project_ws_visible_idx"),
+        ]
 
 
 class ProjectComment(core_mixins.TreeMixin, core_mixins.CommentMixin, djm.Model):
@@ -115,10 +153,22 @@ class ProjectComment(core_mixins.TreeMixin, core_mixins.CommentMixin, djm.Model)
                              related_name="comments")
     parent = djm.ForeignKey('self', on_delete=djm.SET_NULL, null=True,
                             blank=True, related_name="children")
+    tree_path = djm.CharField(max_length=500, default="/", editable=False,
+                              db_index=True)
     created_at = djm.DateTimeField(auto_now_add=True)
     updated_at = djm.DateTimeField(auto_now=True)
     created_by = djm.ForeignKey(settings.AUTH_USER_MODEL, on_delete=djm.PROTECT,
                                 related_name="project_comments")
 
+    tree_scope_field = "project_id"
+
     def __str__(self):
         return f'{str(self.project)}|{self.get_content_display()}'
+
+    class Meta:
+        indexes = [
+            djm.Index(fields=["project", "created_by", "updated_at", "id"],
+                      name="pr_comment_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="pr_comment_sync_idx"),
+        ]
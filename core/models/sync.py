@@ -0,0 +1,36 @@
+import datetime as dt
+
+from django.db import models as djm
+from django.conf import settings
+from django.utils import timezone
+
+
+class Tombstone(djm.Model):
+    """
+    Record of a deleted object, so that clients syncing changes since a point
+    in time learn about deletions (see `api.views.SyncView`).
+    """
+    model_label = djm.CharField(max_length=100)
+    object_id = djm.PositiveBigIntegerField()
+    deleted_at = djm.DateTimeField(auto_now_add=True)
+    created_by = djm.ForeignKey(settings.AUTH_USER_MODEL, on_delete=djm.CASCADE,
+                                related_name="tombstones")
+
+    def __str__(self):
+        return f'{self.model_label}:{self.object_id}'
+
+    @staticmethod
+    def get_retention_start(days=None):
+        """
+        Returns the time tombstones are kept from, `TOMBSTONE_RETENTION_DAYS`
+        before now by default.
+        """
+        if days is None:
+            days = settings.TOMBSTONE_RETENTION_DAYS
+        return timezone.now() - dt.timedelta(days=days)
+
+    class Meta:
+        indexes = [
+            djm.Index(fields=["created_by", "deleted_at"],
+                      name="tombstone_cb_deleted_idx"),
+        ]
@@ -4,6 +4,7 @@ from django.core.exceptions import ValidationError
 from django.db import models as djm
 from django.conf import settings
 from django.db.models import F, Q, functions as db_funcs
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 
@@ -12,7 +13,7 @@ from core.utils import mixins as core_mixins
 
 
 class Task(core_mixins.TreeMixin, djm.Model):
-    uuid = djm.UUIDField(default=uuid.uuid4, editable=False)
+    uuid = djm.UUIDField(default=uuid.uuid4, editable=False, db_index=True)
     title = djm.CharField(max_length=240)
     detail = djm.TextField(blank=True)
     workspace = djm.ForeignKey("core.Workspace", on_delete=djm.CASCADE,
@@ -29,6 +30,8 @@ class Task(core_mixins.TreeMixin, djm.Model):
                               null=True, blank=True, related_name="tasks")
     parent = djm.ForeignKey('self', on_delete=djm.SET_NULL, null=True,
                             blank=True, related_name="children")
+    tree_path = djm.CharField(max_length=500, default="/", editable=False,
+                              db_index=True)
     is_visible = djm.BooleanField(default=True)
     estimated_start_date = djm.DateTimeField(null=True, blank=True)
     estimated_end_date = djm.DateTimeField(null=True, blank=True)
@@ -43,6 +46,9 @@ class Task(core_mixins.TreeMixin, djm.Model):
     created_by = djm.ForeignKey(settings.AUTH_USER_MODEL, on_delete=djm.PROTECT,
                                 related_name="tasks")
 
+    tree_scope_field = "category_id"
+    tracked_fields = ("is_visible", "project_id")
+
     @property
     def due_in(self):
         if self.estimated_end_date:
@@ -70,33 +76,33 @@ class Task(core_mixins.TreeMixin, djm.Model):
         return reverse("demo:task-detail", kwargs={"uuid": self.uuid})
 
     def update_children_project(self):
-        # move children to project if root parent is moved
-        children = self.get_children(self)
-        if children:
-            for child in children:
-                child.project = self.project
-                child.save()
-                child.update_children_project()
+        """
+        Move all descendants to self's project in a single UPDATE.
+        Returns number of tasks updated.
+        """
+        return self.get_descendants(self).exclude(
+            project_id=self.project_id,
+        ).update(project_id=self.project_id, updated_at=timezone.now())
 
     def update_children_visibility(self):
-        # move children to project if root parent is moved
-        children = self.get_children(self)
-        if children:
-            for child in children:
-                child.is_visible = self.is_visible
-                child.save()
-                child.update_children_visibility()
+        """
+        Set visibility of all descendants to self's in a single UPDATE.
+        Returns number of tasks updated.
+        """
+        return self.get_descendants(self).exclude(
+            is_visible=self.is_visible,
+        ).update(is_visible=self.is_visible, updated_at=timezone.now())
 
     def clean(self, *args, **kwargs):
-        if self.category and self.category.workspace != self.workspace:
+        if self.category_id and self.category.workspace_id != self.workspace_id:
             raise ValidationError(
                 "Category, status and priority should be from same workspace as self.")
 
-        if self.status and self.status.workspace != self.workspace:
+        if self.status_id and self.status.workspace_id != self.workspace_id:
             raise ValidationError(
                 "Category, status and priority should be from same workspace as self.")
 
-        if self.priority and self.priority.workspace != self.workspace:
+        if self.priority_id and self.priority.workspace_id != self.workspace_id:
             raise ValidationError(
                 "Category, status and priority should be from same workspace as self.")
 
@@ -108,10 +114,15 @@ class Task(core_mixins.TreeMixin, djm.Model):
         return super().clean(*args, **kwargs)
 
     def save(self, *args, **kwargs):
+        adding = self._state.adding
+        is_visible_changed = not adding and self.has_changed("is_visible")
+        project_changed = not adding and self.has_changed("project_id")
         super().save(*args, **kwargs)
-        if self.pk and not self.parent:
-            if self.children.all().exists():
+        # move children to project if root parent is moved
+        if self.parent_id is None:
+            if project_changed:
                 self.update_children_project()
+            if is_visible_changed:
                 self.update_children_visibility()
 
     class Meta:
@@ -122,6 +133,16 @@ class Task(core_mixins.TreeMixin, djm.Model):
                 name="unique_lower_workspace_category_project_created_by"
             ),
         ]
+        indexes = [
+            djm.Index(fields=["category", "created_by", "updated_at", "id"],
+                      name="task_cat_cb_updated_idx"),
+            djm.Index(fields=["project", "created_by", "updated_at", "id"],
+                      name="task_pr_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="task_sync_idx"),
+            djm.Index(fields=["workspace", "is_visible", "project"],
+                      name="task_ws_visible_pr_idx"),
+        ]
 
 
 class TaskComment(core_mixins.TreeMixin, core_mixins.CommentMixin, djm.Model):
@@ -130,10 +151,22 @@ class TaskComment(core_mixins.TreeMixin, core_mixins.CommentMixin, djm.Model):
         "core.Task", on_delete=djm.CASCADE, related_name="comments")
     parent = djm.ForeignKey('self', on_delete=djm.SET_NULL, null=True,
                             blank=True, related_name="children")
+    tree_path = djm.CharField(max_length=500, default="/", editable=False,
+                              db_index=True)
     created_at = djm.DateTimeField(auto_now_add=True)
     updated_at = djm.DateTimeField(auto_now=True)
     created_by = djm.ForeignKey(settings.AUTH_USER_MODEL, on_delete=djm.PROTECT,
                                 related_name="task_comments")
 
+    tree_scope_field = "task_id"
+
     def __str__(self):
         return f'{str(self.task)}|{self.get_content_display()}'
+
+    class Meta:
+        indexes = [
+            djm.Index(fields=["task", "created_by", "updated_at", "id"],
+                      name="task_comment_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="task_comment_sync_idx"),
+        ]
@@ -71,6 +71,10 @@ class Workspace(djm.Model):
                 name="unique_lower_workspace_owner_name",
             ),
         ]
+        indexes = [
+            djm.Index(fields=["created_by", "updated_at", "id"],
+                      name="workspace_cb_updated_idx"),
+        ]
 
 
 class Category(core_mixins.TreeMixin, djm.Model):
@@ -83,11 +87,15 @@ class Category(core_mixins.TreeMixin, djm.Model):
                                related_name="categories")
     parent = djm.ForeignKey('self', on_delete=djm.SET_NULL, null=True,
                             blank=True, related_name="children")
+    tree_path = djm.CharField(max_length=500, default="/", editable=False,
+                              db_index=True)
     created_at = djm.DateTimeField(auto_now_add=True)
     updated_at = djm.DateTimeField(auto_now=True)
     created_by = djm.ForeignKey(settings.AUTH_USER_MODEL, on_delete=djm.PROTECT,
                                 related_name="ws_category_cb")
 
+    tree_scope_field = "workspace_id"
+
     def __str__(self) -> str:
         category, parent = self, self.parent
         result = [category.name]
@@ -112,6 +120,12 @@ class Category(core_mixins.TreeMixin, djm.Model):
                 name="unique_lower_category_name_workspace_parent",
             ),
         ]
+        indexes = [
+            djm.Index(fields=["workspace", "created_by", "updated_at", "id"],
+                      name="category_ws_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="category_sync_idx"),
+        ]
 
 
 class Tag(djm.Model):
@@ -132,6 +146,12 @@ class Tag(djm.Model):
             djm.UniqueConstraint(db_funcs.Lower("name"), "workspace",
                                  name="unique_lower_tag_name_workspace"),
         ]
+        indexes = [
+            djm.Index(fields=["workspace", "created_by", "updated_at", "id"],
+                      name="tag_ws_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="tag_sync_idx"),
+        ]
 
 
 class Priority(djm.Model):
@@ -155,6 +175,12 @@ class Priority(djm.Model):
             djm.UniqueConstraint(db_funcs.Lower("name"), "workspace",
                                  name="unique_lower_priority_name_workspace"),
         ]
+        indexes = [
+            djm.Index(fields=["workspace", "created_by", "updated_at", "id"],
+                      name="priority_ws_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="priority_sync_idx"),
+        ]
 
 
 class Status(djm.Model):
@@ -178,6 +204,12 @@ class Status(djm.Model):
             djm.UniqueConstraint(db_funcs.Lower("name"), "workspace",
                                  name="unique_lower_status_name_workspace"),
         ]
+        indexes = [
+            djm.Index(fields=["workspace", "created_by", "updated_at", "id"],
+                      name="status_ws_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="status_sync_idx"),
+        ]
 
 
 class WorkspaceComment(core_mixins.TreeMixin, core_mixins.CommentMixin, djm.Model):
@@ -186,14 +218,26 @@ class WorkspaceComment(core_mixins.TreeMixin, core_mixins.CommentMixin, djm.Mode
         "core.Workspace", on_delete=djm.CASCADE, related_name="comments")
     parent = djm.ForeignKey('self', on_delete=djm.SET_NULL, null=True,
                             blank=True, related_name="children")
+    tree_path = djm.CharField(max_length=500, default="/", editable=False,
+                              db_index=True)
     created_at = djm.DateTimeField(auto_now_add=True)
     updated_at = djm.DateTimeField(auto_now=True)
     created_by = djm.ForeignKey(settings.AUTH_USER_MODEL, on_delete=djm.PROTECT,
                                 related_name="workspace_comments")
 
+    tree_scope_field = "workspace_id"
+
     def __str__(self):
         return f'Workspace: {self.workspace} | {self.get_content_display()}'
 
+    class Meta:
+        indexes = [
+            djm.Index(fields=["workspace", "created_by", "updated_at", "id"],
+                      name="ws_comment_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="ws_comment_sync_idx"),
+        ]
+
 
 class CategoryComment(core_mixins.TreeMixin, core_mixins.CommentMixin, djm.Model):
     content = djm.TextField(blank=True)
@@ -201,10 +245,22 @@ class CategoryComment(core_mixins.TreeMixin, core_mixins.CommentMixin, djm.Model
         "core.Category", on_delete=djm.CASCADE, related_name="comments")
     parent = djm.ForeignKey('self', on_delete=djm.SET_NULL, null=True,
                             blank=True, related_name="children")
+    tree_path = djm.CharField(max_length=500, default="/", editable=False,
+                              db_index=True)
     created_at = djm.DateTimeField(auto_now_add=True)
     updated_at = djm.DateTimeField(auto_now=True)
     created_by = djm.ForeignKey(settings.AUTH_USER_MODEL, on_delete=djm.PROTECT,
                                 related_name="category_comments")
 
+    tree_scope_field = "category_id"
+
     def __str__(self):
         return f'{str(self.category)} | {self.get_content_display()}'
+
+    class Meta:
+        indexes = [
+            djm.Index(fields=["category", "created_by", "updated_at", "id"],
+                      name="cat_comment_cb_updated_idx"),
+            djm.Index(fields=["created_by", "updated_at"],
+                      name="cat_comment_sync_idx"),
+        ]
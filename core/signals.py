@@ -0,0 +1,141 @@
+import threading
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.utils import timezone
+
+from core import models as core_models
+from core.utils import tree_cache
+
+
+TREE_MODELS = [
+    core_models.Category,
+    core_models.WorkspaceComment,
+    core_models.CategoryComment,
+    core_models.Project,
+    core_models.ProjectComment,
+    core_models.Task,
+    core_models.TaskComment,
+]
+
+SYNC_MODELS = [
+    core_models.Workspace,
+    core_models.WorkspaceComment,
+    core_models.Tag,
+    core_models.Priority,
+    core_models.Status,
+    core_models.Category,
+    core_models.CategoryComment,
+    core_models.Project,
+    core_models.ProjectComment,
+    core_models.Task,
+    core_models.TaskComment,
+]
+
+# objects collected by `pre_delete` of the running delete
+_deletes = threading.local()
+
+
+def receiver_of(signal, senders, **kwargs):
+    """
+    Like `receiver`, connecting the function for each of given senders only.
+    Receivers without a sender would be connected for all models, so that
+    Django couldn't fast delete any (e.g. through tables of tags).
+    """
+    def _decorator(func):
+        for sender in senders:
+            signal.connect(func, sender=sender, **kwargs)
+        return func
+    return _decorator
+
+
+@receiver_of(pre_delete, SYNC_MODELS, dispatch_uid="core_collect_on_delete")
+def collect_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Collect the objects of a delete, so that their tombstones and the tree
+    paths of their descendants are written once per delete (see
+    `write_deleted`). Django sends `pre_delete` for all objects of a delete
+    before deleting any; deletes are told apart by their origin (the object
+    or queryset deleted).
+    """
+    if getattr(_deletes, "origin", None) is not origin \
+            or not getattr(_deletes, "objs", None):
+        _deletes.origin = origin
+        _deletes.objs = {}
+        _deletes.has_tombstones = False
+    _deletes.objs.setdefault(sender, {})[instance.pk] = instance
+
+
+@receiver_of(post_delete, SYNC_MODELS, dispatch_uid="core_write_on_delete")
+def write_deleted(sender, instance, origin=None, **kwargs):
+    """
+    On the first `post_delete` of a delete, record the deletion of all its
+    objects with one insert of tombstones. On the first one of each tree
+    model (sent once all its objects are deleted), strip the deleted objects
+    from the tree path of their remaining descendants, whose `parent` was set
+    to null.
+    """
+    if getattr(_deletes, "origin", None) is not origin \
+            or not getattr(_deletes, "objs", None):
+        return
+    if not _deletes.has_tombstones:
+        _deletes.has_tombstones = True
+        core_models.Tombstone.objects.bulk_create([
+            core_models.Tombstone(
+                model_label=model._meta.label_lower,
+                object_id=pk,
+                created_by_id=obj.created_by_id,
+            )
+            for model, objs in _deletes.objs.items()
+            for pk, obj in objs.items()
+        ])
+    objs = _deletes.objs.pop(sender, None)
+    if objs and sender in TREE_MODELS:
+        sender.strip_deleted_tree_paths(objs.values())
+    if not _deletes.objs:
+        _deletes.origin = None
+
+
+@receiver_of(post_save, TREE_MODELS, dispatch_uid="core_tree_cache_on_save")
+@receiver_of(post_delete, TREE_MODELS,
+             dispatch_uid="core_tree_cache_on_delete")
+def bump_tree_version(sender, instance, **kwargs):
+    """
+    Invalidate cached tree fragments of the object's scope, and of its
+    previous scope if it was moved.
+    """
+    scope_field = sender.tree_scope_field
+    scope_pks = {
+        getattr(instance, scope_field),
+        instance.get_tracked_value(scope_field),
+    }
+    for scope_pk in scope_pks - {None}:
+        tree_cache.bump_tree_version(sender, scope_pk)
+
+
+@receiver_of(post_save, [core_models.Workspace, core_models.Category],
+             dispatch_uid="core_sidebar_cache_on_save")
+@receiver_of(post_delete, [core_models.Workspace, core_models.Category],
+             dispatch_uid="core_sidebar_cache_on_delete")
+def bump_sidebar_version(sender, instance, **kwargs):
+    """
+    Invalidate the cached workspaces sidebar of the owner of a changed
+    workspace or category. The sidebar is versioned per user under the
+    workspace model.
+    """
+    tree_cache.bump_tree_version(core_models.Workspace, instance.created_by_id)
+
+
+@receiver_of(pre_delete, [core_models.Priority, core_models.Tag],
+             dispatch_uid="core_sync_references_on_delete")
+def bump_referencing_updated_at(sender, instance, **kwargs):
+    """
+    Projects and tasks lose a deleted priority (SET_NULL) or tag without
+    being saved, so their `updated_at` is bumped for the change to be synced.
+    """
+    if sender is core_models.Priority:
+        lookup = {"priority": instance}
+    else:
+        lookup = {"tags": instance}
+    now = timezone.now()
+    for model in [core_models.Project, core_models.Task]:
+        model.objects.filter(**lookup).update(updated_at=now)
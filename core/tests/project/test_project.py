@@ -1,5 +1,6 @@
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from core import models as core_models
 from ..generic_classes import CustomTestCaseSetup
 
@@ -282,3 +283,97 @@ class ProjectModelTreeTests(ProjectModelFullSetupTestClass):
             project.full_clean()
         except ValidationError as e:
             assert self.msg_visibility in str(e)
+
+    def test_visibility_cascade(self):
+        """
+        Test visibility of a root project cascades to its subtree and tasks
+        with a single UPDATE per table.
+        """
+
+        project = self.get_project_query(
+            [self.ws_1_cat_1_nested_project_1.pk]).get()
+        core_models.Task.objects.create(
+            title="task tmp",
+            workspace=project.workspace,
+            category=project.category,
+            project=self.ws_1_cat_1_nested_project_1_1_1,
+            created_by=self.user,
+        )
+        project.is_visible = False
+        with self.assertNumQueries(3):
+            project.save()
+        nested_projects = core_models.Project.get_descendants(project)
+        assert nested_projects.count() == 3
+        assert not nested_projects.filter(is_visible=True).exists()
+        assert not core_models.Task.objects.get(title="task tmp").is_visible
+
+    def test_visibility_of_child_not_cascaded(self):
+        """
+        Test visibility of a child project is set on its tasks only, not on
+        its subtree.
+        """
+
+        project = self.get_project_query(
+            [self.ws_1_cat_1_nested_project_1_1.pk]).get()
+        task = core_models.Task.objects.create(
+            title="task tmp",
+            workspace=project.workspace,
+            category=project.category,
+            project=project,
+            created_by=self.user,
+        )
+        project.is_visible = False
+        with self.assertNumQueries(2):
+            project.save()
+        task.refresh_from_db()
+        assert not task.is_visible
+        assert core_models.Project.get_descendants(project).filter(
+            is_visible=True).exists()
+
+    def test_visibility_cascade_counts(self):
+        """
+        Test visibility cascade reports number of rows updated.
+        """
+
+        project = self.get_project_query(
+            [self.ws_1_cat_1_nested_project_1.pk]).get()
+        project.is_visible = False
+        project.save()
+        assert project.update_visibility_cascade() == {
+            "projects": 0,
+            "tasks": 0,
+        }
+        project.is_visible = True
+        assert project.update_visibility_cascade() == {
+            "projects": 3,
+            "tasks": 0,
+        }
+
+    def test_task_visibility_uses_indexes(self):
+        """
+        Test tasks of a project subtree are updated through the tree path
+        index of projects and the project index of tasks, not a scan of tasks.
+        """
+
+        project = self.get_project_query(
+            [self.ws_1_cat_1_nested_project_1.pk]).get()
+        with CaptureQueriesContext(connection) as queries:
+            project.update_task_visibility()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'EXPLAIN QUERY PLAN {queries.captured_queries[0]["sql"]}')
+            plan = "\n".join(row[-1] for row in cursor.fetchall())
+        assert "INDEX core_project_tree_path_" in plan
+        assert "SEARCH core_task USING INDEX" in plan
+        assert "SCAN core_task" not in plan
+
+    def test_no_visibility_cascade_when_unchanged(self):
+        """
+        Test saving without a visibility change doesn't cascade.
+        """
+
+        project = self.get_project_query(
+            [self.ws_1_cat_1_nested_project_1.pk]).get()
+        project.title = "edit"
+        with self.assertNumQueries(1):
+            project.save()
@@ -1,6 +1,12 @@
+import importlib
+from unittest import mock
+
+from django.apps import apps
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from core import models as core_models
+from core.utils import tree_queries
 from ..generic_classes import CustomTestCaseSetup
 
 
@@ -284,3 +290,372 @@ class TaskModelTreeTests(TaskModelFullSetupTestClass):
             task.full_clean()
         except ValidationError as e:
             assert self.msg_visibility in str(e)
+
+    def test_tree_path_on_create(self):
+        """
+        Test tree path stores ancestors' primary keys.
+        """
+
+        assert self.ws_1_cat_1_nested_task_1.tree_path == "/"
+        assert self.ws_1_cat_1_nested_task_1_1_1.tree_path == (
+            f'/{self.ws_1_cat_1_nested_task_1.pk}'
+            f'/{self.ws_1_cat_1_nested_task_1_1.pk}/'
+        )
+
+    def test_tree_path_on_reparent(self):
+        """
+        Test descendants' tree path is rewritten when an object is reparented.
+        """
+
+        task = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1_1.pk]).get()
+        task.parent = None
+        task.save()
+        task_1_1_1 = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1_1_1.pk]).get()
+        assert task.tree_path == "/"
+        assert task_1_1_1.tree_path == f'/{task.pk}/'
+        assert core_models.Task.get_children_pk_list(
+            self.ws_1_cat_1_nested_task_1) == []
+
+    def test_tree_path_of_copies_loaded_before_move(self):
+        """
+        Test saving objects loaded before a move of their ancestor keeps
+        their rewritten parent and tree path, and moving them reads paths
+        from the database.
+        """
+
+        task_1 = self.ws_1_cat_1_nested_task_1
+        task_1_1 = self.ws_1_cat_1_nested_task_1_1
+        root = core_models.Task.objects.create(
+            title="root",
+            workspace=task_1.workspace,
+            category=task_1.category,
+            created_by=self.user,
+        )
+        stale_1_1, stale_1_1_1, stale_1_1_2 = self.get_task_query(
+            [task_1_1.pk,
+             self.ws_1_cat_1_nested_task_1_1_1.pk,
+             self.ws_1_cat_1_nested_task_1_1_2.pk]).order_by("pk")
+        moved = self.get_task_query([task_1_1.pk]).get()
+        moved.parent = None
+        moved.save()
+
+        stale_1_1_2.title = "edit"
+        stale_1_1_2.save()
+        stale_1_1_2.refresh_from_db()
+        assert stale_1_1_2.tree_path == f'/{task_1_1.pk}/'
+        stale_1_1.title = "edit"
+        stale_1_1.save()
+        stale_1_1.refresh_from_db()
+        assert stale_1_1.parent_id is None
+
+        stale_1_1_2.parent = stale_1_1_1
+        stale_1_1_1.parent.tree_path = "stale"
+        stale_1_1_2.save()
+        assert stale_1_1_2.tree_path == \
+            f'/{task_1_1.pk}/{stale_1_1_1.pk}/'
+        stale_1_1.tree_path = "/stale/"
+        stale_1_1.parent = root
+        stale_1_1.save()
+        stale_1_1_1.refresh_from_db()
+        assert stale_1_1_1.tree_path == f'/{root.pk}/{task_1_1.pk}/'
+        assert core_models.Task.rebuild_tree_paths() == 0
+
+    def test_tree_path_on_delete(self):
+        """
+        Test deleted object is stripped from descendants' tree path.
+        """
+
+        self.ws_1_cat_1_nested_task_1.delete()
+        task_1_1 = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1_1.pk]).get()
+        task_1_1_1 = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1_1_1.pk]).get()
+        assert task_1_1.parent is None
+        assert task_1_1.tree_path == "/"
+        assert task_1_1_1.tree_path == f'/{task_1_1.pk}/'
+
+    def test_tree_path_on_delete_together(self):
+        """
+        Test objects deleted together are stripped from the tree path of
+        their remaining descendants, up to the nearest deleted ancestor.
+        """
+
+        task_1_1 = self.ws_1_cat_1_nested_task_1_1
+        task_1_1_2 = self.ws_1_cat_1_nested_task_1_1_2
+        core_models.Task.objects.filter(pk__in=[
+            self.ws_1_cat_1_nested_task_1.pk,
+            self.ws_1_cat_1_nested_task_1_1_1.pk,
+        ]).delete()
+        task_1_1.refresh_from_db()
+        task_1_1_2.refresh_from_db()
+        assert task_1_1.tree_path == "/"
+        assert task_1_1_2.tree_path == f'/{task_1_1.pk}/'
+        assert core_models.Task.rebuild_tree_paths() == 0
+
+    def test_tree_path_on_delete_leaf(self):
+        """
+        Test deleting objects without children doesn't rewrite tree paths.
+        """
+
+        with CaptureQueriesContext(connection) as queries:
+            self.ws_1_cat_1_nested_task_1_1_1.delete()
+        assert not [query for query in queries
+                    if query["sql"].startswith("UPDATE")
+                    and "tree_path" in query["sql"]]
+
+    def test_get_children_single_query(self):
+        """
+        Test descendants are fetched in a single query regardless of depth.
+        """
+
+        with self.assertNumQueries(1):
+            children = core_models.Task.get_children(
+                self.ws_1_cat_1_nested_task_1)
+        task_1_1 = self.ws_1_cat_1_nested_task_1_1
+        assert list(children) == [task_1_1]
+        assert list(children[task_1_1]) == [
+            self.ws_1_cat_1_nested_task_1_1_1,
+            self.ws_1_cat_1_nested_task_1_1_2,
+        ]
+
+    def test_get_children_forest_single_query(self):
+        """
+        Test children of several objects are fetched in a single query and
+        match the children of each object.
+        """
+
+        tasks = list(core_models.Task.objects.filter(
+            title__startswith="Nested task").order_by("pk"))
+        with self.assertNumQueries(1):
+            forest = core_models.Task.get_children_forest(tasks)
+        for task in tasks:
+            assert forest[task.pk] == core_models.Task.get_children(task)
+
+    def test_get_children_forest_batches(self):
+        """
+        Test children of many objects are fetched in batches of prefixes.
+        """
+
+        tasks = list(core_models.Task.objects.order_by("pk"))
+        expected = {
+            task.pk: core_models.Task.get_children(task) for task in tasks
+        }
+        with mock.patch.object(core_models.Task,
+                               "CHILDREN_FOREST_BATCH_SIZE", 2):
+            with CaptureQueriesContext(connection) as queries:
+                forest = core_models.Task.get_children_forest(tasks)
+        assert len(queries) > 1
+        assert forest == expected
+
+    def test_error_parent_descendant_on_update(self):
+        """
+        Test task parent is not a descendant on update.
+        """
+
+        self.ws_1_cat_1_nested_task_1.parent = \
+            self.ws_1_cat_1_nested_task_1_1_1
+        try:
+            self.ws_1_cat_1_nested_task_1.full_clean()
+        except ValidationError as e:
+            assert "Parent cannot be a descendant of object itself." in str(e)
+        else:
+            self.fail("ValidationError not raised.")
+
+    def test_rebuild_tree_paths(self):
+        """
+        Test tree paths are recomputed from parent.
+        """
+
+        core_models.Task.objects.update(tree_path="/")
+        assert core_models.Task.rebuild_tree_paths() == 9
+        task_1_1_1 = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1_1_1.pk]).get()
+        assert task_1_1_1.tree_path == (
+            f'/{self.ws_1_cat_1_nested_task_1.pk}'
+            f'/{self.ws_1_cat_1_nested_task_1_1.pk}/'
+        )
+
+    def test_get_root_single_query(self):
+        """
+        Test root is fetched in a single query regardless of depth.
+        """
+
+        task = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1_1_1.pk]).get()
+        with self.assertNumQueries(1):
+            root = core_models.Task.get_root(task)
+        assert root == self.ws_1_cat_1_nested_task_1
+
+    def test_get_hierarchy_single_query(self):
+        """
+        Test the whole tree of an object is fetched in a single query.
+        """
+
+        task_1 = self.ws_1_cat_1_nested_task_1
+        task_1_1 = self.ws_1_cat_1_nested_task_1_1
+        with self.assertNumQueries(1):
+            hierarchy = core_models.Task.get_hierarchy(
+                self.ws_1_cat_1_nested_task_1_1_2)
+        assert hierarchy == {
+            task_1: {
+                task_1_1: {
+                    self.ws_1_cat_1_nested_task_1_1_1: {},
+                    self.ws_1_cat_1_nested_task_1_1_2: {},
+                },
+            },
+        }
+        assert list(hierarchy)[0].tree_depth == 0
+
+    def test_get_children_pk_list_is_not_shared(self):
+        """
+        Test descendants' primary keys don't accumulate across calls.
+        """
+
+        expected = {
+            self.ws_1_cat_1_nested_task_1_1.pk,
+            self.ws_1_cat_1_nested_task_1_1_1.pk,
+            self.ws_1_cat_1_nested_task_1_1_2.pk,
+        }
+        for _ in range(2):
+            pk_list = core_models.Task.get_children_pk_list(
+                self.ws_1_cat_1_nested_task_1)
+            assert len(pk_list) == 3
+            assert set(pk_list) == expected
+
+    def test_ancestor_chain_depth(self):
+        """
+        Test ancestor chain is ordered from root with depth.
+        """
+
+        chain = tree_queries.get_ancestor_chain(
+            core_models.Task, self.ws_1_cat_1_nested_task_1_1_1.pk)
+        assert [(obj.pk, obj.tree_depth) for obj in chain] == [
+            (self.ws_1_cat_1_nested_task_1.pk, 0),
+            (self.ws_1_cat_1_nested_task_1_1.pk, 1),
+            (self.ws_1_cat_1_nested_task_1_1_1.pk, 2),
+        ]
+
+    def test_descendant_lookups_use_tree_path_index(self):
+        """
+        Test descendants are looked up (and moved) with a range search of
+        the tree path index rather than a scan of tasks.
+        """
+
+        task_1 = self.ws_1_cat_1_nested_task_1
+        task_1_1 = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1_1.pk]).get()
+        with CaptureQueriesContext(connection) as queries:
+            list(core_models.Task.get_descendants(task_1))
+            core_models.Task.get_children_forest(
+                [task_1, self.ws_1_cat_2_nested_task_1])
+            task_1_1.parent = None
+            task_1_1.save()
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                if '"tree_path" >=' in query["sql"]:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                    plans.append(
+                        "\n".join(row[-1] for row in cursor.fetchall()))
+        assert len(plans) == 3
+        for plan in plans:
+            assert "USING INDEX core_task_tree_path_" in plan
+            assert "SCAN core_task" not in plan
+
+    def test_tree_prefix_lookup(self):
+        """
+        Test the tree path prefix lookup matches the same paths as
+        `startswith`, as a range on SQLite and as `startswith` on databases
+        whose collations may not sort paths by their bytes.
+        """
+
+        prefix = self.ws_1_cat_1_nested_task_1.get_descendant_tree_path()
+        for path in [prefix, "/", f'{prefix[:-1]}0/', f'{prefix}1/']:
+            assert set(core_models.Task.objects.filter(
+                tree_path__tree_prefix=path)) == set(
+                core_models.Task.objects.filter(tree_path__startswith=path))
+        query = core_models.Task.objects.filter(
+            tree_path__tree_prefix=prefix).query
+        lookup = query.where.children[0]
+        sql, params = lookup.as_sql(query.get_compiler(connection=connection),
+                                    connection)
+        assert "LIKE" in sql
+        assert list(params) == [f'{prefix}%']
+
+    def test_populate_tree_path_stops_on_cycle(self):
+        """
+        Test the migration populating tree paths raises an error on a cycle
+        of parents instead of looping.
+        """
+
+        migration = importlib.import_module("core.migrations.0002_tree_path")
+        migration.populate_tree_path(apps, None)
+        assert core_models.Task.rebuild_tree_paths() == 0
+        task_1 = self.ws_1_cat_1_nested_task_1
+        task_1_1 = self.ws_1_cat_1_nested_task_1_1
+        core_models.Task.objects.filter(pk=task_1.pk).update(
+            parent=task_1_1)
+        with self.assertRaisesMessage(
+                ValueError, f'Task: parents of rows [{task_1.pk}, '
+                f'{task_1_1.pk}] form a cycle'):
+            migration.populate_tree_path(apps, None)
+
+    def test_tree_queries_stop_on_cycle(self):
+        """
+        Test recursive queries end on a cycle of parents written bypassing
+        validation.
+        """
+
+        task_1 = self.ws_1_cat_1_nested_task_1
+        task_1_1 = self.ws_1_cat_1_nested_task_1_1
+        core_models.Task.objects.filter(pk=task_1.pk).update(
+            parent=task_1_1)
+        chain = tree_queries.get_ancestor_chain(core_models.Task, task_1.pk)
+        assert len(chain) == tree_queries.MAX_DEPTH + 1
+        assert task_1_1.pk in core_models.Task.get_children_pk_list(task_1)
+        assert core_models.Task.get_hierarchy(task_1) == {}
+        assert task_1.pk not in tree_queries.get_stale_tree_paths(
+            core_models.Task)
+
+    def test_no_cascade_when_unchanged(self):
+        """
+        Test saving a root task without project or visibility change doesn't
+        cascade to its descendants.
+        """
+
+        task = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1.pk]).get()
+        task.title = "edit"
+        with self.assertNumQueries(1):
+            task.save()
+
+    def test_project_cascade(self):
+        """
+        Test project of a root task cascades to its descendants with a single
+        UPDATE.
+        """
+
+        task = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1.pk]).get()
+        task.project = self.cat_1_project_1
+        with self.assertNumQueries(2):
+            task.save()
+        descendants = core_models.Task.get_descendants(task)
+        assert descendants.count() == 3
+        assert not descendants.exclude(project=self.cat_1_project_1).exists()
+        assert task.update_children_project() == 0
+
+    def test_visibility_cascade(self):
+        """
+        Test visibility of a root task cascades to its descendants.
+        """
+
+        task = self.get_task_query(
+            [self.ws_1_cat_1_nested_task_1.pk]).get()
+        task.is_visible = False
+        with self.assertNumQueries(2):
+            task.save()
+        assert not core_models.Task.get_descendants(task).filter(
+            is_visible=True).exists()
@@ -0,0 +1,29 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.utils import cache_versions
+
+
+class CacheVersionTests(SimpleTestCase):
+    """
+    Test version counters kept in the cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bump(self):
+        version = cache_versions.get_version("test-version")
+        assert cache_versions.get_version("test-version") == version
+        cache_versions.bump_version("test-version")
+        assert cache_versions.get_version("test-version") == version + 1
+
+    def test_evicted(self):
+        """
+        Test versions of evicted keys don't repeat earlier versions.
+        """
+        cache_versions.bump_version("test-version")
+        version = cache_versions.get_version("test-version")
+        cache.delete("test-version")
+        cache_versions.bump_version("test-version")
+        assert cache_versions.get_version("test-version") > version
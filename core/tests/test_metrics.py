@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import models as core_models
+from core.utils import metrics
+
+
+class MetricsMiddlewareTests(TestCase):
+    """
+    Test request metrics middleware and endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        core_models.Workspace.objects.create(
+            name="workspace", created_by=cls.user, is_default=True)
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.client.force_login(self.user)
+
+    def get_histogram(self, metric, view_name, method="GET"):
+        return metrics.collect()[metric][(view_name, method)]
+
+    def test_server_timing(self):
+        response = self.client.get(reverse("api:workspace-list"))
+        assert response.status_code == 200
+        assert response["Server-Timing"].startswith("db;dur=")
+        assert "queries" in response["Server-Timing"]
+        assert "total;dur=" in response["Server-Timing"]
+
+    def test_observed_per_view(self):
+        url = reverse("api:workspace-list")
+        for _ in range(2):
+            response = self.client.get(url)
+        queries = self.get_histogram("request_sql_queries",
+                                     "api:workspace-list")
+        assert queries[-1] == 2
+        assert queries[-2] > 0
+        sizes = self.get_histogram("response_size_bytes",
+                                   "api:workspace-list")
+        assert sizes[-2] == 2 * len(response.content)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("api:workspace-list"))
+        response = self.client.get(reverse("metrics"),
+                                   HTTP_AUTHORIZATION="Bearer secret")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        content = response.content.decode()
+        assert "# TYPE django_request_duration_seconds histogram" in content
+        assert (
+            'django_request_sql_queries_count{view="api:workspace-list",'
+            'method="GET"} 1'
+        ) in content
+        assert 'le="+Inf"' in content
+
+    def test_metrics_endpoint_access(self):
+        """
+        Test metrics are read by staff users and with the metrics token only,
+        which is unset by default.
+        """
+        url = reverse("metrics")
+        assert self.client.get(url).status_code == 404
+        assert self.client.get(
+            url, HTTP_AUTHORIZATION="Bearer ").status_code == 404
+        with override_settings(METRICS_TOKEN="secret"):
+            assert self.client.get(
+                url, HTTP_AUTHORIZATION="Bearer wrong").status_code == 404
+        staff_user = get_user_model().objects.create_user(
+            username='staff-1', is_staff=True)
+        self.client.force_login(staff_user)
+        assert self.client.get(url).status_code == 200
+
+    def get_dead_pid(self):
+        process = subprocess.Popen([sys.executable, "-c", ""])
+        process.wait()
+        return process.pid
+
+    def test_metrics_dir(self):
+        """
+        Histograms of all processes are summed, those of processes which are
+        not running anymore once merged into the archive file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(METRICS_DIR=directory,
+                                   METRICS_TOKEN="secret"):
+                self.client.get(reverse("api:workspace-list"))
+                other = metrics.get_snapshot()
+                dead_name = f'metrics-{self.get_dead_pid()}-1.json'
+                # of an earlier process with the pid of this one
+                reused_name = f'metrics-{os.getpid()}-1.json'
+                for name in [dead_name, reused_name]:
+                    with open(os.path.join(directory, name),
+                              "w") as other_file:
+                        json.dump(other, other_file)
+                response = self.client.get(
+                    reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+                count = self.get_histogram(
+                    "request_duration_seconds", "api:workspace-list")[-1]
+                names = os.listdir(directory)
+                own_name = os.path.basename(metrics.get_file_path())
+        assert response.status_code == 200
+        assert count == 3
+        assert dead_name not in names
+        assert metrics.ARCHIVE_NAME in names
+        assert reused_name in names
+        assert own_name in names
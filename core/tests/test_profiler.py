@@ -0,0 +1,137 @@
+import base64
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import models as core_models
+from core.utils import profiler
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class ProfilerTests(TestCase):
+    """
+    Test opt-in request profiler of staff users.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff_user = get_user_model().objects.create_user(
+            username='staff-1', password='testpass123', is_staff=True)
+        cls.user = get_user_model().objects.create_user(
+            username='user-1', password='testpass123')
+        for user in [cls.staff_user, cls.user]:
+            core_models.Workspace.objects.create(
+                name="workspace", created_by=user, is_default=True)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_sampler(self):
+        sampler = profiler.Sampler(interval=0.001)
+        sampler.start()
+        busy_loop(0.1)
+        sampler.stop()
+        collapsed = sampler.get_collapsed()
+        assert sum(sampler.counts.values()) > 0
+        assert f'{__name__}:busy_loop' in collapsed
+        # frames of the caller of start() are left out
+        assert "test_sampler" not in collapsed
+        stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+        assert int(count) > 0
+
+    def test_profile_staff_header(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(reverse("api:workspace-list"),
+                                   HTTP_X_PROFILE="1")
+        assert response.status_code == 200
+        profile_id = response["X-Profile-Id"]
+        response = self.client.get(reverse("profile", args=[profile_id]))
+        assert response.status_code == 200
+        result = response.json()
+        assert result["view"] == "api:workspace-list"
+        assert result["status"] == 200
+        assert result["query_count"] == len(result["queries"]) > 0
+        assert all(query["duration"] >= 0 for query in result["queries"])
+        assert "core_workspace" in "".join(
+            query["sql"] for query in result["queries"])
+
+    def test_profile_query_param_collapsed(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(reverse("demo:home"), {"_profile": "1"})
+        profile_id = response["X-Profile-Id"]
+        response = self.client.get(reverse("profile", args=[profile_id]),
+                                   {"format": "collapsed"})
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        assert response.content.decode() == \
+            profiler.get(profile_id)["collapsed"]
+
+    def test_profile_api_credentials(self):
+        credentials = base64.b64encode(b"staff-1:testpass123").decode()
+        response = self.client.get(reverse("api:workspace-list"),
+                                   HTTP_X_PROFILE="1",
+                                   HTTP_AUTHORIZATION=f'Basic {credentials}')
+        assert response.status_code == 200
+        assert profiler.get(response["X-Profile-Id"])["user"] == \
+            self.staff_user.pk
+
+    def test_not_profiled(self):
+        """
+        Test profiling doesn't start for requests of other than staff users,
+        including requests with credentials which are not of staff users.
+        """
+        url = reverse("api:workspace-list")
+        with mock.patch.object(profiler, "Sampler") as sampler:
+            self.client.force_login(self.user)
+            response = self.client.get(url, HTTP_X_PROFILE="1")
+            assert "X-Profile-Id" not in response
+            for credentials in [b"user-1:testpass123", b"staff-1:wrong"]:
+                credentials = base64.b64encode(credentials).decode()
+                response = self.client.get(
+                    url, HTTP_X_PROFILE="1",
+                    HTTP_AUTHORIZATION=f'Basic {credentials}')
+                assert "X-Profile-Id" not in response
+            self.client.logout()
+            response = self.client.get(url, HTTP_X_PROFILE="1",
+                                       HTTP_AUTHORIZATION="Bearer unknown")
+            assert "X-Profile-Id" not in response
+            self.client.force_login(self.staff_user)
+            response = self.client.get(url)
+            assert "X-Profile-Id" not in response
+        sampler.assert_not_called()
+
+    def test_profile_staff_only(self):
+        self.client.force_login(self.staff_user)
+        profile_id = self.client.get(
+            reverse("api:workspace-list"), HTTP_X_PROFILE="1",
+        )["X-Profile-Id"]
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("profile", args=[profile_id]))
+        assert response.status_code == 404
+        self.client.logout()
+        response = self.client.get(reverse("profile", args=[profile_id]))
+        assert response.status_code == 404
+
+    @override_settings(PROFILER_MAX_QUERIES=1)
+    def test_max_queries(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(reverse("api:workspace-list"),
+                                   HTTP_X_PROFILE="1")
+        result = profiler.get(response["X-Profile-Id"])
+        assert len(result["queries"]) == 1
+        assert result["query_count"] > 1
+
+    def test_unknown_profile(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(reverse("profile", args=["unknown"]))
+        assert response.status_code == 404
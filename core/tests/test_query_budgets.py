@@ -0,0 +1,182 @@
+import json
+import os
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+
+from api import urls as api_urls
+from core import models as core_models
+from core.utils import synthetic
+from demo import urls as demo_urls
+
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "query_budgets.json")
+# set to rewrite the budgets file with the counts of the large fixture
+UPDATE_BUDGETS = bool(os.environ.get("UPDATE_QUERY_BUDGETS"))
+
+SMALL_SCALE = {
+    "workspaces": 2,
+    "tags": 3,
+    "categories": 2,
+    "projects": 1,
+    "tasks": 4,
+    "task_depth": 2,
+    "comments": 1,
+    "comment_depth": 1,
+}
+# trees with less roots than `TreeMixin.CHILDREN_FOREST_BATCH_SIZE`, whose
+# descendants are loaded in one query
+LARGE_SCALE = {
+    "workspaces": 3,
+    "tags": 8,
+    "categories": 5,
+    "projects": 3,
+    "tasks": 16,
+    "task_depth": 4,
+    "comments": 3,
+    "comment_depth": 3,
+}
+
+# routes not answering GET requests
+SKIPPED_ROUTES = {
+    "api:project-bulk",
+    "api:task-bulk",
+    "api:import",
+}
+
+# objects of route parameters (other than the object of the route itself)
+KWARG_OBJECTS = {
+    "ws_pk": "workspace",
+    "cat_pk": "category",
+    "pr_pk": "project",
+    "task_pk": "task",
+}
+# objects of route names (without the action suffix) which differ
+ROUTE_OBJECTS = {
+    "project-task": "task",
+}
+
+
+def iter_routes(patterns, namespace):
+    """
+    Yields (view name, url pattern) of routes, without format suffix
+    variants.
+    """
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, namespace)
+        elif "format" not in pattern.pattern.regex.groupindex:
+            yield f'{namespace}:{pattern.name}', pattern
+
+
+ROUTES = {
+    name: pattern
+    for urls in [api_urls, demo_urls]
+    for name, pattern in iter_routes(urls.urlpatterns, urls.app_name)
+    if name not in SKIPPED_ROUTES
+}
+
+
+def get_objects(user):
+    """
+    Returns objects of a user which routes are requested for: a project
+    with tasks, its category and workspace, its root task with the most
+    descendants and the first comment, tag, priority and status.
+    """
+    tasks = core_models.Task.objects.filter(created_by=user)
+    project = max(core_models.Project.objects.filter(created_by=user),
+                  key=lambda project: tasks.filter(project=project).count())
+    task = max(tasks.filter(project=project, parent=None),
+               key=lambda task: core_models.Task.get_descendants(task).count())
+    objects = {
+        "user": user,
+        "workspace": project.workspace,
+        "category": project.category,
+        "project": project,
+        "task": task,
+    }
+    for key, model, lookup in [
+        ("workspace_comment", core_models.WorkspaceComment, "workspace"),
+        ("category_comment", core_models.CategoryComment, "category"),
+        ("project_comment", core_models.ProjectComment, "project"),
+        ("task_comment", core_models.TaskComment, "task"),
+        ("tag", core_models.Tag, "workspace"),
+        ("priority", core_models.Priority, "workspace"),
+        ("status", core_models.Status, "workspace"),
+    ]:
+        objects[key] = model.objects.filter(
+            **{lookup: objects[lookup]}).order_by("pk").first()
+    return objects
+
+
+def get_url(name, pattern, objects):
+    kwargs = {}
+    for kwarg in pattern.pattern.regex.groupindex:
+        if kwarg in KWARG_OBJECTS:
+            kwargs[kwarg] = objects[KWARG_OBJECTS[kwarg]].pk
+            continue
+        route_object = name.split(":")[1].rsplit("-", 1)[0]
+        obj = objects[ROUTE_OBJECTS.get(
+            route_object, route_object.replace("-", "_"))]
+        kwargs[kwarg] = obj.uuid if kwarg == "uuid" else obj.pk
+    return reverse(name, kwargs=kwargs)
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Test queries of GET requests of every API and demo route don't grow with
+    the size of the data and stay within `query_budgets.json`.
+    """
+
+    def get_query_counts(self, user):
+        """
+        Returns the number of queries of a (cold cache) GET request of every
+        route.
+        """
+        objects = get_objects(user)
+        self.client.force_login(user)
+        counts = {}
+        for name, pattern in ROUTES.items():
+            url = get_url(name, pattern, objects)
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            assert response.status_code == 200, (
+                f'{name} ({url}): status {response.status_code}')
+            counts[name] = len(queries)
+        return counts
+
+    def test_query_budgets(self):
+        # the large fixture is added after measuring the small one, so that
+        # routes listing objects of all users grow as well
+        small_user = synthetic.generate(
+            username_prefix="small", **SMALL_SCALE)[0][0]
+        small_counts = self.get_query_counts(small_user)
+        large_user = synthetic.generate(
+            username_prefix="large", **LARGE_SCALE)[0][0]
+        large_counts = self.get_query_counts(large_user)
+        if UPDATE_BUDGETS:
+            with open(BUDGETS_PATH, "w") as budgets_file:
+                json.dump(large_counts, budgets_file, indent=2)
+                budgets_file.write("\n")
+        with open(BUDGETS_PATH) as budgets_file:
+            budgets = json.load(budgets_file)
+        grown = {
+            name: (small_counts[name], count)
+            for name, count in large_counts.items()
+            if count > small_counts[name]
+        }
+        assert not grown, f'Queries grow with data (small, large): {grown}'
+        missing = sorted(set(large_counts) - set(budgets))
+        assert not missing, (
+            f'No budget for {missing}, run with UPDATE_QUERY_BUDGETS=1.')
+        over = {
+            name: (budgets[name], count)
+            for name, count in large_counts.items() if count > budgets[name]
+        }
+        assert not over, f'Queries over budget (budget, queries): {over}'
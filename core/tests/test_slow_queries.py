@@ -0,0 +1,83 @@
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import middleware
+from core import models as core_models
+from core.utils import slow_queries, synthetic
+
+
+class SlowQueryTests(TestCase):
+    """
+    Test log of slow queries with their call site and plan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = synthetic.generate(
+            workspaces=1, categories=2, tasks=4, comments=1)[0][0]
+        cls.workspace = core_models.Workspace.objects.get(created_by=cls.user)
+
+    def test_normalize(self):
+        sql = """SELECT "a"  FROM "t1"
+            WHERE "b" = 'it''s' AND "c" IN (%s, %s, %s) AND "d" > 10.5"""
+        assert slow_queries.normalize(sql) == (
+            'SELECT "a" FROM "t1" WHERE "b" = %s AND "c" IN (...)'
+            ' AND "d" > %s')
+
+    def test_log_with_plan(self):
+        """
+        Test queries of a request over the threshold are logged with the
+        view, the project code running them and their plan.
+        """
+
+        self.client.force_login(self.user)
+        url = reverse("api:category-list", kwargs={"ws_pk": self.workspace.pk})
+        with override_settings(SLOW_QUERY_THRESHOLD=0), \
+                self.assertLogs("core.slow_queries", "WARNING") as logs:
+            response = self.client.get(url)
+        assert response.status_code == 200
+        records = [record.slow_query for record in logs.records]
+        assert {record["view"] for record in records} == {"api:category-list"}
+        record = next(record for record in records
+                      if 'FROM "core_category"' in record["sql"])
+        assert "%s" in record["sql"]
+        assert record["location"].split("/")[0] in {"api", "core"}
+        assert "core_category" in record["plan"]
+        assert "CustomTreeListSerializer" in {
+            record["field"] for record in records}
+        assert "Plan:" in logs.output[-1]
+
+    def test_threshold(self):
+        self.client.force_login(self.user)
+        with override_settings(SLOW_QUERY_THRESHOLD=60), \
+                self.assertNoLogs("core.slow_queries"):
+            self.client.get(reverse("api:workspace-list"))
+
+    def test_explain_not_counted(self):
+        """
+        Test plans are not read for other than SELECT queries and are not
+        counted as queries.
+        """
+
+        logger = slow_queries.SlowQueryLogger(connection, threshold=0)
+        with CaptureQueriesContext(connection) as queries, \
+                connection.execute_wrapper(logger), \
+                self.assertLogs("core.slow_queries"):
+            list(core_models.Workspace.objects.filter(created_by=self.user))
+            core_models.Workspace.objects.filter(
+                created_by=self.user).update(description="updated")
+        assert len(queries) == 2
+        select, update = logger.records
+        assert select["plan"]
+        assert select["location"].startswith(
+            "core/tests/test_slow_queries.py:")
+        assert select["location"].endswith(" in test_explain_not_counted")
+        assert update["plan"] is None
+
+    def test_middleware_not_used(self):
+        with override_settings(SLOW_QUERY_THRESHOLD=None), \
+                self.assertRaises(MiddlewareNotUsed):
+            middleware.SlowQueryMiddleware(lambda request: None)
@@ -0,0 +1,82 @@
+from django.test import TestCase
+
+from core import models as core_models
+from core.signals import TREE_MODELS
+from core.utils import benchmarks
+from core.utils import synthetic
+
+
+SCALE = {
+    "users": 2,
+    "workspaces": 2,
+    "tags": 4,
+    "categories": 3,
+    "projects": 1,
+    "tasks": 12,
+    "task_depth": 3,
+    "comments": 2,
+}
+
+
+class SyntheticDataTests(TestCase):
+    """
+    Test synthetic data generator and benchmarks.
+    """
+
+    def test_generate(self):
+        users, counts = synthetic.generate(**SCALE)
+        assert len(users) == 2
+        assert counts["core.workspace"] == 4
+        assert counts["core.category"] == 12
+        assert counts["core.task"] == 12 * 12
+        assert counts["core.taskcomment"] == 12 * 12 * 2
+        assert core_models.Task.objects.count() == 12 * 12
+        for user in users:
+            assert core_models.Workspace.objects.filter(
+                created_by=user, is_default=True).count() == 1
+
+    def test_generate_trees(self):
+        synthetic.generate(**SCALE)
+        # tree paths are consistent with parents
+        for model in TREE_MODELS:
+            assert model.rebuild_tree_paths() == 0
+        depths = {
+            tree_path.count("/") for tree_path in
+            core_models.Task.objects.values_list("tree_path", flat=True)
+        }
+        assert depths == {1, 2, 3}
+        for task in core_models.Task.objects.filter(
+                parent__isnull=False).select_related("parent"):
+            assert task.project_id == task.parent.project_id
+            assert task.category_id == task.parent.category_id
+
+    def test_generate_reproducible(self):
+        def get_rows():
+            return list(core_models.Task.objects.order_by("pk").values_list(
+                "title", "detail", "tree_path", "project__title",
+                "status__name"))
+
+        synthetic.generate(seed=3, **SCALE)
+        rows = get_rows()
+        core_models.Task.objects.all().delete()
+        synthetic.generate(seed=3, username_prefix="other", **SCALE)
+        other_rows = get_rows()
+        assert [row[:2] + row[3:] for row in rows] == \
+            [row[:2] + row[3:] for row in other_rows]
+        assert [row[2].count("/") for row in rows] == \
+            [row[2].count("/") for row in other_rows]
+
+    def test_unknown_scale(self):
+        with self.assertRaises(ValueError):
+            synthetic.Generator(trees=1)
+
+    def test_benchmarks(self):
+        users, counts = synthetic.generate(**{**SCALE, "users": 1})
+        results = benchmarks.run(users[0], repeat=2)
+        assert {"demo:workspace-detail", "api:task-list",
+                "tree:get_descendants"} <= set(results["results"])
+        for result in results["results"].values():
+            assert result["min"] <= result["median"]
+            assert result["queries"] >= 0
+        rows = benchmarks.compare(results, results)
+        assert {ratio for name, base, current, ratio in rows} <= {1.0}
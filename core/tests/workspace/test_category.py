@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from core import models as core_models
@@ -212,3 +213,105 @@ class CategoryModelTreeTests(CategoryModelFullSetupTestClass):
             self.ws_1_nested_category_1_1.full_clean()
         except ValidationError as e:
             assert self.msg_parent_attribute in str(e)
+
+    def test_get_tree_single_query(self):
+        """
+        Test tree is built from a single query of the given objects.
+        """
+
+        categories = core_models.Category.objects.filter(
+            workspace=self.workspace_1).order_by("pk")
+        with self.assertNumQueries(1):
+            tree = core_models.Category.get_tree(categories)
+        category_1 = self.ws_1_nested_category_1
+        category_1_1 = self.ws_1_nested_category_1_1
+        assert category_1 in tree
+        assert self.ws_1_category_1 in tree
+        assert list(tree[category_1]) == [category_1_1]
+        assert list(tree[category_1][category_1_1]) == [
+            self.ws_1_nested_category_1_1_1,
+            self.ws_1_nested_category_1_1_2,
+        ]
+
+    def test_get_tree_subset_roots(self):
+        """
+        Test objects whose parent is not in given objects are roots.
+        """
+
+        categories = core_models.Category.objects.filter(
+            pk__in=[self.ws_1_nested_category_1_1.pk,
+                    self.ws_1_nested_category_1_1_1.pk])
+        tree = core_models.Category.get_tree(categories)
+        assert tree == {
+            self.ws_1_nested_category_1_1: {
+                self.ws_1_nested_category_1_1_1: {},
+            },
+        }
+
+    def test_link_ancestors(self):
+        """
+        Test ancestors missing from given objects are loaded in one query and
+        set as parents.
+        """
+
+        categories = list(core_models.Category.objects.filter(
+            pk__in=[self.ws_1_nested_category_1_1_1.pk,
+                    self.ws_1_nested_category_1_1_2.pk]))
+        with self.assertNumQueries(1):
+            core_models.Category.link_ancestors(categories)
+        with self.assertNumQueries(0):
+            names = [str(category) for category in categories]
+        assert names == [
+            "Nested category 1 --> Nested category 1_1 --> Nested category 1_1_1",
+            "Nested category 1 --> Nested category 1_1 --> Nested category 1_1_2",
+        ]
+        assert categories[0].parent is categories[1].parent
+
+
+class CategoryModelTreeCacheTests(CategoryModelFullSetupTestClass):
+    """
+    Test rendered tree fragments are cached and invalidated on changes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def render(self):
+        return core_models.Category.get_cached_fragment(
+            self.workspace_1.pk, ("test",),
+            lambda: core_models.Category.render_tree(
+                core_models.Category.get_tree(
+                    self.workspace_1.categories.all()),
+                "name"),
+        )
+
+    def test_fragment_cached(self):
+        rendered = self.render()
+        with self.assertNumQueries(0):
+            assert self.render() == rendered
+
+    def test_fragment_invalidated_on_save(self):
+        self.render()
+        self.ws_1_category_1.name = "renamed"
+        self.ws_1_category_1.save()
+        assert "renamed" in self.render()
+
+    def test_fragment_invalidated_on_delete(self):
+        assert self.ws_1_category_2.name in self.render()
+        self.ws_1_category_2.delete()
+        assert self.ws_1_category_2.name not in self.render()
+
+    def test_fragment_invalidated_on_workspace_change(self):
+        """
+        Test fragments of both old and new workspace are invalidated.
+        """
+
+        self.render()
+        category = self.get_category_query([self.ws_1_category_2.pk]).get()
+        category.name = "moved"
+        category.save()
+        self.render()
+        category.workspace = self.workspace_2
+        category.save()
+        assert "moved" not in self.render()
@@ -1,9 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from core import models as core_models
+from core.utils import synthetic
 from ..generic_classes import CustomTestCaseSetup
 
 
@@ -165,3 +167,35 @@ class WorkspaceModelCleanSaveDeleteIsolatedTests(WorkspaceModelMinimalSetupClass
             created_by=self.user,
         )
         assert workspace.is_default
+
+
+class WorkspaceDeleteQueriesTests(TestCase):
+    """
+    Test queries of deleting a workspace with its trees.
+    """
+
+    def delete_workspace(self, tasks):
+        users, counts = synthetic.generate(
+            username_prefix=f'tasks-{tasks}', users=1, workspaces=1,
+            categories=2, tasks=tasks, task_depth=3, comments=1)
+        workspace = core_models.Workspace.objects.get(created_by=users[0])
+        with CaptureQueriesContext(connection) as queries:
+            workspace.delete()
+        assert core_models.Tombstone.objects.filter(
+            created_by=users[0], model_label="core.task",
+        ).count() == counts["core.task"]
+        return [query["sql"] for query in queries]
+
+    def test_workspace_delete_queries(self):
+        """
+        Test the number of queries doesn't depend on the number of deleted
+        objects: tombstones are inserted at once and tree paths of deleted
+        objects without remaining descendants are not rewritten.
+        """
+
+        queries = self.delete_workspace(tasks=10)
+        assert len(queries) == len(self.delete_workspace(tasks=40))
+        assert len([sql for sql in queries
+                    if 'INSERT INTO "core_tombstone"' in sql]) == 1
+        assert not [sql for sql in queries
+                    if sql.startswith("UPDATE") and "tree_path" in sql]
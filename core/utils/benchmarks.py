@@ -0,0 +1,180 @@
+"""
+Benchmarks of demo views, API end points and tree operations.
+
+Cases are timed against data of a user (see `core.utils.synthetic`) with the
+test client, so that middleware, rendering and caches are part of the
+measure. Every case is run `repeat` times; the first run is reported apart
+since it usually fills caches (rendered trees, API responses). Results are
+plain JSON so that runs of different commits can be compared.
+"""
+import collections
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import models as core_models
+
+
+def get_objects(user):
+    """
+    Returns objects of a user which cases are run against: the default
+    workspace, its category, project and root task with the most
+    descendants and the deepest task.
+    """
+    workspace = core_models.Workspace.objects.filter(
+        created_by=user).order_by("-is_default", "pk").first()
+    tasks = core_models.Task.objects.filter(workspace=workspace)
+    paths = dict(tasks.order_by("pk").values_list("pk", "tree_path"))
+    # descendant paths of a root start with "/<root pk>/"
+    sizes = collections.Counter(
+        int(path.split("/")[1]) for path in paths.values() if path != "/")
+    root_pk = max((pk for pk, path in paths.items() if path == "/"),
+                  key=lambda pk: sizes[pk])
+    deepest_pk = max(paths, key=lambda pk: paths[pk].count("/"))
+    root_task = tasks.select_related("category").get(pk=root_pk)
+    deepest_task = tasks.get(pk=deepest_pk)
+    project = (core_models.Project.objects.filter(category=root_task.category)
+               .order_by("pk").first())
+    return {
+        "workspace": workspace,
+        "category": root_task.category,
+        "project": project,
+        "root_task": root_task,
+        "deepest_task": deepest_task,
+    }
+
+
+def get_cases(client, objects):
+    """
+    Returns (name, callable) of the cases.
+    """
+    workspace, category = objects["workspace"], objects["category"]
+    root_task, deepest_task = objects["root_task"], objects["deepest_task"]
+    ws_kwargs = {"ws_pk": workspace.pk}
+    cat_kwargs = {**ws_kwargs, "cat_pk": category.pk}
+    urls = {
+        "demo:home": reverse("demo:home"),
+        "demo:workspace-detail": reverse(
+            "demo:workspace-detail", args=[workspace.pk]),
+        "demo:category-detail": reverse(
+            "demo:category-detail", kwargs={"cat_pk": category.pk}),
+        "demo:task-detail": reverse(
+            "demo:task-detail", kwargs={"uuid": root_task.uuid}),
+        "demo:archive": reverse("demo:archive"),
+        "api:workspace-list": reverse("api:workspace-list"),
+        "api:workspace-snapshot": reverse(
+            "api:workspace-snapshot", args=[workspace.pk]),
+        "api:category-list": reverse("api:category-list", kwargs=ws_kwargs),
+        "api:task-list": reverse("api:task-list", kwargs=cat_kwargs),
+        "api:task-detail": reverse(
+            "api:task-detail", kwargs={**cat_kwargs, "pk": root_task.pk}),
+        "api:sync": reverse("api:sync"),
+    }
+    if objects["project"] is not None:
+        urls["demo:project-detail"] = reverse(
+            "demo:project-detail", kwargs={"uuid": objects["project"].uuid})
+    cases = [
+        (name, lambda url=url: client.get(url)) for name, url in urls.items()
+    ]
+    category_tasks = core_models.Task.objects.filter(category=category)
+    cases += [
+        ("tree:get_descendants",
+         lambda: list(core_models.Task.get_descendants(root_task))),
+        ("tree:get_ancestors",
+         lambda: list(core_models.Task.get_ancestors(deepest_task))),
+        ("tree:get_children",
+         lambda: core_models.Task.get_children(root_task)),
+        ("tree:get_children_forest",
+         lambda: core_models.Task.get_children_forest(
+             list(category_tasks.filter(parent=None)))),
+        ("tree:get_tree",
+         lambda: core_models.Task.get_tree(category_tasks.all())),
+        ("tree:get_hierarchy",
+         lambda: core_models.Task.get_hierarchy(deepest_task)),
+        ("tree:get_children_pk_list",
+         lambda: core_models.Task.get_children_pk_list(root_task)),
+    ]
+    return cases
+
+
+def run_case(name, case, repeat):
+    """
+    Returns timings (in seconds) and the query count of a case.
+    """
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            result = case()
+            timings.append(time.perf_counter() - start)
+        status_code = getattr(result, "status_code", 200)
+        if status_code >= 400:
+            raise ValueError(f'{name}: response status {status_code}.')
+    warm = timings[1:] or timings
+    return {
+        "first": timings[0],
+        "min": min(warm),
+        "median": statistics.median(warm),
+        "queries": len(queries),
+    }
+
+
+def get_git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(user, repeat=5, names=None):
+    """
+    Runs the cases (all or those of given names) against data of a user.
+    Returns a JSON serializable document of the environment and results.
+    """
+    client = Client()
+    client.force_login(user)
+    # requests of the test client are sent to "testserver" over http
+    with override_settings(ALLOWED_HOSTS=["testserver"],
+                           SECURE_SSL_REDIRECT=False):
+        cases = get_cases(client, get_objects(user))
+        results = {
+            name: run_case(name, case, repeat) for name, case in cases
+            if names is None or name in names
+        }
+    return {
+        "environment": {
+            "revision": get_git_revision(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "debug": settings.DEBUG,
+        },
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(results, baseline):
+    """
+    Returns (name, baseline median, median, ratio) of the cases of both
+    result documents.
+    """
+    rows = []
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else None
+        rows.append((name, base["median"], result["median"], ratio))
+    return rows
@@ -0,0 +1,26 @@
+"""
+Version counters kept in the cache.
+
+Cached entries are keyed with the current version of what they depend on,
+so bumping the version invalidates them all at once, without knowing their
+keys (see `core.utils.tree_cache` and `api.utils.response_cache`).
+"""
+import time
+
+from django.core.cache import cache
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # a time based initial version never repeats one of an evicted key
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
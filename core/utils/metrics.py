@@ -0,0 +1,250 @@
+"""
+In-process request metrics, rendered as Prometheus text.
+
+`core.middleware.MetricsMiddleware` observes per view histograms of latency,
+SQL time, SQL query count and response size. Each process keeps its own
+histograms; with `METRICS_DIR` set, processes write them to a file of their
+own there at most every `METRICS_FLUSH_INTERVAL` seconds and the metrics
+endpoint sums the files of all processes (workers).
+
+Files are named by the pid and start time of their process, so that a
+process reusing the pid of a dead one doesn't overwrite its counters. Files
+of processes which are not running anymore are merged into an archive file
+when collecting, as prometheus_client's multiprocess mode does, so that
+their counters are kept while files of recycled workers don't pile up.
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+
+HISTOGRAMS = {
+    "request_duration_seconds": (
+        "Request latency in seconds.",
+        [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+    ),
+    "request_sql_duration_seconds": (
+        "SQL time of a request in seconds.",
+        [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5],
+    ),
+    "request_sql_queries": (
+        "SQL queries of a request.",
+        [0, 1, 2, 5, 10, 20, 50, 100, 200, 500],
+    ),
+    "response_size_bytes": (
+        "Response size in bytes (streamed responses are not counted).",
+        [1e3, 1e4, 1e5, 1e6, 1e7],
+    ),
+}
+PREFIX = "django"
+
+_lock = threading.Lock()
+# {metric: {labels: [bucket counts..., sum, count]}}
+_histograms = {metric: {} for metric in HISTOGRAMS}
+_last_flush = 0
+# (pid, start time) of the process, see `get_file_path`
+_process = None
+
+ARCHIVE_NAME = "metrics-archive.json"
+LOCK_NAME = "metrics.lock"
+_process_file_name = re.compile(r"metrics-(\d+)-\d+\.json")
+
+
+def observe(labels, values):
+    """
+    Records values of histograms (by metric name) for a tuple of label
+    values, e.g. (view name, method).
+    """
+    with _lock:
+        for metric, value in values.items():
+            if value is None:
+                continue
+            buckets = HISTOGRAMS[metric][1]
+            histogram = _histograms[metric].setdefault(
+                labels, [0] * (len(buckets) + 2))
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[i] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+    flush()
+
+
+def to_snapshot(histograms_by_metric):
+    """
+    Returns histograms as JSON serializable lists of [labels, histogram].
+    """
+    return {
+        metric: [[list(labels), list(histogram)]
+                 for labels, histogram in histograms.items()]
+        for metric, histograms in histograms_by_metric.items()
+    }
+
+
+def get_snapshot():
+    with _lock:
+        return to_snapshot(_histograms)
+
+
+def reset():
+    global _last_flush
+    with _lock:
+        for histograms in _histograms.values():
+            histograms.clear()
+        _last_flush = 0
+
+
+def get_file_path():
+    """
+    Returns the path of the file of the process, named by its pid and start
+    time (that of the fork for forked workers).
+    """
+    global _process
+    pid = os.getpid()
+    if _process is None or _process[0] != pid:
+        _process = (pid, time.time_ns())
+    return os.path.join(settings.METRICS_DIR,
+                        f'metrics-{pid}-{_process[1]}.json')
+
+
+def flush(force=False):
+    """
+    Writes histograms of the process to its file in `METRICS_DIR`, at most
+    every `METRICS_FLUSH_INTERVAL` seconds unless forced.
+    """
+    global _last_flush
+    if not settings.METRICS_DIR:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    snapshot = get_snapshot()
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    write_file(get_file_path(), snapshot)
+
+
+def write_file(path, snapshot):
+    # written to a temporary file first, so readers never see partial files
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                    suffix=".tmp")
+    with os.fdopen(fd, "w") as tmp_file:
+        json.dump(snapshot, tmp_file)
+    os.replace(tmp_path, path)
+
+
+def read_file(path):
+    try:
+        with open(path) as metrics_file:
+            return json.load(metrics_file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def merge(snapshots):
+    """
+    Returns histograms of snapshots summed by metric and labels.
+    """
+    merged = {metric: {} for metric in HISTOGRAMS}
+    for snapshot in snapshots:
+        for metric, histograms in snapshot.items():
+            if metric not in merged:
+                continue
+            for labels, histogram in histograms:
+                total = merged[metric].setdefault(
+                    tuple(labels), [0] * len(histogram))
+                for i, value in enumerate(histogram):
+                    total[i] += value
+    return merged
+
+
+def read_files(directory):
+    """
+    Returns snapshots of the files of `directory`, after merging the files
+    of processes which are not running anymore into the archive file.
+    """
+    snapshots, dead_paths = {}, []
+    for name in os.listdir(directory):
+        if name.startswith("metrics-") and name.endswith(".json"):
+            path = os.path.join(directory, name)
+            snapshot = read_file(path)
+            if snapshot is None:
+                continue
+            snapshots[path] = snapshot
+            match = _process_file_name.fullmatch(name)
+            if match and not is_running(int(match.group(1))):
+                dead_paths.append(path)
+    if dead_paths:
+        archive_path = os.path.join(directory, ARCHIVE_NAME)
+        snapshots[archive_path] = to_snapshot(merge(
+            snapshots.pop(path) for path in [archive_path, *dead_paths]
+            if path in snapshots))
+        write_file(archive_path, snapshots[archive_path])
+        for path in dead_paths:
+            os.remove(path)
+    return list(snapshots.values())
+
+
+def collect():
+    """
+    Returns histograms summed over all processes writing to `METRICS_DIR`,
+    or of this process only.
+
+    Files are read and archived under an exclusive lock of the directory, so
+    that concurrent collects don't archive a file twice. Locking uses
+    `fcntl` (Unix only, as the prefork servers `METRICS_DIR` is for).
+    """
+    if not settings.METRICS_DIR:
+        return merge([get_snapshot()])
+    import fcntl
+    flush(force=True)
+    lock_path = os.path.join(settings.METRICS_DIR, LOCK_NAME)
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return merge(read_files(settings.METRICS_DIR))
+
+
+def _format_labels(labels, **extra):
+    names = ["view", "method"]
+    pairs = [*zip(names, labels), *extra.items()]
+    escaped = [
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in pairs
+    ]
+    return ",".join(f'{name}="{value}"' for name, value in escaped)
+
+
+def render(merged):
+    """
+    Returns histograms in Prometheus text exposition format.
+    """
+    lines = []
+    for metric, (description, buckets) in HISTOGRAMS.items():
+        name = f'{PREFIX}_{metric}'
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+        for labels, histogram in sorted(merged[metric].items()):
+            for bound, count in zip(buckets, histogram):
+                bound_labels = _format_labels(labels, le=f'{bound:g}')
+                lines.append(f'{name}_bucket{{{bound_labels}}} {count}')
+            inf_labels = _format_labels(labels, le="+Inf")
+            lines.append(f'{name}_bucket{{{inf_labels}}} {histogram[-1]}')
+            lines.append(
+                f'{name}_sum{{{_format_labels(labels)}}} {histogram[-2]}')
+            lines.append(
+                f'{name}_count{{{_format_labels(labels)}}} {histogram[-1]}')
+    return "\n".join(lines) + "\n"
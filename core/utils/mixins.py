@@ -1,10 +1,118 @@
 import datetime as dt
 from django.core.exceptions import ValidationError
 from django.db import models as djm
+from django.db.models import functions as db_funcs
+from django.db.models import lookups
 from django.urls import reverse
+from django.utils import timezone
 
+from core.utils import tree_cache, tree_queries
+
+
+class FieldTrackerMixin():
+    """
+    Mixin to detect changes of `tracked_fields` (attribute names, e.g.
+    `project_id` for foreign keys) since the object was loaded from or last
+    saved to the database.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.set_tracked_values()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.set_tracked_values()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.set_tracked_values()
+
+    def get_tracked_fields(self):
+        return self.tracked_fields
+
+    def set_tracked_values(self):
+        deferred_fields = self.get_deferred_fields()
+        self._tracked_values = {
+            field: getattr(self, field) for field in self.get_tracked_fields()
+            if field not in deferred_fields
+        }
+
+    def get_tracked_value(self, field):
+        """
+        Returns the saved value of a tracked field, `None` if not known.
+        """
+        return getattr(self, "_tracked_values", {}).get(field, None)
+
+    def has_changed(self, field):
+        """
+        Returns whether a tracked field differs from the saved value. Unsaved
+        objects and untracked values are considered changed.
+        """
+        tracked_values = getattr(self, "_tracked_values", {})
+        if self._state.adding or field not in tracked_values:
+            return True
+        return tracked_values[field] != getattr(self, field)
+
+
+@djm.CharField.register_lookup
+class TreePathPrefix(lookups.Lookup):
+    """
+    `startswith` lookup of tree paths, e.g. `tree_path__tree_prefix="/1/5/"`.
+
+    SQLite can't serve `LIKE ... ESCAPE` from an index, so there paths are
+    matched as the range from the prefix up to the prefix with its last
+    character incremented, which its binary collation sorts the same as the
+    paths starting with the prefix. Linguistic collations (e.g. PostgreSQL's
+    `en_US.UTF-8`) mostly ignore punctuation when comparing, so other
+    databases use `startswith`, which PostgreSQL serves from the
+    `varchar_pattern_ops` index Django adds for indexed char fields.
+    """
+
+    lookup_name = "tree_prefix"
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        return compiler.compile(lookups.StartsWith(self.lhs, self.rhs))
+
+    def as_sqlite(self, compiler, connection):
+        upper = f'{self.rhs[:-1]}{chr(ord(self.rhs[-1]) + 1)}'
+        lower_sql, lower_params = compiler.compile(
+            lookups.GreaterThanOrEqual(self.lhs, self.rhs))
+        upper_sql, upper_params = compiler.compile(
+            lookups.LessThan(self.lhs, upper))
+        return (f'({lower_sql} AND {upper_sql})',
+                (*lower_params, *upper_params))
+
+
+class TreeMixin(FieldTrackerMixin):
+    """
+    Mixin for self referencing models with a `parent` foreign key.
+
+    Models using the mixin also declare a `tree_path` field which stores the
+    materialized path of the object's ancestors' primary keys, e.g. `/1/5/`
+    for an object whose parent is 5 and grand parent is 1. Roots have `/`.
+    It is maintained on save (including reparenting) and on delete (see
+    `core.signals`) so that descendant and ancestor lookups are a single
+    indexed query regardless of depth.
+
+    `tree_scope_field` is the attribute name of the foreign key shared by all
+    nodes of a tree, e.g. `workspace_id` for categories. Rendered trees are
+    cached per scope (see `core.utils.tree_cache`).
+    """
+
+    TREE_PATH_SEP = "/"
+    CHILDREN_FOREST_BATCH_SIZE = 500
+    tree_scope_field = None
+
+    def get_tracked_fields(self):
+        return (*super().get_tracked_fields(), self.tree_scope_field,
+                "parent_id")
 
-class TreeMixin():
     def clean(self, *args, **kwargs):
         if self.parent:
             if self.pk and self.parent.pk == self.pk:
@@ -12,67 +120,309 @@ class TreeMixin():
                 message="Parent cannot be object itself.",
                 code="invalid",
             )
-            if hasattr(self, "workspace") and self.workspace != self.parent.workspace:
+            if self.pk and self.pk in self.parent.get_ancestor_pk_list():
+                raise ValidationError(
+                    message="Parent cannot be a descendant of object itself.",
+                    code="invalid",
+                )
+            if hasattr(self, "workspace_id") \
+                    and self.workspace_id != self.parent.workspace_id:
                 raise ValidationError(
                     "Workspace should be same as parent's.")
-            if hasattr(self, "category") and self.category != self.parent.category:
+            if hasattr(self, "category_id") \
+                    and self.category_id != self.parent.category_id:
                 raise ValidationError(
                     "Category should be same as parent's.")
         return super().clean(*args, **kwargs)
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields", None)
+        if update_fields is not None and "parent" not in update_fields:
+            return super().save(*args, **kwargs)
+        if self._state.adding:
+            self.tree_path = self.get_parent_tree_path()
+            return super().save(*args, **kwargs)
+        if not self.has_changed("parent_id"):
+            # the stored parent and tree path are rewritten by moves of self
+            # and ancestors, which a copy loaded before them must not overwrite
+            if update_fields is None:
+                deferred_fields = self.get_deferred_fields()
+                kwargs["update_fields"] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key
+                    and field.name not in ("parent", "tree_path")
+                    and field.attname not in deferred_fields
+                ]
+            return super().save(*args, **kwargs)
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "tree_path"}
+        # paths of self and of its new parent are read from their rows, since
+        # the objects may have been loaded before moves of their ancestors
+        paths = dict(self.__class__.objects.filter(
+            pk__in=[self.pk, self.parent_id],
+        ).values_list("pk", "tree_path"))
+        old_descendant_path = (f'{paths.get(self.pk, self.tree_path)}'
+                               f'{self.pk}{self.TREE_PATH_SEP}')
+        if self.parent_id in paths:
+            self.parent.tree_path = paths[self.parent_id]
+        self.tree_path = self.get_parent_tree_path()
+        super().save(*args, **kwargs)
+        if old_descendant_path != self.get_descendant_tree_path():
+            self.move_descendants_tree_path(old_descendant_path)
+
+    def get_parent_tree_path(self):
+        """
+        Returns the tree path for self computed from its current parent.
+        """
+        if self.parent_id is None:
+            return self.TREE_PATH_SEP
+        return f'{self.parent.tree_path}{self.parent_id}{self.TREE_PATH_SEP}'
+
+    def get_descendant_tree_path(self):
+        """
+        Returns the tree path prefix shared by all descendants of self.
+        """
+        return f'{self.tree_path}{self.pk}{self.TREE_PATH_SEP}'
+
+    def get_ancestor_pk_list(self):
+        """
+        Returns primary keys of all ancestors ordered from root to parent.
+        """
+        return [int(pk) for pk in self.tree_path.split(self.TREE_PATH_SEP)
+                if pk]
+
     @classmethod
-    def get_children(cls, obj):
+    def tree_path_prefix_q(cls, prefix, lookup="tree_path"):
         """
-        Returns a dictionary of all children for a given object.
+        Returns a Q object matching tree paths starting with `prefix` (a
+        descendant tree path, ending with `TREE_PATH_SEP`), served by the
+        tree path index (see `TreePathPrefix`).
+        """
+        return djm.Q(**{f'{lookup}__{TreePathPrefix.lookup_name}': prefix})
+
+    def move_descendants_tree_path(self, old_descendant_path):
+        """
+        Rewrite tree path of all descendants after self has been reparented
+        in a single UPDATE query.
+        """
+        return self.__class__.objects.filter(
+            self.tree_path_prefix_q(old_descendant_path),
+        ).update(tree_path=db_funcs.Concat(
+            djm.Value(self.get_descendant_tree_path()),
+            db_funcs.Substr("tree_path", len(old_descendant_path) + 1),
+            output_field=djm.CharField(),
+        ))
+
+    @classmethod
+    def strip_deleted_tree_paths(cls, objs):
+        """
+        Children of deleted objects become roots (`parent` is SET_NULL), so
+        once given objects are deleted, they and their ancestors are stripped
+        from the tree path of their remaining descendants. `updated_at` is
+        bumped as well so that the change is synced.
+
+        Remaining descendants are read in one query per
+        `CHILDREN_FOREST_BATCH_SIZE` topmost deleted objects, and rewritten
+        with one UPDATE per deleted object which is their nearest deleted
+        ancestor, so deleting objects without children writes nothing.
+        """
+        sep = cls.TREE_PATH_SEP
+        deleted = {obj.pk: obj for obj in objs}
+        prefixes = [
+            obj.get_descendant_tree_path() for obj in deleted.values()
+            if deleted.keys().isdisjoint(obj.get_ancestor_pk_list())
+        ]
+        # prefixes of the nearest deleted ancestor of remaining descendants
+        stripped_prefixes = set()
+        for i in range(0, len(prefixes), cls.CHILDREN_FOREST_BATCH_SIZE):
+            query = djm.Q()
+            for prefix in prefixes[i:i + cls.CHILDREN_FOREST_BATCH_SIZE]:
+                query |= cls.tree_path_prefix_q(prefix)
+            for path in cls.objects.filter(query).values_list(
+                    "tree_path", flat=True):
+                ancestor_pks = [pk for pk in path.split(sep) if pk]
+                depth = max(index for index, pk in enumerate(ancestor_pks)
+                            if int(pk) in deleted)
+                stripped_prefixes.add(
+                    f'{sep}{sep.join(ancestor_pks[:depth + 1])}{sep}')
+        # descendants of deeper objects are moved out of the range of
+        # shallower ones before these are rewritten
+        now = timezone.now()
+        for prefix in sorted(stripped_prefixes, key=len, reverse=True):
+            cls.objects.filter(cls.tree_path_prefix_q(prefix)).update(
+                tree_path=db_funcs.Concat(
+                    djm.Value(sep),
+                    db_funcs.Substr("tree_path", len(prefix) + 1),
+                    output_field=djm.CharField(),
+                ),
+                updated_at=now,
+            )
+
+    @classmethod
+    def bump_tree_versions(cls, objs):
         """
+        Invalidates cached fragments of the scopes of given objects. Used by
+        bulk writes, which don't send save signals.
+        """
+        scope_pks = {getattr(obj, cls.tree_scope_field) for obj in objs}
+        for scope_pk in scope_pks - {None}:
+            tree_cache.bump_tree_version(cls, scope_pk)
+
+    @classmethod
+    def bulk_create_tree(cls, objs):
+        """
+        Inserts objects with `bulk_create`, setting their tree path from their
+        (saved) parent. Returns the created objects.
+        """
+        for obj in objs:
+            obj.tree_path = obj.get_parent_tree_path()
+        objs = cls.objects.bulk_create(objs)
+        for obj in objs:
+            obj.set_tracked_values()
+        cls.bump_tree_versions(objs)
+        return objs
+
+    @classmethod
+    def bulk_update_tree(cls, objs, fields):
+        """
+        Updates given fields of objects with `bulk_update`.
+
+        Objects must not have changed tracked fields (parent, scope, ...) since
+        moves and cascades done by `save` are skipped.
+        """
+        cls.objects.bulk_update(objs, fields)
+        for obj in objs:
+            obj.set_tracked_values()
+        cls.bump_tree_versions(objs)
+
+    @classmethod
+    def get_descendants(cls, obj):
+        """
+        Returns a queryset of all descendants for a given object.
+        """
+        return cls.objects.filter(
+            cls.tree_path_prefix_q(obj.get_descendant_tree_path()))
+
+    @classmethod
+    def get_ancestors(cls, obj):
+        """
+        Returns a queryset of all ancestors for a given object.
+        """
+        return cls.objects.filter(pk__in=obj.get_ancestor_pk_list())
+
+    @classmethod
+    def link_ancestors(cls, objs):
+        """
+        Sets the parent of given objects and of their ancestors, loading the
+        ancestors which are not in `objs` in one query, so that walking up
+        parents (e.g. in `__str__`) doesn't query per level.
+        """
+        nodes = {obj.pk: obj for obj in objs}
+        missing = {
+            pk for obj in objs for pk in obj.get_ancestor_pk_list()
+        } - set(nodes)
+        if missing:
+            nodes.update(
+                (obj.pk, obj) for obj in cls.objects.filter(pk__in=missing))
+        for obj in [*objs, *nodes.values()]:
+            parent = nodes.get(obj.parent_id)
+            if parent is not None:
+                obj.parent = parent
+
+    @classmethod
+    def _nest_children(cls, children_map, parent_pk):
         result = {}
-        children = obj.children.all()
-        if children.exists:
-            for child in children:
-                if child.children.all().exists():
-                    result[child] = cls.get_children(child)
-                else:
-                    result[child] = {}
+        for child in children_map.get(parent_pk, []):
+            result[child] = cls._nest_children(children_map, child.pk)
         return result
 
     @classmethod
-    def get_children_pk_list(cls, obj, result=[]):
+    def get_children(cls, obj):
         """
         Returns a dictionary of all children for a given object.
         """
-        children = obj.children.all()
-        if children.exists():
-            for child in children:
-                result.append(child.pk)
-                if child.children.all().exists():
-                    result.extend(cls.get_children_pk_list(child))
-        return result
+        return cls.get_tree(cls.get_descendants(obj).order_by("pk"))
+
+    @classmethod
+    def get_children_forest(cls, objs, related=()):
+        """
+        Returns a dictionary of object pk to its children dictionary (as
+        returned by `get_children`) for given objects. Descendants are loaded
+        with `related` relations selected.
+
+        Descendants of all objects are loaded in one query per
+        `CHILDREN_FOREST_BATCH_SIZE` prefixes (databases limit the size of an
+        expression). Prefixes nested in an other object's prefix are skipped
+        since their descendants are already matched.
+        """
+        prefixes = []
+        for prefix in sorted({obj.get_descendant_tree_path() for obj in objs}):
+            if not prefixes or not prefix.startswith(prefixes[-1]):
+                prefixes.append(prefix)
+        if not prefixes:
+            return {}
+        children_map = {}
+        for i in range(0, len(prefixes), cls.CHILDREN_FOREST_BATCH_SIZE):
+            query = djm.Q()
+            for prefix in prefixes[i:i + cls.CHILDREN_FOREST_BATCH_SIZE]:
+                query |= cls.tree_path_prefix_q(prefix)
+            queryset = cls.objects.filter(query).order_by("pk")
+            if related:
+                queryset = queryset.select_related(*related)
+            for descendant in queryset:
+                children_map.setdefault(
+                    descendant.parent_id, []).append(descendant)
+        return {
+            obj.pk: cls._nest_children(children_map, obj.pk) for obj in objs
+        }
+
+    @classmethod
+    def get_children_pk_list(cls, obj):
+        """
+        Returns a list of primary keys of all descendants for a given object.
+        """
+        return list(tree_queries.get_descendant_depths(cls, [obj.pk]))
+
+    @classmethod
+    def rebuild_tree_paths(cls):
+        """
+        Recompute tree path of all objects from `parent`, e.g. after loading
+        fixtures which bypass `save`.
+        """
+        stale_paths = tree_queries.get_stale_tree_paths(cls)
+        objs = [cls(pk=pk, tree_path=path) for pk, path in stale_paths.items()]
+        cls.objects.bulk_update(objs, ["tree_path"], batch_size=500)
+        return len(objs)
 
     @classmethod
     def get_tree(cls, objs):
         """
         Returns a dictionary of tree relationship for given objects.
+
+        `objs` is evaluated once and the tree is built in memory from a
+        `parent_id` -> children map. Objects whose parent is not in `objs` are
+        roots.
         """
-        result = {}
-        root_objs = []
+        objs = list(objs)
+        pks = {obj.pk for obj in objs}
+        children_map = {}
         for obj in objs:
-            if obj.parent not in objs:
-                root_objs.append(obj)
-        for root_obj in root_objs:
-            result[root_obj] = cls.get_children(root_obj)
-        return result
+            parent_pk = obj.parent_id if obj.parent_id in pks else None
+            children_map.setdefault(parent_pk, []).append(obj)
+        return cls._nest_children(children_map, None)
 
     @classmethod
     def get_root(cls, obj):
-        if obj.parent:
-            return cls.get_root(obj.parent)
-        else:
+        if obj.parent_id is None:
             return obj
+        return tree_queries.get_ancestor_chain(cls, obj.pk)[0]
 
     @classmethod
     def get_hierarchy(cls, obj):
-        root = cls.get_root(obj)
-        return {root: cls.get_tree(root.get_children(root))}
+        """
+        Returns a dictionary of the whole tree containing a given object.
+        """
+        return cls.get_tree(tree_queries.get_hierarchy_objs(cls, obj.pk))
 
     @classmethod
     def _render_hierarchy(cls, tree, attr_name, obj=None):
@@ -105,7 +455,20 @@ class TreeMixin():
         return result
 
     def render_hierarchy(self, attr_name):
-        return self._render_hierarchy(self.get_hierarchy(self), attr_name, self)
+        return self.get_cached_fragment(
+            getattr(self, self.tree_scope_field),
+            ("hierarchy", attr_name, self.pk),
+            lambda: self._render_hierarchy(
+                self.get_hierarchy(self), attr_name, self),
+        )
+
+    @classmethod
+    def get_cached_fragment(cls, scope_pk, key_parts, render):
+        """
+        Returns a rendered fragment of trees in the given scope from cache,
+        calling `render` on a miss.
+        """
+        return tree_cache.get_or_render(cls, scope_pk, key_parts, render)
 
     @classmethod
     def render_tree(cls, tree, attr_name):
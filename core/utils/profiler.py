@@ -0,0 +1,134 @@
+"""
+Sampling profiler of single requests.
+
+`Sampler` samples the stack of a thread every `PROFILER_SAMPLE_INTERVAL`
+seconds from a background thread and counts samples per stack, written as
+collapsed stacks (`frame;frame;frame count` lines) which flame graph tools
+(flamegraph.pl, speedscope, ...) read. `QueryRecorder` lists the SQL queries
+run meanwhile with their time. Profiles are stored in the cache for
+`PROFILER_TIMEOUT` seconds under a random id (see
+`core.middleware.ProfilerMiddleware` and the `profile` view).
+
+Samples are taken when the sampling thread gets the GIL, so intervals
+below the interpreter's switch interval (5ms by default) are not reached
+while the request thread runs Python code.
+"""
+import collections
+import sys
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+MAX_STACK_DEPTH = 200
+
+
+def get_frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f'{module}:{code.co_qualname}'
+
+
+def get_stack(frame, root=None):
+    """
+    Returns the names of the frames of a stack from the outermost frame (or
+    the frame below `root`) to `frame`.
+    """
+    names = []
+    while frame is not None and frame is not root \
+            and len(names) < MAX_STACK_DEPTH:
+        names.append(get_frame_name(frame))
+        frame = frame.f_back
+    return names[::-1]
+
+
+class Sampler():
+    """
+    Samples stacks of the calling thread below its current frame, between
+    `start()` and `stop()`.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = (settings.PROFILER_SAMPLE_INTERVAL
+                         if interval is None else interval)
+        self.counts = collections.Counter()
+        self.thread_id = None
+        self.root = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        # frames of the caller and above are left out of stacks
+        self.root = sys._getframe(1)
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       name="request-profiler")
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = get_stack(frame, self.root)
+            if stack:
+                self.counts[";".join(stack)] += 1
+            del frame
+
+    def get_collapsed(self):
+        return "".join(
+            f'{stack} {count}\n' for stack, count in self.counts.most_common())
+
+
+class QueryRecorder():
+    """
+    Database execute wrapper listing queries with their duration in
+    milliseconds, up to `PROFILER_MAX_QUERIES` (query parameters are not
+    kept).
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            if len(self.queries) < settings.PROFILER_MAX_QUERIES:
+                self.queries.append({
+                    "database": self.alias,
+                    "sql": sql,
+                    "many": many,
+                    "duration": (time.perf_counter() - start) * 1000,
+                })
+
+
+def _get_key(profile_id):
+    return f'profile:{profile_id}'
+
+
+def store(profile):
+    """
+    Stores a profile in the cache. Returns its id.
+    """
+    profile_id = uuid.uuid4().hex
+    cache.set(_get_key(profile_id), profile, settings.PROFILER_TIMEOUT)
+    return profile_id
+
+
+def get(profile_id):
+    """
+    Returns a stored profile, or None if unknown or expired.
+    """
+    return cache.get(_get_key(profile_id))
@@ -0,0 +1,154 @@
+"""
+Log of slow SQL queries with their query plan.
+
+`SlowQueryLogger` is a database execute wrapper (installed per request by
+`core.middleware.SlowQueryMiddleware`) logging queries slower than
+`SLOW_QUERY_THRESHOLD` seconds to the `core.slow_queries` logger, with their
+normalized SQL, call site (view, innermost project frame and DRF
+serializer/field) and, with `SLOW_QUERY_EXPLAIN`, the plan of SELECT
+queries (`EXPLAIN QUERY PLAN` on SQLite, `EXPLAIN` on PostgreSQL and MySQL).
+
+Plans are read with the database cursor itself, so that they are not
+counted as queries of the request nor go through execute wrappers again.
+"""
+import logging
+import os
+import re
+import sys
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+from rest_framework import fields as drf_fields
+
+
+logger = logging.getLogger("core.slow_queries")
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+# frames of these files are not call sites
+IGNORED_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                 "middleware.py"),
+}
+
+_select = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+_whitespace = re.compile(r"\s+")
+_in_list = re.compile(r"\bIN \((?:%s, )*%s\)", re.IGNORECASE)
+_string = re.compile(r"'(?:[^']|'')*'")
+_number = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+
+
+def normalize(sql):
+    """
+    Returns the SQL of a query with literals replaced by placeholders,
+    `IN` lists collapsed and whitespace squeezed, the same for queries which
+    only differ by their parameters.
+    """
+    sql = _string.sub("%s", sql)
+    sql = _number.sub("%s", sql)
+    sql = _whitespace.sub(" ", sql).strip()
+    return _in_list.sub("IN (...)", sql)
+
+
+def is_project_file(filename):
+    # code of shell commands, templates compiled by exec(), ...
+    if filename.startswith("<"):
+        return False
+    filename = os.path.abspath(filename)
+    return (filename.startswith(str(settings.BASE_DIR) + os.sep)
+            and "site-packages" not in filename
+            and filename not in IGNORED_FILES)
+
+
+def get_call_site(frame):
+    """
+    Returns the innermost frame of project code of a stack as
+    `path:line in function` and the innermost DRF serializer field running
+    as `Serializer.field` (or the serializer class), if any.
+    """
+    location = field = None
+    while frame is not None and (location is None or field is None):
+        if location is None and is_project_file(frame.f_code.co_filename):
+            location = (
+                f'{os.path.relpath(frame.f_code.co_filename, settings.BASE_DIR)}'
+                f':{frame.f_lineno} in {frame.f_code.co_name}')
+        obj = frame.f_locals.get("self")
+        # isinstance() would evaluate lazy objects (e.g. `request.user`)
+        if field is None and issubclass(type(obj), drf_fields.Field):
+            parent = getattr(obj, "parent", None)
+            if obj.field_name and parent is not None:
+                field = f'{type(parent).__name__}.{obj.field_name}'
+            else:
+                field = type(obj).__name__
+        frame = frame.f_back
+    return location, field
+
+
+def explain(connection, sql, params):
+    """
+    Returns the plan of a SELECT query as text, or None if the query or
+    database is not supported.
+    """
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None or not _select.match(sql):
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.cursor.execute(prefix + sql, params)
+            rows = cursor.cursor.fetchall()
+    except DatabaseError as e:
+        return f'EXPLAIN failed: {e}'
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+class SlowQueryLogger():
+    """
+    Database execute wrapper logging queries slower than `threshold`
+    seconds (`SLOW_QUERY_THRESHOLD` by default), of a view if given.
+    """
+
+    def __init__(self, connection, threshold=None, view_name=None):
+        self.connection = connection
+        self.threshold = (settings.SLOW_QUERY_THRESHOLD
+                          if threshold is None else threshold)
+        self.view_name = view_name
+        self.records = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration >= self.threshold:
+            self.log(sql, params, many, duration)
+        return result
+
+    def get_view_name(self):
+        return self.view_name() if callable(self.view_name) \
+            else self.view_name
+
+    def log(self, sql, params, many, duration):
+        location, field = get_call_site(sys._getframe(2))
+        record = {
+            "database": self.connection.alias,
+            "duration": duration * 1000,
+            "sql": normalize(sql),
+            "many": many,
+            "view": self.get_view_name(),
+            "location": location,
+            "field": field,
+            "plan": (explain(self.connection, sql, params)
+                     if settings.SLOW_QUERY_EXPLAIN and not many else None),
+        }
+        self.records.append(record)
+        plan = f'\nPlan:\n{record["plan"]}' if record["plan"] else ""
+        logger.warning(
+            "Slow query (%.1f ms) of %s at %s%s:\n%s%s",
+            record["duration"], record["view"] or "<no view>",
+            location or "<unknown>", f' ({field})' if field else "",
+            record["sql"], plan, extra={"slow_query": record},
+        )
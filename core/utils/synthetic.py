@@ -0,0 +1,271 @@
+"""
+Synthetic data for benchmarks and manual testing.
+
+`Generator` creates users with workspaces, their tags, priorities and
+statuses, category trees, project and task trees (with tags, status and
+priority), and comment threads on workspaces, categories, projects and
+tasks. All rows are inserted with `bulk_create`, tree models level by level
+with `TreeMixin.bulk_create_tree`, so that parents have their tree path
+before their children are inserted. Model `save()` and its signals are not
+run.
+
+The generated data only depends on the scale and the seed.
+"""
+import datetime as dt
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from core import models as core_models
+
+
+BATCH_SIZE = 1000
+BASE_DATE = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+
+WORDS = (
+    "alpha beta gamma delta review draft plan budget release design "
+    "report meeting client server backup invoice schedule research test "
+    "deploy migrate refactor document follow up call email order fix"
+).split()
+
+DEFAULT_SCALE = {
+    "users": 1,
+    "workspaces": 2,
+    "tags": 10,
+    "categories": 6,
+    "category_depth": 2,
+    "projects": 2,
+    "tasks": 50,
+    "task_depth": 4,
+    "task_tags": 2,
+    "comments": 3,
+    "comment_depth": 3,
+}
+
+
+def get_levels(count, depth, rng):
+    """
+    Returns the level (0 for roots) of each of `count` nodes of a forest at
+    most `depth` levels deep, shallow levels holding more nodes.
+    """
+    if count <= 0:
+        return []
+    depth = max(1, min(depth, count))
+    levels = list(range(depth)) + [
+        min(int(rng.expovariate(1)), depth - 1)
+        for _ in range(count - depth)
+    ]
+    return sorted(levels)
+
+
+class Generator():
+    """
+    Generates data at the scale of `DEFAULT_SCALE` updated by `scale`:
+    numbers of users, workspaces per user, tags per workspace, categories per
+    workspace, projects per category, tasks per category, tags per task and
+    comments per object (workspace, category, project and task), and depths
+    of the category, task and comment trees.
+    """
+
+    def __init__(self, seed=0, username_prefix="synthetic", password=None,
+                 batch_size=BATCH_SIZE, **scale):
+        unknown = set(scale) - set(DEFAULT_SCALE)
+        if unknown:
+            raise ValueError(f'Unknown scale {sorted(unknown)}.')
+        self.scale = {**DEFAULT_SCALE, **scale}
+        self.rng = random.Random(seed)
+        self.username_prefix = username_prefix
+        self.password = make_password(password)
+        self.batch_size = batch_size
+        self.counts = {}
+
+    def generate(self):
+        """
+        Creates the data. Returns the created users and the number of
+        created rows per table.
+        """
+        users = self.create_users()
+        workspaces = self.create_workspaces(users)
+        options = self.create_workspace_options(workspaces)
+        categories = self.create_trees(
+            core_models.Category, workspaces, self.scale["categories"],
+            self.scale["category_depth"], self.new_category)
+        projects = self.create_trees(
+            core_models.Project, categories, self.scale["projects"], 1,
+            lambda category, i: self.new_item(
+                core_models.Project, category, options, f'project {i}'))
+        category_projects = {}
+        for project in projects:
+            category_projects.setdefault(
+                project.category_id, []).append(project)
+        tasks = self.create_trees(
+            core_models.Task, categories, self.scale["tasks"],
+            self.scale["task_depth"],
+            lambda category, i: self.new_task(
+                category, options, category_projects.get(category.pk, []), i),
+            inherited=["project"])
+        self.create_task_tags(tasks, options)
+        for model, field_name, objs in [
+            (core_models.WorkspaceComment, "workspace", workspaces),
+            (core_models.CategoryComment, "category", categories),
+            (core_models.ProjectComment, "project", projects),
+            (core_models.TaskComment, "task", tasks),
+        ]:
+            self.create_trees(
+                model, objs, self.scale["comments"],
+                self.scale["comment_depth"],
+                lambda obj, i, model=model, field_name=field_name: model(
+                    content=self.get_text(8, 40), created_by=obj.created_by,
+                    **{field_name: obj}))
+        return users, self.counts
+
+    def add_count(self, model, count):
+        key = model._meta.label_lower
+        self.counts[key] = self.counts.get(key, 0) + count
+
+    def bulk_create(self, model, objs):
+        objs = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.add_count(model, len(objs))
+        return objs
+
+    def get_text(self, min_words, max_words):
+        return " ".join(self.rng.choices(
+            WORDS, k=self.rng.randint(min_words, max_words)))
+
+    def get_dates(self):
+        """
+        Returns estimated start and end dates and effort.
+        """
+        start = BASE_DATE + dt.timedelta(days=self.rng.randint(0, 365))
+        effort = self.rng.randint(1, 30)
+        return {
+            "estimated_start_date": start,
+            "estimated_end_date": start + dt.timedelta(days=effort),
+            "estimated_effort": effort,
+        }
+
+    def create_users(self):
+        existing = get_user_model().objects.filter(
+            username__startswith=f'{self.username_prefix}-').count()
+        users = [
+            get_user_model()(username=f'{self.username_prefix}-{i}',
+                             password=self.password)
+            for i in range(existing, existing + self.scale["users"])
+        ]
+        return self.bulk_create(get_user_model(), users)
+
+    def create_workspaces(self, users):
+        workspaces = [
+            core_models.Workspace(
+                name=f'workspace {i}', description=self.get_text(5, 20),
+                is_default=i == 0, created_by=user)
+            for user in users
+            for i in range(self.scale["workspaces"])
+        ]
+        return self.bulk_create(core_models.Workspace, workspaces)
+
+    def create_workspace_options(self, workspaces):
+        """
+        Creates tags, priorities and statuses of the workspaces. Returns them
+        by workspace pk.
+        """
+        options = {}
+        for model, names in [
+            (core_models.Tag,
+             [f'tag {i}' for i in range(self.scale["tags"])]),
+            (core_models.Priority, ["low", "medium", "high"]),
+            (core_models.Status, ["todo", "doing", "done"]),
+        ]:
+            objs = [
+                model(name=name, workspace=workspace,
+                      created_by=workspace.created_by,
+                      **({} if model is core_models.Tag else {"order": i}))
+                for workspace in workspaces
+                for i, name in enumerate(names)
+            ]
+            for obj in self.bulk_create(model, objs):
+                options.setdefault(obj.workspace_id, {}).setdefault(
+                    model, []).append(obj)
+        return options
+
+    def create_trees(self, model, scopes, count, depth, new, inherited=()):
+        """
+        Creates a forest of `count` objects per scope object, at most
+        `depth` levels deep, with `new(scope, i)` returning unsaved objects.
+        Children take the `inherited` fields of their parent. Returns the
+        created objects.
+        """
+        levels = {}
+        for scope in scopes:
+            nodes = {}
+            for i, level in enumerate(get_levels(count, depth, self.rng)):
+                obj = new(scope, i)
+                if level:
+                    obj.parent = self.rng.choice(nodes[level - 1])
+                    for name in inherited:
+                        setattr(obj, name, getattr(obj.parent, name))
+                nodes.setdefault(level, []).append(obj)
+            for level, objs in nodes.items():
+                levels.setdefault(level, []).extend(objs)
+        created = []
+        for level in sorted(levels):
+            objs = levels[level]
+            for obj in objs:
+                # parents were assigned unsaved, set their (new) pk
+                if obj.parent is not None:
+                    obj.parent = obj.parent
+            for i in range(0, len(objs), self.batch_size):
+                created += model.bulk_create_tree(
+                    objs[i:i + self.batch_size])
+        self.add_count(model, len(created))
+        return created
+
+    def new_category(self, workspace, i):
+        return core_models.Category(
+            name=f'category {i}', description=self.get_text(3, 10),
+            workspace=workspace, created_by=workspace.created_by)
+
+    def new_item(self, model, category, options, title):
+        """
+        Returns an unsaved project or task of a category.
+        """
+        workspace_options = options[category.workspace_id]
+        return model(
+            title=title, detail=self.get_text(0, 30),
+            workspace_id=category.workspace_id, category=category,
+            status=self.rng.choice(workspace_options[core_models.Status]),
+            priority=self.rng.choice(
+                workspace_options[core_models.Priority] + [None]),
+            created_by=category.created_by,
+            **self.get_dates())
+
+    def new_task(self, category, options, projects, i):
+        """
+        Returns an unsaved task of a category, in one of its projects or
+        none.
+        """
+        task = self.new_item(core_models.Task, category, options, f'task {i}')
+        if projects and self.rng.random() < 0.5:
+            task.project = self.rng.choice(projects)
+        return task
+
+    def create_task_tags(self, tasks, options):
+        through = core_models.Task.tags.through
+        links = []
+        for task in tasks:
+            tags = options[task.workspace_id].get(core_models.Tag, [])
+            count = min(len(tags), self.rng.randint(0, self.scale["task_tags"]))
+            links += [
+                through(task_id=task.pk, tag_id=tag.pk)
+                for tag in self.rng.sample(tags, count)
+            ]
+        self.bulk_create(through, links)
+
+
+def generate(seed=0, **kwargs):
+    """
+    Creates synthetic data, see `Generator`. Returns the created users and
+    the number of created rows per table.
+    """
+    return Generator(seed=seed, **kwargs).generate()
@@ -0,0 +1,45 @@
+"""
+Cache for rendered HTML fragments of TreeMixin trees.
+
+Fragments are keyed by model, scope (the object all nodes of a tree belong
+to, see `TreeMixin.tree_scope_field`) and the scope's tree version. Versions
+are bumped from save/delete signals (see `core.signals`), so a changed tree
+is re-rendered while unchanged trees are served from the cache.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.utils import cache_versions
+
+
+def _get_version_key(model, scope_pk):
+    return f'tree-version:{model._meta.label_lower}:{scope_pk}'
+
+
+def get_tree_version(model, scope_pk):
+    return cache_versions.get_version(_get_version_key(model, scope_pk))
+
+
+def bump_tree_version(model, scope_pk):
+    cache_versions.bump_version(_get_version_key(model, scope_pk))
+
+
+def get_or_render(model, scope_pk, key_parts, render):
+    """
+    Returns the cached fragment for given model, scope and key parts, calling
+    `render` to build and cache it on a miss.
+    """
+    version = get_tree_version(model, scope_pk)
+    parts_hash = hashlib.md5(
+        ":".join(str(part) for part in key_parts).encode()).hexdigest()
+    key = (
+        f'tree-fragment:{model._meta.label_lower}:{scope_pk}:{version}'
+        f':{parts_hash}'
+    )
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = render()
+        cache.set(key, fragment, settings.TREE_CACHE_TIMEOUT)
+    return fragment
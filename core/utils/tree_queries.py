@@ -0,0 +1,132 @@
+"""
+Recursive CTE (`WITH RECURSIVE`) queries over the `parent` column of
+TreeMixin models. They are supported by both SQLite and PostgreSQL and walk
+the source of truth directly, so results don't depend on `tree_path` being
+up to date. Each function is a single round trip.
+
+Recursion stops `MAX_DEPTH` levels deep, so that a cycle of parents (which
+validation rejects, but which could be written bypassing it) can't make a
+query loop forever.
+"""
+from django.db import connections, router
+
+
+# deeper than any tree whose path fits in a `tree_path` field
+MAX_DEPTH = 1000
+
+
+def _get_table_info(model):
+    connection = connections[router.db_for_read(model)]
+    qn = connection.ops.quote_name
+    return (
+        connection,
+        qn(model._meta.db_table),
+        qn(model._meta.pk.column),
+        qn(model._meta.get_field("parent").column),
+    )
+
+
+def _ancestors_cte(table, pk_col, parent_col):
+    return f'''
+        ancestors(id, parent_id, distance) AS (
+            SELECT {pk_col}, {parent_col}, 0 FROM {table}
+            WHERE {pk_col} = %s
+            UNION ALL
+            SELECT t.{pk_col}, t.{parent_col}, a.distance + 1
+            FROM {table} t JOIN ancestors a ON t.{pk_col} = a.parent_id
+            WHERE a.distance < {MAX_DEPTH}
+        )'''
+
+
+def get_ancestor_chain(model, pk):
+    """
+    Returns the object with given pk and all its ancestors ordered from root
+    to the object. Each object has a `tree_depth` attribute (root is 0).
+    """
+    connection, table, pk_col, parent_col = _get_table_info(model)
+    sql = f'''
+        WITH RECURSIVE {_ancestors_cte(table, pk_col, parent_col)}
+        SELECT t.*, a.distance FROM {table} t
+        JOIN ancestors a ON t.{pk_col} = a.id
+        ORDER BY a.distance DESC
+    '''
+    chain = list(model.objects.raw(sql, [pk]))
+    for depth, obj in enumerate(chain):
+        obj.tree_depth = depth
+    return chain
+
+
+def get_hierarchy_objs(model, pk):
+    """
+    Returns all objects of the tree containing the object with given pk,
+    i.e. its root and all of the root's descendants, each with a
+    `tree_depth` attribute.
+    """
+    connection, table, pk_col, parent_col = _get_table_info(model)
+    sql = f'''
+        WITH RECURSIVE {_ancestors_cte(table, pk_col, parent_col)},
+        hierarchy(id, depth) AS (
+            SELECT id, 0 FROM ancestors WHERE parent_id IS NULL
+            UNION ALL
+            SELECT t.{pk_col}, h.depth + 1
+            FROM {table} t JOIN hierarchy h ON t.{parent_col} = h.id
+            WHERE h.depth < {MAX_DEPTH}
+        )
+        SELECT t.*, h.depth AS tree_depth FROM {table} t
+        JOIN hierarchy h ON t.{pk_col} = h.id
+        ORDER BY h.depth, t.{pk_col}
+    '''
+    return list(model.objects.raw(sql, [pk]))
+
+
+def get_descendant_depths(model, pks):
+    """
+    Returns a dictionary of `pk: depth` for all descendants of objects with
+    given pks. Children of the given objects have depth 1.
+    """
+    pks = list(pks)
+    if not pks:
+        return {}
+    connection, table, pk_col, parent_col = _get_table_info(model)
+    placeholders = ", ".join(["%s"] * len(pks))
+    sql = f'''
+        WITH RECURSIVE descendants(id, depth) AS (
+            SELECT {pk_col}, 1 FROM {table}
+            WHERE {parent_col} IN ({placeholders})
+            UNION ALL
+            SELECT t.{pk_col}, d.depth + 1
+            FROM {table} t JOIN descendants d ON t.{parent_col} = d.id
+            WHERE d.depth < {MAX_DEPTH}
+        )
+        SELECT id, depth FROM descendants
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(sql, pks)
+        return dict(cursor.fetchall())
+
+
+def get_stale_tree_paths(model):
+    """
+    Returns a dictionary of `pk: tree_path` for objects whose stored
+    `tree_path` differs from the one computed from `parent`.
+    """
+    connection, table, pk_col, parent_col = _get_table_info(model)
+    path_col = connection.ops.quote_name(
+        model._meta.get_field("tree_path").column)
+    sep = model.TREE_PATH_SEP
+    sql = f'''
+        WITH RECURSIVE paths(id, path, depth) AS (
+            SELECT {pk_col}, CAST(%s AS TEXT), 0 FROM {table}
+            WHERE {parent_col} IS NULL
+            UNION ALL
+            SELECT t.{pk_col}, p.path || CAST(p.id AS TEXT) || %s, p.depth + 1
+            FROM {table} t JOIN paths p ON t.{parent_col} = p.id
+            WHERE p.depth < {MAX_DEPTH}
+        )
+        SELECT p.id, p.path FROM paths p
+        JOIN {table} t ON t.{pk_col} = p.id
+        WHERE t.{path_col} <> p.path
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [sep, sep])
+        return dict(cursor.fetchall())
@@ -0,0 +1,47 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+
+from core.utils import metrics as core_metrics
+from core.utils import profiler
+
+
+def has_metrics_token(request):
+    if not settings.METRICS_TOKEN:
+        return False
+    return hmac.compare_digest(
+        request.headers.get("Authorization", ""),
+        f'Bearer {settings.METRICS_TOKEN}',
+    )
+
+
+def metrics(request):
+    """
+    Request metrics in Prometheus text format, for staff users and clients
+    sent with `Authorization: Bearer <METRICS_TOKEN>` (e.g. the Prometheus
+    server) only.
+    """
+    if not (request.user.is_staff or has_metrics_token(request)):
+        raise Http404
+    return HttpResponse(
+        core_metrics.render(core_metrics.collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def profile(request, profile_id):
+    """
+    A stored request profile (see `core.middleware.ProfilerMiddleware`), for
+    staff users only: as JSON, or its collapsed stacks as text with
+    `?format=collapsed`.
+    """
+    if not request.user.is_staff:
+        raise Http404
+    result = profiler.get(profile_id)
+    if result is None:
+        raise Http404
+    if request.GET.get("format") == "collapsed":
+        return HttpResponse(result["collapsed"],
+                            content_type="text/plain; charset=utf-8")
+    return JsonResponse(result)
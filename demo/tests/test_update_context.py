@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from core import models as core_models
+from core.tests.generic_classes import CustomTestCaseSetup
+from demo import utils as demo_utils
+
+
+class WorkspacesSidebarTests(CustomTestCaseSetup):
+    """
+    Test rendered workspaces sidebar is loaded in fixed queries, cached per
+    user and invalidated on workspace/category changes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.db_create_workspaces(cls.user)
+        for workspace in cls.get_workspace_query():
+            cls.db_create_categories(cls.user, workspace)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_request(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        return request
+
+    def render(self, *args):
+        return demo_utils.get_workspaces_rendered(self.get_request(), *args)
+
+    def test_fixed_queries(self):
+        """
+        Test number of queries doesn't depend on number of workspaces.
+        """
+
+        with self.assertNumQueries(2):
+            self.render()
+        workspace = core_models.Workspace.objects.create(
+            name="workspace 3", created_by=self.user)
+        self.db_create_categories(self.user, workspace)
+        with self.assertNumQueries(2):
+            assert "workspace 3" in self.render()
+
+    def test_cached(self):
+        rendered = self.render()
+        with self.assertNumQueries(0):
+            assert self.render() == rendered
+
+    def test_memoized_on_request(self):
+        request = self.get_request()
+        rendered = demo_utils.get_workspaces_rendered(request)
+        cache.clear()
+        with self.assertNumQueries(0):
+            assert demo_utils.get_workspaces_rendered(request) == rendered
+
+    def test_invalidated_on_category_change(self):
+        self.render()
+        self.ws_1_category_1.name = "renamed"
+        self.ws_1_category_1.save()
+        assert "renamed" in self.render()
+        self.ws_1_category_1.delete()
+        assert "renamed" not in self.render()
+
+    def test_invalidated_on_workspace_change(self):
+        self.render()
+        self.workspace_2.name = "renamed"
+        self.workspace_2.save()
+        assert "renamed" in self.render()
+
+    def test_selected_category_scoped_to_workspace(self):
+        """
+        Test only the selected category is highlighted, not categories with
+        the same name in other workspaces.
+        """
+
+        rendered = self.render(self.workspace_1, self.ws_1_category_1)
+        assert rendered.count("bg-danger-subtle") == 1
+        assert rendered.count("bg-warning-subtle") == 1
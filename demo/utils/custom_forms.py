@@ -1,9 +1,63 @@
 from django import forms as djf
+from django.forms.models import ModelChoiceIterator
+
+from core import models as core_models
+
+
+# related objects read by `__str__` of models, i.e. by choice labels
+CHOICE_LABEL_RELATED = {
+    core_models.Workspace: ["created_by"],
+    core_models.WorkspaceComment: ["workspace__created_by"],
+    core_models.CategoryComment: ["category"],
+    core_models.Project: ["workspace", "category"],
+    core_models.ProjectComment: ["project__workspace", "project__category"],
+    core_models.Task: ["workspace", "category", "project"],
+    core_models.TaskComment: [
+        "task__workspace", "task__category", "task__project"],
+}
+# categories of choices, whose labels walk up category parents
+CHOICE_LABEL_CATEGORIES = {
+    core_models.Category: lambda obj: obj,
+    core_models.CategoryComment: lambda obj: obj.category,
+}
+
+
+class LabelChoiceIterator(ModelChoiceIterator):
+    """
+    Iterates choices with the related objects of their labels loaded in the
+    query of the choices, instead of one query per choice.
+    """
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        queryset, model = self.queryset, self.queryset.model
+        if model in CHOICE_LABEL_RELATED:
+            queryset = queryset.select_related(*CHOICE_LABEL_RELATED[model])
+        objs = list(queryset)
+        if model in CHOICE_LABEL_CATEGORIES:
+            core_models.Category.link_ancestors(
+                [CHOICE_LABEL_CATEGORIES[model](obj) for obj in objs])
+        for obj in objs:
+            yield self.choice(obj)
+
+
+def use_label_choice_iterator(fields):
+    """
+    Sets `LabelChoiceIterator` on the model choice fields of a dict of form
+    fields.
+    """
+    for field in fields.values():
+        if isinstance(field, djf.ModelChoiceField):
+            field.iterator = LabelChoiceIterator
+            # resets choices of the widget
+            field.queryset = field.queryset
 
 
 class CustomModelForm(djf.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        use_label_choice_iterator(self.fields)
         for visible in self.visible_fields():
             if visible.field.widget.__class__.__name__ == djf.Select().__class__.__name__:
                 visible.field.widget.attrs["class"] = "form-select"
@@ -6,7 +6,19 @@ from core import models as core_models
 from demo import utils as demo_utils
 
 
-class CustomWsCreateView(djev.CreateView):
+class LabelChoicesFormMixin():
+    """
+    Form view mixin loading related objects of choice labels with the
+    choices (see `LabelChoiceIterator`), for views of generated model forms.
+    """
+
+    def get_form(self, *args, **kwargs):
+        form = super().get_form(*args, **kwargs)
+        demo_utils.use_label_choice_iterator(form.fields)
+        return form
+
+
+class CustomWsCreateView(LabelChoicesFormMixin, djev.CreateView):
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         params = dict(self.request.GET)
@@ -16,14 +28,14 @@ class CustomWsCreateView(djev.CreateView):
             ws_pk = int(ws_pk[0])
             workspace = core_models.Workspace.objects.get(pk=ws_pk)
             demo_utils.update_context_main(
-                self.request, context, workspace.name)
+                self.request, context, workspace)
         if ws_pk and cat_pk:
             ws_pk = int(ws_pk[0])
             cat_pk = int(cat_pk[0])
             workspace = core_models.Workspace.objects.get(pk=ws_pk)
             category = core_models.Category.objects.get(pk=cat_pk)
-            demo_utils.update_context_main(self.request, context, workspace.name,
-                                           category.name)
+            demo_utils.update_context_main(self.request, context, workspace,
+                                           category)
         return context
 
     def get_form_class(self):
@@ -61,7 +73,7 @@ class CustomWsCreateView(djev.CreateView):
         return super().form_valid(form)
 
 
-class CustomWsUpdateView(djev.UpdateView):
+class CustomWsUpdateView(LabelChoicesFormMixin, djev.UpdateView):
     def get(self, request, *args, **kwargs):
         if request.user != self.get_object().workspace.created_by:
             raise PermissionDenied("You are not the creator of this object.")
@@ -76,14 +88,14 @@ class CustomWsUpdateView(djev.UpdateView):
             ws_pk = int(ws_pk[0])
             workspace = core_models.Workspace.objects.get(pk=ws_pk)
             demo_utils.update_context_main(
-                self.request, context, workspace.name)
+                self.request, context, workspace)
         if ws_pk and cat_pk:
             ws_pk = int(ws_pk[0])
             cat_pk = int(cat_pk[0])
             workspace = core_models.Workspace.objects.get(pk=ws_pk)
             category = core_models.Category.objects.get(pk=cat_pk)
-            demo_utils.update_context_main(self.request, context, workspace.name,
-                                           category.name)
+            demo_utils.update_context_main(self.request, context, workspace,
+                                           category)
         return context
 
 
@@ -102,14 +114,14 @@ class CustomWsDeleteView(djev.DeleteView):
             ws_pk = int(ws_pk[0])
             workspace = core_models.Workspace.objects.get(pk=ws_pk)
             demo_utils.update_context_main(
-                self.request, context, workspace.name)
+                self.request, context, workspace)
         if ws_pk and cat_pk:
             ws_pk = int(ws_pk[0])
             cat_pk = int(cat_pk[0])
             workspace = core_models.Workspace.objects.get(pk=ws_pk)
             category = core_models.Category.objects.get(pk=cat_pk)
-            demo_utils.update_context_main(self.request, context, workspace.name,
-                                           category.name)
+            demo_utils.update_context_main(self.request, context, workspace,
+                                           category)
         return context
 
 
@@ -134,12 +146,12 @@ class CustomCreateView(djev.CreateView):
         if ws_pk and not cat_pk:
             workspace = core_models.Workspace.objects.get(pk=ws_pk)
             demo_utils.update_context_main(
-                self.request, context, workspace.name)
+                self.request, context, workspace)
         if ws_pk and cat_pk:
             workspace = core_models.Workspace.objects.get(pk=ws_pk)
             category = core_models.Category.objects.get(pk=cat_pk)
-            demo_utils.update_context_main(self.request, context, workspace.name,
-                                           category.name)
+            demo_utils.update_context_main(self.request, context, workspace,
+                                           category)
         return context
 
     def get_form_class(self):
@@ -203,10 +215,10 @@ class CustomDeleteView(djev.DeleteView):
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        ws_name = self.object.workspace.name
-        cat_name = self.object.category.name
+        workspace = self.object.workspace
+        category = self.object.category
         demo_utils.update_context_main(
-            self.request, context, ws_name, cat_name)
+            self.request, context, workspace, category)
         return context
 
     def get_success_url(self):
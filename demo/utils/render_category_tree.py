@@ -1,9 +1,9 @@
 from django.urls import reverse
 
-def render_category_tree(tree, category_name=None):
+def render_category_tree(tree, category_pk=None):
     result = '<ul>'
     for k, v in tree.items():
-        if category_name and k.name == category_name:
+        if category_pk and k.pk == category_pk:
             result += f'''
             <li>
             <a href="{k.get_absolute_url()}"
@@ -18,7 +18,7 @@ def render_category_tree(tree, category_name=None):
             </li>
             '''
         if v:
-            result += render_category_tree(v, category_name)
+            result += render_category_tree(v, category_pk)
     result += '</ul>'
     return result
 
@@ -27,9 +27,9 @@ def render_category_tree_detailed(tree):
     result = '<ul class="list-styled">'
     for k, v in tree.items():
         url_update = reverse("demo:category-update", kwargs={"pk": k.pk})\
-            + f'?ws_pk={k.workspace.pk}&cat_pk={k.pk}'
+            + f'?ws_pk={k.workspace_id}&cat_pk={k.pk}'
         url_delete = reverse("demo:category-delete", kwargs={"pk": k.pk})\
-            + f'?ws_pk={k.workspace.pk}&cat_pk={k.pk}'
+            + f'?ws_pk={k.workspace_id}&cat_pk={k.pk}'
         result += f'''
         <li>
             <span class="fs-5">{k.name}: </span>
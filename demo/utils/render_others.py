@@ -15,9 +15,9 @@ def render_objs(objs, url_name=None):
     '''
     for obj in objs:
         url_update = reverse(f"demo:{url_name}-update", kwargs={"pk": obj.pk})\
-            + f'?ws_pk={obj.workspace.pk}'
+            + f'?ws_pk={obj.workspace_id}'
         url_delete = reverse(f"demo:{url_name}-delete", kwargs={"pk": obj.pk})\
-            + f'?ws_pk={obj.workspace.pk}'
+            + f'?ws_pk={obj.workspace_id}'
         result += fr'''
             <tr>
               <th scope="row">{obj.pk}</th>
@@ -1,21 +1,30 @@
+from collections import defaultdict
+
 from .render_category_tree import render_category_tree
 from core import models as core_models
 
 
-def render_workspaces(workspaces, workspace_name=None, category_name=None):
+def render_workspaces(workspaces, workspace_pk=None, category_pk=None):
     if workspaces:
+        # categories of all workspaces in one query
+        workspace_categories = defaultdict(list)
+        for category in core_models.Category.objects.filter(
+                workspace__in=workspaces):
+            workspace_categories[category.workspace_id].append(category)
         result = '<ul>'
         for workspace in workspaces:
-            categories = workspace.categories.all()
-            if workspace_name and workspace.name == workspace_name:
+            rendered_categories = render_category_tree(
+                core_models.Category.get_tree(
+                    workspace_categories[workspace.pk]),
+                category_pk)
+            if workspace_pk and workspace.pk == workspace_pk:
                 result += f'''
                 <li>
                 <a href="{workspace.get_absolute_url()}" 
                   class="text-warning-emphasis bg-warning-subtle"
                 >Workspace: {workspace.name}</a>
                 '''
-                result += render_category_tree(
-                    core_models.Category.get_tree(categories), category_name)
+                result += rendered_categories
                 result += '</li>'
             else:
                 result += f'''
@@ -23,8 +32,7 @@ def render_workspaces(workspaces, workspace_name=None, category_name=None):
                 <a href="{workspace.get_absolute_url()}" class="link-secondary"
                     >Workspace: {workspace.name}</a>
                 '''
-                result += render_category_tree(
-                    core_models.Category.get_tree(categories), category_name)
+                result += rendered_categories
                 result += '</li>'
         result += '</ul>'
     else:
@@ -1,39 +1,67 @@
 from django.db.models import Q
 from demo import utils as demo_utils
 from core import models as core_models
+from core.utils import tree_cache
 
+# related objects shown in rows of project and task tables
+PROJECT_ROW_RELATED = ["category", "parent", "priority", "status"]
+TASK_ROW_RELATED = ["category", "project", "parent", "priority", "status"]
 
-def update_context_main(request, context, workspace_name=None, category_name=None):
+def get_workspaces_rendered(request, workspace=None, category=None):
+    """
+    Get rendered workspaces sidebar for request's user.
+
+    The sidebar is cached per user under a version bumped on workspace and
+    category changes (see `core.signals`) and memoized on the request.
+    """
+    user = request.user
+    workspace_pk = workspace.pk if workspace else None
+    category_pk = category.pk if category else None
+    memo = request.__dict__.setdefault("_workspaces_rendered", {})
+    memo_key = (workspace_pk, category_pk)
+    if memo_key not in memo:
+        memo[memo_key] = tree_cache.get_or_render(
+            core_models.Workspace, user.pk,
+            ("sidebar", workspace_pk, category_pk),
+            lambda: demo_utils.render_workspaces(
+                user.workspaces.all(), workspace_pk, category_pk),
+        )
+    return memo[memo_key]
+
+
+def update_context_main(request, context, workspace=None, category=None):
     """
     Get workspaces and categories from a request object for an user.
     """
     user = request.user
     workspaces = user.workspaces.all()
-    workspaces_rendered = demo_utils.render_workspaces(
-        workspaces, workspace_name, category_name)
+    workspaces_rendered = get_workspaces_rendered(request, workspace, category)
     context.update({
         "workspaces": workspaces,
         "workspaces_rendered": workspaces_rendered,
     })
-    if workspace_name:
-        workspace = user.workspaces.get(name=workspace_name)
+    if workspace:
         categories = workspace.categories.all()
         tags = workspace.tags.all()
         priorities = workspace.priorities.all()
         statuses = workspace.statuses.all()
-        ws_category_tree = core_models.Category.get_tree(categories)
-        ws_categories_detail_rendered = demo_utils.\
-            render_category_tree_detailed(ws_category_tree)
+        ws_categories_detail_rendered = core_models.Category\
+            .get_cached_fragment(
+                workspace.pk, ("detailed",),
+                lambda: demo_utils.render_category_tree_detailed(
+                    core_models.Category.get_tree(categories)),
+            )
         ws_tags_rendered = demo_utils.render_objs(tags, "tag")
         ws_priorities_rendered = demo_utils.render_objs(priorities, "priority")
         ws_statuses_rendered = demo_utils.render_objs(statuses, "status")
-        ws_projects = workspace.projects.filter(is_visible=True)
+        ws_projects = workspace.projects.filter(is_visible=True)\
+            .select_related(*PROJECT_ROW_RELATED)
         ws_project_tasks = workspace.tasks.filter(
             project__isnull=False, is_visible=True
-        )
+        ).select_related(*TASK_ROW_RELATED)
         ws_independent_tasks = workspace.tasks.filter(
             project__isnull=True, is_visible=True
-        )
+        ).select_related(*TASK_ROW_RELATED)
         context.update({
             "workspace": workspace,
             "categories": categories,
@@ -45,15 +73,15 @@ def update_context_main(request, context, workspace_name=None, category_name=Non
             "ws_project_tasks": ws_project_tasks,
             "ws_independent_tasks": ws_independent_tasks,
         })
-    if category_name:
-        category = core_models.Category.objects.get(name=category_name)
-        category_projects = category.projects.filter(is_visible=True)
+    if category:
+        category_projects = category.projects.filter(is_visible=True)\
+            .select_related(*PROJECT_ROW_RELATED)
         category_project_tasks = category.tasks.filter(
             project__isnull=False, is_visible=True
-        )
+        ).select_related(*TASK_ROW_RELATED)
         category_independent_tasks = category.tasks.filter(
             project__isnull=True, is_visible=True
-        )
+        ).select_related(*TASK_ROW_RELATED)
         context.update({
             "category": category,
             "category_projects": category_projects,
@@ -67,7 +95,7 @@ def update_context_archive(request, context):
     """
     user = request.user
     workspaces = user.workspaces.all()
-    workspaces_rendered = demo_utils.render_workspaces(workspaces)
+    workspaces_rendered = get_workspaces_rendered(request)
     projects = core_models.Project.objects.filter(
         created_by=user, is_visible=False)
     project_tasks = core_models.Task.objects.filter(
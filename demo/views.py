@@ -306,7 +306,9 @@ class StatusDeleteView(LoginRequiredMixin, demo_utils.CustomWsDeleteView):
         return reverse_lazy("demo:workspace-manage", kwargs={"pk": self.object.workspace.pk})
 
 
-class WorkspaceCommentUpdateView(LoginRequiredMixin, djev.UpdateView):
+class WorkspaceCommentUpdateView(LoginRequiredMixin,
+                                 demo_utils.LabelChoicesFormMixin,
+                                 djev.UpdateView):
     model = core_models.WorkspaceComment
     template_name = "demo/generic/update.html"
     fields = ["content", "workspace", "parent"]
@@ -323,9 +325,9 @@ class WorkspaceCommentUpdateView(LoginRequiredMixin, djev.UpdateView):
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        ws_name = self.object.workspace.name
+        workspace = self.object.workspace
         demo_utils.update_context_main(
-            self.request, context, ws_name)
+            self.request, context, workspace)
         return context
 
 
@@ -345,13 +347,15 @@ class WorkspaceCommentDeleteView(LoginRequiredMixin, djev.DeleteView):
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        ws_name = self.object.workspace.name
+        workspace = self.object.workspace
         demo_utils.update_context_main(
-            self.request, context, ws_name)
+            self.request, context, workspace)
         return context
 
 
-class CategoryCommentUpdateView(LoginRequiredMixin, djev.UpdateView):
+class CategoryCommentUpdateView(LoginRequiredMixin,
+                                demo_utils.LabelChoicesFormMixin,
+                                djev.UpdateView):
     model = core_models.CategoryComment
     template_name = "demo/generic/update.html"
     fields = ["content", "category", "parent"]
@@ -368,10 +372,10 @@ class CategoryCommentUpdateView(LoginRequiredMixin, djev.UpdateView):
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        ws_name = self.object.category.workspace.name
-        cat_name = self.object.category.name
+        workspace = self.object.category.workspace
+        category = self.object.category
         demo_utils.update_context_main(
-            self.request, context, ws_name, cat_name)
+            self.request, context, workspace, category)
         return context
 
 
@@ -391,10 +395,10 @@ class CategoryCommentDeleteView(LoginRequiredMixin, djev.DeleteView):
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        ws_name = self.object.category.workspace.name
-        cat_name = self.object.category.name
+        workspace = self.object.category.workspace
+        category = self.object.category
         demo_utils.update_context_main(
-            self.request, context, ws_name, cat_name)
+            self.request, context, workspace, category)
         return context
 
 
@@ -415,7 +419,7 @@ def workspace_manage(request, pk):
     workspace = core_models.Workspace.objects.get(pk=pk)
     if request.user != workspace.created_by:
         raise PermissionDenied("You are not the creator of this object.")
-    demo_utils.update_context_main(request, context, workspace.name)
+    demo_utils.update_context_main(request, context, workspace)
     return render(request, template, context)
 
 
@@ -426,12 +430,14 @@ def workspace_detail(request, pk):
     workspace = core_models.Workspace.objects.get(pk=pk)
     if request.user != workspace.created_by:
         raise PermissionDenied("You are not the creator of this object.")
-    demo_utils.update_context_main(request, context, workspace.name)
-
-    comments = workspace.comments.all()
-    comments_tree = core_models.WorkspaceComment.get_tree(comments)
-    rendered_comments = core_models.WorkspaceComment.render_comments_tree(
-        comments_tree)
+    demo_utils.update_context_main(request, context, workspace)
+
+    comments = workspace.comments.select_related("created_by")
+    rendered_comments = core_models.WorkspaceComment.get_cached_fragment(
+        workspace.pk, ("comments",),
+        lambda: core_models.WorkspaceComment.render_comments_tree(
+            core_models.WorkspaceComment.get_tree(comments)),
+    )
     if request.method == "POST":
         comment_form = demo_forms.WorkspaceCommentForm(
             request.POST, request.FILES, prefix="comment")
@@ -465,18 +471,19 @@ def workspace_detail(request, pk):
 def category_detail(request, cat_pk):
     template = "demo/category.html"
     context = {}
-    cat_name = core_models.Category.objects.get(pk=cat_pk).name
-    category = core_models.Category.objects.get(pk=cat_pk)
-    ws_pk = category.workspace.pk
-    ws_name = core_models.Workspace.objects.get(pk=ws_pk).name
+    category = core_models.Category.objects.select_related("workspace")\
+        .get(pk=cat_pk)
     if request.user != category.created_by:
         raise PermissionDenied("You are not the creator of this object.")
-    demo_utils.update_context_main(request, context, ws_name, cat_name)
-
-    comments = category.comments.all()
-    comments_tree = core_models.CategoryComment.get_tree(comments)
-    rendered_comments = core_models.CategoryComment.render_comments_tree(
-        comments_tree)
+    demo_utils.update_context_main(request, context, category.workspace,
+                                   category)
+
+    comments = category.comments.select_related("created_by")
+    rendered_comments = core_models.CategoryComment.get_cached_fragment(
+        category.pk, ("comments",),
+        lambda: core_models.CategoryComment.render_comments_tree(
+            core_models.CategoryComment.get_tree(comments)),
+    )
     if request.method == "POST":
         comment_form = demo_forms.CategoryCommentForm(
             request.POST, request.FILES, prefix="comment")
@@ -516,12 +523,14 @@ def task_detail_view(request, uuid):
         raise PermissionDenied("You are not the creator of this object.")
     ws_pk = task.workspace.pk
     cat_pk = task.category.pk
-    demo_utils.update_context_main(request, context, task.workspace.name,
-                                   task.category.name)
-    comments = task.comments.all()
-    comments_tree = core_models.TaskComment.get_tree(comments)
-    rendered_comments = core_models.TaskComment.render_comments_tree(
-        comments_tree)
+    demo_utils.update_context_main(request, context, task.workspace,
+                                   task.category)
+    comments = task.comments.select_related("created_by")
+    rendered_comments = core_models.TaskComment.get_cached_fragment(
+        task.pk, ("comments",),
+        lambda: core_models.TaskComment.render_comments_tree(
+            core_models.TaskComment.get_tree(comments)),
+    )
     task_queryset = core_models.Task.objects.filter(uuid=uuid)
     if request.method == "POST":
         task_form = demo_forms.TaskForm(
@@ -599,7 +608,9 @@ class TaskDeleteView(LoginRequiredMixin, demo_utils.CustomDeleteView):
     template_name = "demo/generic/delete.html"
 
 
-class TaskCommentUpdateView(LoginRequiredMixin, djev.UpdateView):
+class TaskCommentUpdateView(LoginRequiredMixin,
+                            demo_utils.LabelChoicesFormMixin,
+                            djev.UpdateView):
     model = core_models.TaskComment
     template_name = "demo/generic/update.html"
     fields = ["content", "task", "parent"]
@@ -618,10 +629,10 @@ class TaskCommentUpdateView(LoginRequiredMixin, djev.UpdateView):
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        ws_name = self.object.task.workspace.name
-        cat_name = self.object.task.category.name
+        workspace = self.object.task.workspace
+        category = self.object.task.category
         demo_utils.update_context_main(
-            self.request, context, ws_name, cat_name)
+            self.request, context, workspace, category)
         return context
 
 
@@ -639,10 +650,10 @@ class TaskCommentDeleteView(LoginRequiredMixin, djev.DeleteView):
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        ws_name = self.object.task.workspace.name
-        cat_name = self.object.task.category.name
+        workspace = self.object.task.workspace
+        category = self.object.task.category
         demo_utils.update_context_main(
-            self.request, context, ws_name, cat_name)
+            self.request, context, workspace, category)
         return context
 
 
@@ -653,15 +664,20 @@ def project_detail_view(request, uuid):
     project = core_models.Project.objects.get(uuid=uuid)
     if request.user != project.created_by:
         raise PermissionDenied("You are not the creator of this object.")
-    demo_utils.update_context_main(request, context, project.workspace.name,
-                                   project.category.name)
-    comments = project.comments.all()
-    comments_tree = core_models.ProjectComment.get_tree(comments)
-    rendered_comments = core_models.ProjectComment.render_comments_tree(
-        comments_tree)
-    tasks = project.tasks.all()
-    tasks_tree = core_models.Task.get_tree(tasks)
-    rendered_tasks = core_models.Task.render_tree(tasks_tree, "title")
+    demo_utils.update_context_main(request, context, project.workspace,
+                                   project.category)
+    comments = project.comments.select_related("created_by")
+    rendered_comments = core_models.ProjectComment.get_cached_fragment(
+        project.pk, ("comments",),
+        lambda: core_models.ProjectComment.render_comments_tree(
+            core_models.ProjectComment.get_tree(comments)),
+    )
+    tasks = project.tasks.select_related(*demo_utils.TASK_ROW_RELATED)
+    rendered_tasks = core_models.Task.get_cached_fragment(
+        project.category_id, ("project-tasks", project.pk),
+        lambda: core_models.Task.render_tree(
+            core_models.Task.get_tree(tasks), "title"),
+    )
     project_queryset = core_models.Project.objects.filter(uuid=uuid)
     if request.method == "POST":
         project_form = demo_forms.ProjectForm(
@@ -724,7 +740,9 @@ class ProjectDeleteView(LoginRequiredMixin, demo_utils.CustomDeleteView):
     template_name = "demo/generic/delete.html"
 
 
-class ProjectCommentUpdateView(LoginRequiredMixin, djev.UpdateView):
+class ProjectCommentUpdateView(LoginRequiredMixin,
+                               demo_utils.LabelChoicesFormMixin,
+                               djev.UpdateView):
     model = core_models.ProjectComment
     template_name = "demo/generic/update.html"
     fields = ["content", "project", "parent"]
@@ -739,10 +757,10 @@ class ProjectCommentUpdateView(LoginRequiredMixin, djev.UpdateView):
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        ws_name = self.object.project.workspace.name
-        cat_name = self.object.project.category.name
+        workspace = self.object.project.workspace
+        category = self.object.project.category
         demo_utils.update_context_main(
-            self.request, context, ws_name, cat_name)
+            self.request, context, workspace, category)
         return context
 
 
@@ -760,10 +778,10 @@ class ProjectCommentDeleteView(LoginRequiredMixin, djev.DeleteView):
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        ws_name = self.object.project.workspace.name
-        cat_name = self.object.project.category.name
+        workspace = self.object.project.workspace
+        category = self.object.project.category
         demo_utils.update_context_main(
-            self.request, context, ws_name, cat_name)
+            self.request, context, workspace, category)
         return context
 
 @login_required
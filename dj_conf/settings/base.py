@@ -36,11 +36,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -79,6 +82,65 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# a local memory cache is not shared by processes, which production settings
+# require (see dj_conf.settings.prod)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# seconds rendered tree fragments are kept (see core.utils.tree_cache)
+TREE_CACHE_TIMEOUT = env.int('TREE_CACHE_TIMEOUT', default=60 * 60 * 24)
+
+# seconds API responses are kept (see api.utils.response_cache)
+API_RESPONSE_CACHE_TIMEOUT = env.int('API_RESPONSE_CACHE_TIMEOUT',
+                                     default=60 * 5)
+
+
+# Request metrics (see core.utils.metrics)
+# directory where processes share their metrics, in-process only if unset
+METRICS_DIR = env('METRICS_DIR', default=None)
+METRICS_FLUSH_INTERVAL = env.float('METRICS_FLUSH_INTERVAL', default=5)
+# bearer token of clients (e.g. the Prometheus server) allowed to read
+# metrics besides staff users, none if unset
+METRICS_TOKEN = env('METRICS_TOKEN', default=None)
+
+# Request profiler of staff users (see core.utils.profiler)
+PROFILER_SAMPLE_INTERVAL = env.float('PROFILER_SAMPLE_INTERVAL',
+                                     default=0.001)
+PROFILER_TIMEOUT = env.int('PROFILER_TIMEOUT', default=60 * 60)
+PROFILER_MAX_QUERIES = env.int('PROFILER_MAX_QUERIES', default=2000)
+
+# Slow query log (see core.utils.slow_queries)
+# seconds above which queries of requests are logged (None disables the log)
+SLOW_QUERY_THRESHOLD = env.float('SLOW_QUERY_THRESHOLD', default=0.1)
+SLOW_QUERY_EXPLAIN = env.bool('SLOW_QUERY_EXPLAIN', default=True)
+
+# Delta sync (see api.views.SyncView)
+# days tombstones of deleted objects are kept, pruned by the
+# `prune_tombstones` command; older sync tokens are rejected
+TOMBSTONE_RETENTION_DAYS = env.int('TOMBSTONE_RETENTION_DAYS', default=90)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.slow_queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 import os
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 from .base import *
 
@@ -26,6 +27,19 @@ env.read_env(os.path.join(BASE_DIR, '.env.prod'))
 DEBUG = env("DEBUG", cast=bool, default=False)
 ALLOWED_HOSTS = env.list("ALLOWED_HOSTS", [])
 
+# Versions invalidating rendered trees (see core.utils.tree_cache), cached
+# API responses (see api.utils.response_cache) and profiles (see
+# core.utils.profiler) must be seen by all processes serving requests, which
+# a local memory cache is not
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+if not DEBUG and CACHES['default']['BACKEND'] \
+        == 'django.core.cache.backends.locmem.LocMemCache':
+    raise ImproperlyConfigured(
+        "CACHE_URL should be a cache shared by all processes (e.g. "
+        "redis://, pymemcache://, dbcache://, filecache://) when DEBUG is off.")
+
 CSRF_COOKIE_SECURE = env("CSRF_COOKIE_SECURE", cast=bool, default=True)
 SESSION_COOKIE_SECURE = env("SESSION_COOKIE_SECURE", cast=bool, default=True)
 SECURE_SSL_REDIRECT = env("SECURE_SSL_REDIRECT", cast=bool, default=True)
@@ -17,10 +17,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from core import views as core_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('demo.urls', namespace='demo')),
     path('accounts/', include('django.contrib.auth.urls')),
     path('api/', include('api.urls', namespace='api')),
     path('api/auth/', include('rest_framework.urls')),
+    path('metrics/', core_views.metrics, name='metrics'),
+    path('profiles/<str:profile_id>/', core_views.profile, name='profile'),
 ]